@@ -0,0 +1,143 @@
+import math
+import random
+import pygame
+from constants import *
+from sprites import prepare
+
+# Per-theme sky gradient (top, bottom) and parallax layers from back to front.
+# Layers are (style, color, top, amplitude, depth, drift): top is the highest
+# point of the silhouette, depth how much it shifts as the player moves
+# (0 = fixed, 1 = moves with the level) and drift a constant scroll in px/s.
+THEMES = {
+    "forest": {
+        'sky': ((80, 160, 225), (135, 206, 235)),
+        'layers': [
+            ("peaks", (110, 150, 180), 380, 160, 0.05, 0),
+            ("hills", (70, 150, 90), 520, 80, 0.12, 0),
+            ("hills", (40, 115, 60), 620, 60, 0.2, 0)
+        ]
+    },
+    "ice": {
+        'sky': ((150, 195, 240), (200, 230, 255)),
+        'layers': [
+            ("peaks", (225, 238, 250), 330, 220, 0.05, 0),
+            ("peaks", (180, 210, 235), 500, 120, 0.12, 0),
+            ("hills", (235, 245, 255), 640, 40, 0.2, 0)
+        ]
+    },
+    "desert": {
+        'sky': ((245, 190, 120), (255, 230, 180)),
+        'layers': [
+            ("peaks", (215, 160, 110), 450, 100, 0.05, 0),
+            ("hills", (235, 195, 125), 560, 70, 0.12, 0),
+            ("hills", (215, 170, 100), 650, 50, 0.2, 0)
+        ]
+    },
+    "volcano": {
+        'sky': ((25, 5, 5), (90, 30, 20)),
+        'layers': [
+            ("peaks", (60, 20, 20), 300, 250, 0.05, 4),
+            ("peaks", (40, 12, 12), 480, 140, 0.12, 0),
+            ("hills", (25, 8, 8), 640, 50, 0.2, 0)
+        ]
+    },
+    "tech": {
+        'sky': ((5, 5, 20), (20, 20, 40)),
+        'layers': [
+            ("blocks", (30, 30, 60), 350, 250, 0.05, 0),
+            ("blocks", (45, 45, 85), 480, 200, 0.12, 0)
+        ]
+    }
+}
+
+def render_gradient(top_color, bottom_color, width, height):
+    """Vertical gradient, one line per row"""
+    surface = pygame.Surface((width, height))
+    for y in range(height):
+        t = y / max(1, height - 1)
+        color = [int(a + (b - a) * t) for a, b in zip(top_color, bottom_color)]
+        pygame.draw.line(surface, color, (0, y), (width, y))
+    return surface
+
+def ridge_heights(style, amplitude, width, rng):
+    """Silhouette height at evenly spaced x positions, wrapping seamlessly at width"""
+    if style == "hills":
+        # Sines with whole numbers of cycles across the width, so the ends meet
+        waves = [(rng.randint(1, 3), rng.uniform(0, 2 * math.pi), rng.uniform(0.3, 1.0)) for _ in range(3)]
+        total = sum(weight for _, _, weight in waves)
+        points = []
+        for x in range(0, width + 1, 10):
+            value = sum(weight * math.sin(cycles * 2 * math.pi * x / width + phase)
+                        for cycles, phase, weight in waves)
+            points.append((x, amplitude * (0.5 + 0.5 * value / total)))
+        return points
+    
+    # Peaks: jagged random ridge, pinned to the same height at both ends
+    step = 40
+    points = [(0, amplitude * 0.5)]
+    for x in range(step, width, step):
+        points.append((x, rng.uniform(0.1, 1.0) * amplitude))
+    points.append((width, amplitude * 0.5))
+    return points
+
+def render_layer(style, color, amplitude, width, height, rng):
+    """One parallax layer as a transparent surface height pixels tall, peaking amplitude below its top"""
+    surface = pygame.Surface((width, height), pygame.SRCALPHA)
+    
+    if style == "blocks":
+        # City skyline with a few lit windows
+        window_color = tuple(min(255, c + 90) for c in color)
+        x = 0
+        while x < width:
+            block_width = min(rng.randint(40, 110), width - x)
+            block_top = amplitude - rng.uniform(0.3, 1.0) * amplitude
+            block = pygame.Rect(x, block_top, block_width, height - block_top)
+            pygame.draw.rect(surface, color, block)
+            
+            for wy in range(block.top + 10, block.bottom - 10, 20):
+                for wx in range(block.left + 8, block.right - 8, 16):
+                    if rng.random() < 0.25:
+                        pygame.draw.rect(surface, window_color, (wx, wy, 6, 8))
+            x += block_width + rng.randint(0, 12)
+        return surface
+    
+    points = [(x, amplitude - h) for x, h in ridge_heights(style, amplitude, width, rng)]
+    points += [(width, height), (0, height)]
+    pygame.draw.polygon(surface, color, points)
+    return surface
+
+class Background:
+    """Pre-rendered sky and parallax layers for a theme.
+    
+    Everything is drawn once when the background is built, so drawing it is
+    a sky blit plus two offset blits per layer (layers wrap horizontally).
+    """
+    def __init__(self, theme, seed=0, width=SCREEN_WIDTH, height=SCREEN_HEIGHT):
+        self.theme = theme
+        self.seed = seed
+        self.width = width
+        self.height = height
+        
+        spec = THEMES.get(theme, THEMES["forest"])
+        rng = random.Random(f"{theme}:{seed}")
+        
+        self.sky = prepare(render_gradient(spec['sky'][0], spec['sky'][1], width, height), alpha=False)
+        
+        # Layers are only as tall as their silhouette and get blitted at their top
+        self.layers = []
+        for style, color, top, amplitude, depth, drift in spec['layers']:
+            layer = render_layer(style, color, amplitude, width, height - top, rng)
+            self.layers.append((prepare(layer), top, depth, drift))
+    
+    def draw(self, surface, focus_x=None):
+        """Draw the background, shifting layers by how far focus_x is from the screen center"""
+        surface.blit(self.sky, (0, 0))
+        
+        shift = 0 if focus_x is None else focus_x - self.width / 2
+        seconds = pygame.time.get_ticks() / 1000
+        
+        for layer, top, depth, drift in self.layers:
+            offset = int(shift * depth + seconds * drift) % self.width
+            surface.blit(layer, (-offset, top))
+            if offset:
+                surface.blit(layer, (self.width - offset, top))
\ No newline at end of file
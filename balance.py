@@ -0,0 +1,225 @@
+import os
+import ast
+import glob
+import time
+import random
+import argparse
+import tempfile
+import itertools
+import multiprocessing
+
+# Simulations never open a window
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import numpy as np
+from constants import *
+from game import Game, GameState, INPUT_LEFT, INPUT_RIGHT, INPUT_JUMP, INPUT_DASH, INPUT_SHOOT
+
+def expand_grid(grid, seeds):
+    """Yield (params, seed) for every combination in a {"type.stat": [values]} grid"""
+    names = sorted(grid)
+    for values in itertools.product(*(grid[name] for name in names)):
+        params = dict(zip(names, values))
+        for seed in seeds:
+            yield params, seed
+
+def params_to_overrides(params):
+    """Turn {"runner.move_speed": 320} into Game enemy_overrides {"runner": {"move_speed": 320}}"""
+    overrides = {}
+    for name, value in params.items():
+        enemy_type, stat = name.split(".", 1)
+        overrides.setdefault(enemy_type, {})[stat] = value
+    return overrides
+
+def scripted_policy(game, last_bits):
+    """Simple bot: chase the nearest enemy, shoot when lined up, jump and dash to reach it"""
+    player = game.player
+    if not game.enemies:
+        return 0
+    
+    target = min(game.enemies, key=lambda e: abs(e.x - player.x) + abs(e.y - player.y))
+    dx = target.x - player.x
+    dy = target.y - player.y
+    bits = 0
+    
+    # Close in horizontally, but keep some distance to shoot from
+    if abs(dx) > 150 or abs(dy) > 40:
+        bits |= INPUT_RIGHT if dx > 0 else INPUT_LEFT
+    elif (dx > 0) != player.facing_right:
+        bits |= INPUT_RIGHT if dx > 0 else INPUT_LEFT
+    
+    if abs(dy) < 40:
+        bits |= INPUT_SHOOT
+    
+    # Jump toward enemies above, releasing the key between presses so double jumps fire
+    if dy < -60 and not last_bits & INPUT_JUMP:
+        if player.on_ground or (player.vel_y > 0 and player.can_double_jump):
+            bits |= INPUT_JUMP
+    
+    # Dash away from missiles that are about to hit
+    for bullet in game.enemy_bullets:
+        if abs(bullet.x - player.x) < 80 and abs(bullet.y - player.y) < 60:
+            bits |= INPUT_DASH
+            break
+    
+    return bits
+
+def run_simulation(params, seed, level=0, max_time=120.0, dt=1.0 / FPS):
+    """Play one level with the scripted bot and return its metrics"""
+    random.seed(seed)
+    game = Game(effects=False, enemy_overrides=params_to_overrides(params))
+    game.start(seed=seed, level=level)
+    
+    elapsed = 0.0
+    damage_taken = 0
+    deaths = 0
+    bits = 0
+    started = time.perf_counter()
+    
+    while game.state == GameState.PLAYING and elapsed < max_time:
+        health = game.player.health
+        lives = game.lives
+        
+        bits = scripted_policy(game, bits)
+        game.update(dt, game.apply_input(bits))
+        elapsed += dt
+        
+        # A death rebuilds the player at full health, count what was left as damage
+        if game.lives < lives:
+            deaths += 1
+            damage_taken += health
+        else:
+            damage_taken += max(0, health - game.player.health)
+    
+    cleared = game.state == GameState.LEVEL_COMPLETE
+    
+    result = {
+        'seed': seed,
+        'level': level,
+        'cleared': cleared,
+        'time_to_clear': elapsed if cleared else float('nan'),
+        'sim_time': elapsed,
+        'damage_taken': damage_taken,
+        'deaths': deaths,
+        'score': game.score,
+        'enemies_left': len(game.enemies),
+        'wall_time': time.perf_counter() - started
+    }
+    for name, value in params.items():
+        # Tuples (e.g. boss.phase_thresholds) are stored as text
+        result['param.' + name] = value if isinstance(value, (int, float)) else repr(value)
+    
+    return result
+
+def _run_task(task):
+    params, seed, level, max_time, rate = task
+    return run_simulation(params, seed, level, max_time, 1.0 / rate)
+
+class ColumnarWriter:
+    """Streams result rows to disk as column arrays, one numbered .npz chunk at a time.
+    
+    path must be new or empty: chunks from another writer there would
+    clash with these, so the writer refuses rather than delete them.
+    """
+    def __init__(self, path, chunk_size=256):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.columns = {}
+        self.rows = 0
+        self.chunk_index = 0
+        os.makedirs(path, exist_ok=True)
+        if os.listdir(path):
+            raise FileExistsError(f"{path} is not empty, results need a directory of their own")
+    
+    def append(self, row):
+        for name, value in row.items():
+            # Backfill columns that show up late so all columns stay the same length. NaN rather
+            # than None, which would make an object array np.load can't read without pickle
+            self.columns.setdefault(name, [float('nan')] * self.rows).append(value)
+        self.rows += 1
+        
+        if self.rows >= self.chunk_size:
+            self.flush()
+    
+    def flush(self):
+        if self.rows == 0:
+            return
+        
+        arrays = {name: np.asarray(values) for name, values in self.columns.items()}
+        chunk_path = os.path.join(self.path, f"part-{self.chunk_index:05d}.npz")
+        temp_path = chunk_path + ".tmp"
+        with open(temp_path, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(temp_path, chunk_path)
+        
+        self.chunk_index += 1
+        self.columns = {}
+        self.rows = 0
+    
+    def close(self):
+        self.flush()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+
+def load_results(path):
+    """Read every chunk written by ColumnarWriter back into one array per column"""
+    columns = {}
+    for chunk_path in sorted(glob.glob(os.path.join(path, "part-*.npz"))):
+        with np.load(chunk_path) as chunk:
+            for name in chunk.files:
+                columns.setdefault(name, []).append(chunk[name])
+    return {name: np.concatenate(parts) for name, parts in columns.items()}
+
+def run_batch(grid, seeds, out_path, level=0, max_time=120.0, workers=None, chunk_size=256, rate=FPS):
+    """Run every grid point for every seed across a process pool, streaming results to out_path.
+    
+    Each batch gets its own new run-<time>-<suffix> directory under
+    out_path, even when two start in the same second. Returns (runs,
+    seconds, directory).
+    """
+    os.makedirs(out_path, exist_ok=True)
+    run_path = tempfile.mkdtemp(prefix=time.strftime("run-%Y%m%d-%H%M%S-"), dir=out_path)
+    tasks = [(params, seed, level, max_time, rate) for params, seed in expand_grid(grid, seeds)]
+    if workers is None:
+        workers = os.cpu_count() or 1
+    
+    # Hand out work in chunks so the pool isn't bottlenecked on the task queue
+    chunksize = max(1, len(tasks) // (workers * 8))
+    context = multiprocessing.get_context("spawn")
+    started = time.perf_counter()
+    
+    with ColumnarWriter(run_path, chunk_size) as writer:
+        with context.Pool(workers) as pool:
+            for result in pool.imap_unordered(_run_task, tasks, chunksize):
+                writer.append(result)
+    
+    elapsed = time.perf_counter() - started
+    return len(tasks), elapsed, run_path
+
+def main():
+    parser = argparse.ArgumentParser(description="Run headless balance simulations in parallel")
+    parser.add_argument("--param", nargs="+", action="append", default=[], metavar=("NAME", "VALUE"),
+                        help="Enemy stat and values to try, e.g. --param runner.move_speed 250 300 350")
+    parser.add_argument("--seeds", type=int, default=10, help="Runs per grid point")
+    parser.add_argument("--level", type=int, default=0, help="Level index to simulate")
+    parser.add_argument("--max-time", type=float, default=120.0, help="Simulated seconds before giving up")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--rate", type=float, default=FPS,
+                        help="Physics steps per simulated second, lower is cheaper (collisions are swept)")
+    parser.add_argument("--out", default="balance_results", help="Output directory for result chunks")
+    args = parser.parse_args()
+    
+    grid = {}
+    for name, *values in args.param:
+        grid[name] = [ast.literal_eval(value) for value in values]
+    
+    count, elapsed, run_path = run_batch(grid, range(args.seeds), args.out, args.level, args.max_time,
+                                         args.workers, rate=args.rate)
+    print(f"{count} runs in {elapsed:.1f}s ({count / elapsed:.1f} runs/s), results in {run_path}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
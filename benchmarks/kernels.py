@@ -0,0 +1,97 @@
+import os
+import sys
+import time
+import random
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy as np
+import pygame
+import kernels
+from game import Game, InputState
+from ecs import World, integrate
+
+def best_time(function, repeat, number):
+    """Fastest of repeat timings of number calls, in microseconds per call"""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            function()
+        best = min(best, time.perf_counter() - started)
+    return best / number * 1e6
+
+def time_kernels(platform_count, particle_count):
+    """Microseconds per call of each kernel with the current backend"""
+    rng = random.Random(1)
+    rects = [pygame.Rect(rng.randrange(0, 1200), rng.randrange(0, 800), rng.randrange(40, 200), 20)
+             for _ in range(platform_count)]
+    bounds = kernels.pack_bounds(rects)
+    body = pygame.Rect(600, 400, 40, 40)
+    
+    world = World(capacity=particle_count)
+    world.create_many(particle_count, x=np.random.uniform(0, 1200, particle_count), y=0, vel_x=10, vel_y=-20,
+                      gravity=100, size=3, lifetime=1.0)
+    
+    timings = {}
+    timings['resolve_body'] = best_time(
+        lambda: kernels.resolve_body(body.left, body.top, body.right, body.bottom, 620.0, 420.0, 20.0, 20.0,
+                                     50.0, 100.0, bounds), 5, 2000)
+    timings['overlapping'] = best_time(
+        lambda: kernels.overlapping(body.left, body.top, body.right, body.bottom, bounds), 5, 2000)
+    timings['steer'] = best_time(
+        lambda: kernels.steer(100.0, 200.0, 300.0, 0.0, 600.0, 400.0, 1.0, 5.0, 300.0, 1 / 60), 5, 20000)
+    timings['integrate'] = best_time(lambda: integrate(world, 1 / 60), 5, 2000)
+    return timings
+
+def time_game(level, steps):
+    """Milliseconds per simulation step of a headless endless level, inputs from a fixed seed"""
+    random.seed(3)
+    np.random.seed(3)
+    game = Game()
+    game.start(endless=True, seed=7, level=level)
+    started = time.perf_counter()
+    for step in range(steps):
+        if game.state != game.state.PLAYING:
+            game.start(endless=True, seed=7, level=level)
+        game.update(1 / 60, InputState(random.randrange(64)))
+        if step % 15 == 0:
+            game.player.shoot(game.bullets)
+    return (time.perf_counter() - started) / steps * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the Numba and pure Python collision and motion kernels")
+    parser.add_argument("--platforms", type=int, default=64, help="Platforms in the kernel timings")
+    parser.add_argument("--particles", type=int, default=4096, help="Particles in the integrate timing")
+    parser.add_argument("--level", type=int, default=20, help="Endless level for the whole game timing")
+    parser.add_argument("--steps", type=int, default=1200, help="Simulation steps in the whole game timing")
+    args = parser.parse_args()
+    
+    results = {}
+    for backend in ("python", "numba"):
+        if kernels.use(backend) != backend:
+            print(f"{backend}: not installed, skipped")
+            continue
+        # One untimed round so compiling (or loading the compiled cache) isn't measured
+        time_kernels(args.platforms, args.particles)
+        time_game(args.level, 60)
+        results[backend] = (time_kernels(args.platforms, args.particles), time_game(args.level, args.steps))
+    
+    for backend, (timings, step_time) in results.items():
+        print(f"{backend}:")
+        for name, micros in timings.items():
+            print(f"  {name:<14}{micros:9.2f} us")
+        print(f"  {'game step':<14}{step_time * 1000:9.2f} us  (endless level {args.level + 1})")
+    
+    if len(results) == 2:
+        python_timings, python_step = results["python"]
+        numba_timings, numba_step = results["numba"]
+        speedups = [f"{name} {python_timings[name] / numba_timings[name]:.1f}x" for name in python_timings]
+        print("numba speedup: " + ", ".join(speedups) + f", game step {python_step / numba_step:.2f}x")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,113 @@
+import os
+import sys
+import time
+import random
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy as np
+import pygame
+from constants import *
+from game import Game, InputState
+from pipeline import Snapshot, SimulationThread
+
+def busy_game(level, warmup):
+    """A headless endless level a few seconds in, with shots and particles flying"""
+    random.seed(3)
+    np.random.seed(3)
+    game = Game()
+    game.start(endless=True, seed=7, level=level)
+    for step in range(warmup):
+        game.update(1 / 60, InputState(random.randrange(64)))
+        if step % 4 == 0:
+            game.player.shoot(game.bullets)
+    return game
+
+def draw(surface, view):
+    """The world part of main.draw_game, enough to give the renderer realistic work"""
+    surface.fill((20, 30, 60))
+    for platform in view.platforms:
+        platform.draw(surface)
+    for bullet in view.bullets:
+        bullet.draw(surface)
+    for bullet in view.enemy_bullets:
+        bullet.draw(surface)
+    view.bullet_field.draw(surface)
+    for powerup in view.powerups:
+        powerup.draw(surface)
+    for enemy in view.enemies:
+        enemy.draw(surface)
+    view.player.draw(surface)
+    view.particle_system.draw(surface)
+
+def best_time(function, repeat, number):
+    """Fastest of repeat timings of number calls, in microseconds per call"""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            function()
+        best = min(best, time.perf_counter() - started)
+    return best / number * 1e6
+
+def time_parts(game, surface):
+    """Microseconds for one simulation step, one snapshot and one drawn frame"""
+    inputs = InputState()
+    return {
+        'step': best_time(lambda: game.update(1 / 60, inputs), 5, 60),
+        'snapshot': best_time(lambda: Snapshot(game), 5, 200),
+        'draw': best_time(lambda: draw(surface, game), 5, 60)
+    }
+
+def single_threaded(game, surface, seconds):
+    """Frames per second stepping and drawing one after the other, like main.py without --pipelined"""
+    frames = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < seconds:
+        game.update(1 / 60, InputState())
+        draw(surface, game)
+        frames += 1
+    return frames / (time.perf_counter() - started)
+
+def pipelined(game, surface, seconds, rate):
+    """(frames drawn, steps simulated) per second with the simulation on its own thread at rate"""
+    simulation = SimulationThread(game, rate=rate)
+    simulation.start()
+    frames = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < seconds:
+        draw(surface, simulation.latest())
+        frames += 1
+    elapsed = time.perf_counter() - started
+    simulation.stop()
+    return frames / elapsed, simulation.steps / elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure what --pipelined gains over stepping and drawing in turn")
+    parser.add_argument("--level", type=int, default=20, help="Endless level to measure on")
+    parser.add_argument("--seconds", type=float, default=3.0, help="Seconds for each throughput run")
+    args = parser.parse_args()
+    
+    pygame.init()
+    surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+    
+    game = busy_game(args.level, 240)
+    print(f"endless level {args.level + 1}: {len(game.platforms)} platforms, {len(game.enemies)} enemies, "
+          f"{len(game.bullets) + len(game.enemy_bullets)} shots, {len(game.particle_system.world)} particles")
+    for name, micros in time_parts(game, surface).items():
+        print(f"  {name:<10}{micros:9.0f} us")
+    
+    game = busy_game(args.level, 240)
+    print(f"single threaded: {single_threaded(game, surface, args.seconds):7.1f} frames/s, one step each")
+    for rate in (FPS, 100000):
+        game = busy_game(args.level, 240)
+        frames, steps = pipelined(game, surface, args.seconds, rate)
+        label = "flat out" if rate > 1000 else f"at {rate} Hz"
+        print(f"pipelined, simulation {label}: {frames:7.1f} frames/s, {steps:7.1f} steps/s")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
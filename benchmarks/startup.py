@@ -0,0 +1,56 @@
+import os
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from fonts import FONT_CACHE_PATH
+
+# Runs main.py in a fresh interpreter and exits as soon as the first frame is shown
+FIRST_FRAME = """
+import runpy, pygame
+def flip():
+    raise SystemExit(0)
+pygame.display.flip = flip
+runpy.run_path("main.py", run_name="__main__")
+"""
+
+def time_startup(cold=False):
+    """Seconds from launching the interpreter to the first frame on screen"""
+    if cold:
+        try:
+            os.remove(FONT_CACHE_PATH)
+        except OSError:
+            pass
+    
+    env = dict(os.environ)
+    env.setdefault("SDL_VIDEODRIVER", "dummy")
+    env.setdefault("SDL_AUDIODRIVER", "dummy")
+    env.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+    
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-c", FIRST_FRAME], cwd=ROOT, env=env, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - started
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure time from launch to the first frame of main.py")
+    parser.add_argument("--runs", type=int, default=10, help="Launches per measurement")
+    parser.add_argument("--cold", action="store_true", help="Delete the font cache before every launch")
+    args = parser.parse_args()
+    
+    # One launch first so the OS file cache and font cache are warm unless asked otherwise
+    time_startup(args.cold)
+    times = [time_startup(args.cold) for _ in range(args.runs)]
+    
+    label = "cold" if args.cold else "warm"
+    print(f"{label} startup over {args.runs} runs: median {statistics.median(times) * 1000:.0f}ms, "
+          f"min {min(times) * 1000:.0f}ms, max {max(times) * 1000:.0f}ms")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,148 @@
+import math
+
+# How far a swept body is left inside the surface it stopped at. The usual
+# overlap checks then see the contact and resolve it like any other
+# (landing, wall slides), where exactly touching wouldn't count as a hit.
+CONTACT_DEPTH = 1
+
+def segment_vs_rect(x0, y0, x1, y1, rect, pad_x=0, pad_y=0):
+    """Where the segment from (x0, y0) to (x1, y1) first enters rect, grown by pad_x/pad_y.
+    
+    Returns (t, normal_x, normal_y) with t from 0 to 1 along the segment and
+    the normal of the side that was hit, or None if it misses. A segment
+    that starts inside gives t = 0 with a zero normal.
+    """
+    left = rect.left - pad_x
+    right = rect.right + pad_x
+    top = rect.top - pad_y
+    bottom = rect.bottom + pad_y
+    
+    t_enter = -math.inf
+    t_exit = math.inf
+    normal_x = normal_y = 0
+    
+    # Slab test, one axis at a time
+    for start, delta, low, high, axis in ((x0, x1 - x0, left, right, 0), (y0, y1 - y0, top, bottom, 1)):
+        if delta == 0:
+            # Moving parallel to this slab, touching the edge doesn't count
+            if start <= low or start >= high:
+                return None
+            continue
+        
+        t0 = (low - start) / delta
+        t1 = (high - start) / delta
+        if t0 > t1:
+            t0, t1 = t1, t0
+        
+        if t0 > t_enter:
+            t_enter = t0
+            normal_x, normal_y = (-math.copysign(1, delta), 0) if axis == 0 else (0, -math.copysign(1, delta))
+        t_exit = min(t_exit, t1)
+    
+    if t_enter >= t_exit or t_exit <= 0 or t_enter > 1:
+        return None
+    if t_enter < 0:
+        return (0.0, 0, 0)
+    return (t_enter, normal_x, normal_y)
+
+def sweep_box(left, top, width, height, dx, dy, rect):
+    """Time of impact of a box moving by (dx, dy) with rect, as (t, normal_x, normal_y) or None.
+    
+    Boxes that already overlap rect are left to the overlap checks and give None.
+    """
+    half_w = width / 2
+    half_h = height / 2
+    x = left + half_w
+    y = top + half_h
+    hit = segment_vs_rect(x, y, x + dx, y + dy, rect, half_w, half_h)
+    if hit is None or (hit[1] == 0 and hit[2] == 0):
+        return None
+    return hit
+
+def move_box(left, top, width, height, dx, dy, rects):
+    """Slide a box by (dx, dy), stopping each axis at the first rect in the way.
+    
+    Returns the (dx, dy) actually moved, ending CONTACT_DEPTH inside any
+    surface that was hit, so nothing fast can pass through a thin rect
+    between two overlap checks.
+    """
+    moved_x = moved_y = 0
+    push_x = push_y = 0
+    
+    # One stop per axis at most: a floor, then maybe a wall
+    for _ in range(2):
+        if dx == 0 and dy == 0:
+            break
+        
+        first = None
+        for rect in rects:
+            hit = sweep_box(left + moved_x, top + moved_y, width, height, dx, dy, rect)
+            if hit is not None and (first is None or hit[0] < first[0]):
+                first = hit
+        
+        if first is None:
+            moved_x += dx
+            moved_y += dy
+            break
+        
+        # Move up to the contact, then keep only the motion along the surface
+        t, normal_x, normal_y = first
+        moved_x += dx * t
+        moved_y += dy * t
+        dx *= 1 - t
+        dy *= 1 - t
+        if normal_x:
+            dx = 0
+            push_x = -normal_x * CONTACT_DEPTH
+        else:
+            dy = 0
+            push_y = -normal_y * CONTACT_DEPTH
+    
+    return moved_x + push_x, moved_y + push_y
+
+# Collision layers, one bit each. Every object carries its layer and a mask of the layers it
+# interacts with, and a pair is only ever tested when both sides take the other in. New kinds
+# of object get a layer and a line in INTERACTIONS, and the loops skip them everywhere else.
+LAYER_PLAYER = 1
+LAYER_ENEMY = 2
+LAYER_MINION = 4  # Boss minions
+LAYER_PLAYER_BULLET = 8
+LAYER_ENEMY_BULLET = 16
+LAYER_PLATFORM = 32
+LAYER_POWERUP = 64
+
+# Pairs of layers that interact, anything not listed is never tested
+INTERACTIONS = (
+    (LAYER_PLAYER_BULLET, LAYER_ENEMY),
+    (LAYER_PLAYER_BULLET, LAYER_MINION),
+    (LAYER_ENEMY_BULLET, LAYER_PLAYER),
+    (LAYER_ENEMY, LAYER_PLAYER),
+    (LAYER_MINION, LAYER_PLAYER),
+    (LAYER_PLATFORM, LAYER_PLAYER),
+    (LAYER_PLATFORM, LAYER_ENEMY),
+    (LAYER_PLATFORM, LAYER_MINION),
+    (LAYER_POWERUP, LAYER_PLAYER)
+)
+
+def mask_for(layer):
+    """Every layer that interacts with layer, the mask matrix row for it"""
+    mask = 0
+    for first, second in INTERACTIONS:
+        if first == layer:
+            mask |= second
+        if second == layer:
+            mask |= first
+    return mask
+
+def set_layer(obj, layer):
+    """Move an object to another layer, along with that layer's mask"""
+    obj.collision_layer = layer
+    obj.collision_mask = mask_for(layer)
+
+def collides(a, b):
+    """Whether a and b are meant to be tested against each other at all"""
+    return bool(a.collision_mask & b.collision_layer) and bool(b.collision_mask & a.collision_layer)
+
+def candidates(objects, layer):
+    """The objects that interact with layer, filtered once before a loop of pair tests"""
+    return [obj for obj in objects if obj.collision_mask & layer]
\ No newline at end of file
@@ -25,4 +25,5 @@ GRAVITY = 1500
 FRICTION = 0.85
 
 # Game settings
-FPS = 60
\ No newline at end of file
+FPS = 60
+MENU_FPS = 15  # Menus and overlays are still images, no need to redraw them often
\ No newline at end of file
@@ -0,0 +1,215 @@
+import numpy as np
+from constants import *
+import kernels
+
+# Component flags, combined into each entity's mask
+TRANSFORM = 1
+VELOCITY = 2
+COLLIDER = 4
+HEALTH = 8
+LIFETIME = 16
+RENDER = 32
+
+# Per-entity arrays and their types. Components an entity doesn't have keep
+# neutral values (zero velocity, zero gravity) so systems can run over whole
+# slices without checking masks entity by entity.
+FIELDS = {
+    'ids': np.int64,
+    'mask': np.uint16,
+    'kind': np.uint8,
+    'x': np.float32,  # Transform
+    'y': np.float32,
+    'vel_x': np.float32,  # Velocity
+    'vel_y': np.float32,
+    'gravity': np.float32,
+    'width': np.float32,  # Collider
+    'height': np.float32,
+    'health': np.float32,  # Health
+    'lifetime': np.float32,  # Lifetime
+    'max_lifetime': np.float32,
+    'size': np.float32,  # Render
+    'red': np.uint8,
+    'green': np.uint8,
+    'blue': np.uint8
+}
+
+class World:
+    """Entity storage as dense, parallel component arrays.
+    
+    Live entities are always packed into slots [0, count), so every system
+    walks contiguous arrays regardless of how many kinds of entity exist.
+    Removing entities moves the survivors down, so hold on to ids rather
+    than slots across frames.
+    """
+    def __init__(self, capacity=256):
+        self.capacity = capacity
+        self.count = 0
+        self.next_id = 0
+        for name, dtype in FIELDS.items():
+            setattr(self, name, np.zeros(capacity, dtype=dtype))
+    
+    def __len__(self):
+        return self.count
+    
+    def grow(self, needed):
+        """Make room for at least needed entities, doubling to keep appends cheap"""
+        if needed <= self.capacity:
+            return
+        
+        capacity = self.capacity
+        while capacity < needed:
+            capacity *= 2
+        
+        for name, dtype in FIELDS.items():
+            array = np.zeros(capacity, dtype=dtype)
+            array[:self.count] = getattr(self, name)[:self.count]
+            setattr(self, name, array)
+        self.capacity = capacity
+    
+    def create(self, kind=0, **components):
+        """Add one entity and return its id"""
+        ids = self.create_many(1, kind, **{name: [value] for name, value in components.items()})
+        return int(ids[0])
+    
+    def create_many(self, n, kind=0, x=0, y=0, vel_x=None, vel_y=None, gravity=0, width=None,
+                    height=None, health=None, lifetime=None, size=None, color=None):
+        """Add n entities at once from scalars or length-n arrays, returns their ids.
+        
+        The component mask is worked out from which arguments were given.
+        """
+        start = self.count
+        stop = start + n
+        self.grow(stop)
+        
+        mask = TRANSFORM
+        self.x[start:stop] = x
+        self.y[start:stop] = y
+        
+        if vel_x is not None or vel_y is not None:
+            mask |= VELOCITY
+            self.vel_x[start:stop] = 0 if vel_x is None else vel_x
+            self.vel_y[start:stop] = 0 if vel_y is None else vel_y
+            self.gravity[start:stop] = gravity
+        else:
+            self.vel_x[start:stop] = 0
+            self.vel_y[start:stop] = 0
+            self.gravity[start:stop] = 0
+        
+        if width is not None:
+            mask |= COLLIDER
+            self.width[start:stop] = width
+            self.height[start:stop] = width if height is None else height
+        
+        if health is not None:
+            mask |= HEALTH
+            self.health[start:stop] = health
+        
+        if lifetime is not None:
+            mask |= LIFETIME
+            self.lifetime[start:stop] = lifetime
+            self.max_lifetime[start:stop] = lifetime
+        
+        if size is not None or color is not None:
+            mask |= RENDER
+            self.size[start:stop] = 1 if size is None else size
+            color = np.asarray((255, 255, 255) if color is None else color, dtype=np.uint8)
+            if color.ndim == 1:
+                color = np.broadcast_to(color, (n, 3))
+            self.red[start:stop] = color[:, 0]
+            self.green[start:stop] = color[:, 1]
+            self.blue[start:stop] = color[:, 2]
+        
+        self.mask[start:stop] = mask
+        self.kind[start:stop] = kind
+        ids = np.arange(self.next_id, self.next_id + n, dtype=np.int64)
+        self.ids[start:stop] = ids
+        self.next_id += n
+        self.count = stop
+        
+        return ids
+    
+    def slot(self, entity_id):
+        """Current slot of an entity, or -1 if it no longer exists"""
+        found = np.flatnonzero(self.ids[:self.count] == entity_id)
+        return int(found[0]) if len(found) else -1
+    
+    def remove(self, dead):
+        """Remove entities flagged in a boolean array over the live slots"""
+        if not dead.any():
+            return
+        
+        keep = ~dead
+        count = int(keep.sum())
+        for name in FIELDS:
+            array = getattr(self, name)
+            array[:count] = array[:self.count][keep]
+        self.count = count
+    
+    def destroy(self, entity_id):
+        slot = self.slot(entity_id)
+        if slot >= 0:
+            dead = np.zeros(self.count, dtype=bool)
+            dead[slot] = True
+            self.remove(dead)
+    
+    def clear(self):
+        self.count = 0
+    
+    def copy(self):
+        """Independent copy of the live entities, e.g. for another thread to read"""
+        world = World.__new__(World)
+        world.capacity = max(1, self.count)
+        world.count = self.count
+        world.next_id = self.next_id
+        for name in FIELDS:
+            setattr(world, name, getattr(self, name)[:world.capacity].copy())
+        return world
+    
+    def query(self, components):
+        """Slots of live entities that have all the given components"""
+        mask = self.mask[:self.count]
+        return np.flatnonzero((mask & components) == components)
+
+# Systems
+
+def integrate(world, dt):
+    """Apply gravity and move everything with a velocity"""
+    kernels.integrate(world.x, world.y, world.vel_x, world.vel_y, world.gravity, world.count, dt)
+
+def expire(world, dt):
+    """Count down lifetimes and remove entities that ran out, returns which of the old slots went"""
+    n = world.count
+    timed = (world.mask[:n] & LIFETIME) != 0
+    world.lifetime[:n] -= dt * timed
+    dead = timed & (world.lifetime[:n] <= 0)
+    world.remove(dead)
+    return dead
+
+def offscreen(world, margin):
+    """Flags over the live slots of entities more than margin pixels outside the screen"""
+    n = world.count
+    x = world.x[:n]
+    y = world.y[:n]
+    return (x < -margin) | (x > SCREEN_WIDTH + margin) | (y < -margin) | (y > SCREEN_HEIGHT + margin)
+
+def overlapping(world, rect):
+    """Slots of collider entities that overlap a pygame.Rect (colliders are centered on x, y)"""
+    n = world.count
+    half_w = world.width[:n] / 2
+    half_h = world.height[:n] / 2
+    hit = ((world.mask[:n] & COLLIDER) != 0) & \
+          (world.x[:n] + half_w > rect.left) & (world.x[:n] - half_w < rect.right) & \
+          (world.y[:n] + half_h > rect.top) & (world.y[:n] - half_h < rect.bottom)
+    return np.flatnonzero(hit)
+
+def render_state(world):
+    """Per-slot radius and alpha for renderable entities, fading and shrinking with lifetime"""
+    slots = world.query(RENDER)
+    life = np.ones(len(slots), dtype=np.float32)
+    timed = (world.mask[slots] & LIFETIME) != 0
+    life[timed] = world.lifetime[slots[timed]] / world.max_lifetime[slots[timed]]
+    np.clip(life, 0, 1, out=life)
+    
+    radius = (world.size[slots] * life).astype(np.int32)
+    alpha = (255 * life).astype(np.int32)
+    return slots, radius, alpha
\ No newline at end of file
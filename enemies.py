@@ -3,14 +3,35 @@ import random
 import math
 from constants import *
 from projectiles import HomingMissile, ExplosiveBullet
+from sprites import SpriteCache
+from fonts import get_font
+from collision import move_box, collides, set_layer, mask_for, LAYER_ENEMY, LAYER_MINION, LAYER_PLATFORM
+from patterns import PATTERNS, CHARGE_BURST, SLAM_WAVE, Emitter, emit
+from platforms import get_bounds
+import kernels
+
+# Bodies, health bars and boss shields are drawn once per look and reused
+enemy_frames = SpriteCache()
+
+# Empty border around the hitbox in each frame, so outlines and cannons aren't clipped
+FRAME_MARGIN = 4
 
 class Enemy:
+    collision_layer = LAYER_ENEMY
+    collision_mask = mask_for(LAYER_ENEMY)
+    simulation_only = ()  # Attributes snapshots for drawing leave out
+    
     def __init__(self, x, y, enemy_type="basic"):
+        self.rect = pygame.Rect(0, 0, 0, 0)
+        self.reset(x, y, enemy_type)
+    
+    def reset(self, x, y, enemy_type="basic"):
+        """Start over as a fresh enemy of a type, so a pool can hand the same object out again"""
         self.x = x
         self.y = y
         self.width = 40
         self.height = 40
-        self.rect = pygame.Rect(x - self.width/2, y - self.height/2, self.width, self.height)
+        self.rect.update(x - self.width/2, y - self.height/2, self.width, self.height)
         self.enemy_type = enemy_type
         self.vel_x = 0
         self.vel_y = 0
@@ -76,8 +97,9 @@ class Enemy:
         dy = player.y - self.y
         dist = math.sqrt(dx*dx + dy*dy)
         
-        # Always move towards player
-        self.vel_x = (dx/dist) * self.move_speed
+        # Always move towards player (unless standing right on top of them)
+        if dist > 0:
+            self.vel_x = (dx/dist) * self.move_speed
         
         # Improved platform navigation
         # Check if there's ground ahead
@@ -140,8 +162,7 @@ class Enemy:
             self.vel_y = 800
         
         # Update position
-        self.x += self.vel_x * dt
-        self.y += self.vel_y * dt
+        self.move(dt, platforms)
         
         # Update facing direction
         if self.vel_x > 0:
@@ -159,7 +180,8 @@ class Enemy:
         dist = math.sqrt(dx*dx + dy*dy)
         
         # Always pursue the player aggressively
-        self.vel_x = (dx/dist) * self.move_speed
+        if dist > 0:
+            self.vel_x = (dx/dist) * self.move_speed
         
         # Jump if near a wall or gap
         ground_check_x = self.x + self.vel_x * dt + (self.width/2 * (1 if self.vel_x > 0 else -1))
@@ -196,8 +218,7 @@ class Enemy:
             self.vel_y = 800
         
         # Update position
-        self.x += self.vel_x * dt
-        self.y += self.vel_y * dt
+        self.move(dt, platforms)
         
         # Update facing direction
         if self.vel_x > 0:
@@ -238,8 +259,7 @@ class Enemy:
             self.vel_y = 800
         
         # Update position
-        self.x += self.vel_x * dt
-        self.y += self.vel_y * dt
+        self.move(dt, platforms)
         
         # Update facing direction
         if self.vel_x > 0:
@@ -287,8 +307,7 @@ class Enemy:
             self.vel_y = 800
         
         # Update position
-        self.x += self.vel_x * dt
-        self.y += self.vel_y * dt
+        self.move(dt, platforms)
         
         # Update facing direction
         if self.vel_x > 0:
@@ -299,39 +318,26 @@ class Enemy:
         # Handle collisions with platforms
         self.handle_platform_collisions(platforms)
     
+    def move(self, dt, platforms):
+        """Move by the current velocity, swept against platforms so falls can't skip through them"""
+        rects = [platform.rect for platform in platforms] if self.collision_mask & LAYER_PLATFORM else []
+        move_x, move_y = move_box(self.x - self.width/2, self.y - self.height/2, self.rect.width, self.rect.height,
+                                  self.vel_x * dt, self.vel_y * dt, rects)
+        self.x += move_x
+        self.y += move_y
+        
+        # Overlap checks right after this need the rect where the enemy is now
+        self.rect.x = self.x - self.width/2
+        self.rect.y = self.y - self.height/2
+    
     def handle_platform_collisions(self, platforms):
-        # Reset ground status
-        self.on_ground = False
-        
-        # Check each platform
-        for platform in platforms:
-            if platform.rect.colliderect(self.rect):
-                # Get the collision depth on each axis
-                dx_left = self.rect.right - platform.rect.left
-                dx_right = platform.rect.right - self.rect.left
-                dy_top = self.rect.bottom - platform.rect.top
-                dy_bottom = platform.rect.bottom - self.rect.top
-                
-                # Find the shallowest penetration
-                min_dx = min(dx_left, dx_right)
-                min_dy = min(dy_top, dy_bottom)
-                
-                if min_dx < min_dy:
-                    # Horizontal collision
-                    if dx_left < dx_right:
-                        self.x = platform.rect.left - self.width/2
-                    else:
-                        self.x = platform.rect.right + self.width/2
-                    self.vel_x = 0
-                else:
-                    # Vertical collision
-                    if dy_top < dy_bottom:
-                        self.y = platform.rect.top - self.height/2
-                        self.vel_y = 0
-                        self.on_ground = True
-                    else:
-                        self.y = platform.rect.bottom + self.height/2
-                        self.vel_y = 0
+        # Push out of every overlapping platform along its shallowest axis, all platforms in one kernel call
+        if not self.collision_mask & LAYER_PLATFORM:
+            return
+        rect = self.rect
+        self.x, self.y, self.vel_x, self.vel_y, self.on_ground = kernels.resolve_body(
+            rect.left, rect.top, rect.right, rect.bottom, self.x, self.y, self.width/2, self.height/2,
+            self.vel_x, self.vel_y, get_bounds(platforms))
     
     def update_animation(self, dt):
         self.animation_timer += dt
@@ -362,22 +368,26 @@ class Enemy:
             enemy_bullets.append(missile)
             self.shoot_cooldown = self.shoot_delay
     
-    def draw(self, surface):
+    def draw(self, surface, health_bar=True):
         # Flash red when damaged
         color = RED if self.damaged_timer > 0 else self.get_color()
         
         # Draw enemy body
-        if self.enemy_type == "basic":
-            self.draw_basic(surface, color)
-        elif self.enemy_type == "runner":
-            self.draw_runner(surface, color)
-        elif self.enemy_type == "tank":
-            self.draw_tank(surface, color)
-        elif self.enemy_type == "shooter":
-            self.draw_shooter(surface, color)
-        
-        # Draw health bar
-        self.draw_health_bar(surface)
+        if self.enemy_type in BODY_DRAWERS:
+            # Shooter cores pulse, the radius only takes a few whole pixel sizes
+            core_radius = 0
+            if self.enemy_type == "shooter":
+                core_pulse = 0.5 + 0.5 * math.sin(pygame.time.get_ticks() / 200)
+                core_radius = int(8 + 2 * core_pulse)
+            
+            key = (self.enemy_type, self.width, self.height, self.rect.size, color,
+                   self.facing_right, core_radius)
+            frame = enemy_frames.get(key, render_enemy_frame, *key)
+            surface.blit(frame, (self.rect.x - FRAME_MARGIN, self.rect.y - FRAME_MARGIN))
+        
+        # Draw health bar, unless the caller batches them with draw_health_bars
+        if health_bar:
+            self.draw_health_bar(surface)
     
     def get_color(self):
         if self.enemy_type == "runner":
@@ -389,95 +399,144 @@ class Enemy:
         else:
             return (150, 150, 150)  # Gray
     
-    def draw_basic(self, surface, color):
-        # Simple square with eyes
-        pygame.draw.rect(surface, color, self.rect)
-        pygame.draw.rect(surface, BLACK, self.rect, 2)
-        
-        # Eyes
-        eye_x = self.x + (10 if self.facing_right else -10)
-        pygame.draw.circle(surface, WHITE, (int(eye_x), int(self.y)), 5)
-        pygame.draw.circle(surface, BLACK, (int(eye_x + (2 if self.facing_right else -2)), int(self.y)), 2)
-    
-    def draw_runner(self, surface, color):
-        # Triangular shape for speed appearance
-        points = [
-            (self.x + (self.width/2 if self.facing_right else -self.width/2), self.y),
-            (self.x + (-self.width/2 if self.facing_right else self.width/2), self.y - self.height/2),
-            (self.x + (-self.width/2 if self.facing_right else self.width/2), self.y + self.height/2)
-        ]
-        pygame.draw.polygon(surface, color, points)
-        pygame.draw.polygon(surface, BLACK, points, 2)
-        
-        # Eye
-        eye_x = self.x + (10 if self.facing_right else -10)
-        pygame.draw.circle(surface, WHITE, (int(eye_x), int(self.y)), 4)
-        pygame.draw.circle(surface, BLACK, (int(eye_x + (2 if self.facing_right else -2)), int(self.y)), 2)
-    
-    def draw_tank(self, surface, color):
-        # Heavier, armored appearance
-        pygame.draw.rect(surface, color, self.rect)
-        
-        # Armor plates
-        plate_spacing = 10
-        for i in range(3):
-            plate_y = self.rect.y + i * plate_spacing
-            pygame.draw.line(surface, BLACK, 
-                           (self.rect.left, plate_y),
-                           (self.rect.right, plate_y), 3)
-        
-        # Viewport
-        viewport_width = 20
-        viewport_x = self.x + (viewport_width/2 if self.facing_right else -viewport_width/2)
-        viewport_rect = pygame.Rect(viewport_x - viewport_width/2, self.y - 5, viewport_width, 10)
-        pygame.draw.rect(surface, (200, 0, 0), viewport_rect)
-        pygame.draw.rect(surface, BLACK, viewport_rect, 2)
-    
-    def draw_shooter(self, surface, color):
-        # Base body
-        pygame.draw.rect(surface, color, self.rect)
-        pygame.draw.rect(surface, BLACK, self.rect, 2)
-        
-        # Cannon
-        cannon_length = 20
-        cannon_x = self.x + (cannon_length if self.facing_right else -cannon_length)
-        pygame.draw.line(surface, BLACK,
-                        (self.x, self.y),
-                        (cannon_x, self.y), 6)
-        
-        # Energy core
-        core_pulse = 0.5 + 0.5 * math.sin(pygame.time.get_ticks() / 200)
-        core_radius = 8 + 2 * core_pulse
-        pygame.draw.circle(surface, (100, 100, 255), (int(self.x), int(self.y)), int(core_radius))
-    
-    def draw_health_bar(self, surface):
+    def health_bar(self):
+        """The health bar surface and where it goes, ready for Surface.blits"""
         bar_width = 40
         bar_height = 5
         bar_x = self.x - bar_width/2
         bar_y = self.rect.y - 10
         
-        # Background
-        pygame.draw.rect(surface, (50, 50, 50),
-                        (bar_x, bar_y, bar_width, bar_height))
-        
         # Health fill
         health_percent = self.health / self.max_health
-        if health_percent > 0:
-            health_color = GREEN
-            if health_percent < 0.5:
-                health_color = YELLOW
-            if health_percent < 0.25:
-                health_color = RED
-            
-            pygame.draw.rect(surface, health_color,
-                           (bar_x, bar_y, bar_width * health_percent, bar_height))
+        health_color = GREEN
+        if health_percent < 0.5:
+            health_color = YELLOW
+        if health_percent < 0.25:
+            health_color = RED
+        filled = max(0, int(bar_width * health_percent))
+        
+        key = ('health', bar_width, bar_height, filled, health_color)
+        bar = enemy_frames.get(key, render_health_bar, bar_width, bar_height, filled, health_color)
+        return bar, (int(bar_x), bar_y)
+    
+    def draw_health_bar(self, surface):
+        bar, position = self.health_bar()
+        surface.blit(bar, position)
     
     def check_collision(self, entity):
         """Check collision with another entity"""
-        return self.rect.colliderect(entity.rect)
+        return collides(self, entity) and self.rect.colliderect(entity.rect)
+
+
+def render_enemy_frame(enemy_type, width, height, rect_size, color, facing_right, core_radius):
+    """Draw one enemy look onto its own surface, with the hitbox's top left at FRAME_MARGIN"""
+    rect_w, rect_h = rect_size
+    frame = pygame.Surface((max(width, rect_w) + FRAME_MARGIN * 2, max(height, rect_h) + FRAME_MARGIN * 2),
+                           pygame.SRCALPHA)
+    
+    # The hitbox can be smaller than width x height (tanks), so it isn't always centered
+    rect = pygame.Rect(FRAME_MARGIN, FRAME_MARGIN, rect_w, rect_h)
+    x = FRAME_MARGIN + width / 2
+    y = FRAME_MARGIN + height / 2
+    
+    BODY_DRAWERS[enemy_type](frame, rect, x, y, width, height, color, facing_right, core_radius)
+    return frame
+
+def draw_basic(surface, rect, x, y, width, height, color, facing_right, core_radius):
+    # Simple square with eyes
+    pygame.draw.rect(surface, color, rect)
+    pygame.draw.rect(surface, BLACK, rect, 2)
+    
+    # Eyes
+    eye_x = x + (10 if facing_right else -10)
+    pygame.draw.circle(surface, WHITE, (int(eye_x), int(y)), 5)
+    pygame.draw.circle(surface, BLACK, (int(eye_x + (2 if facing_right else -2)), int(y)), 2)
+
+def draw_runner(surface, rect, x, y, width, height, color, facing_right, core_radius):
+    # Triangular shape for speed appearance
+    points = [
+        (x + (width/2 if facing_right else -width/2), y),
+        (x + (-width/2 if facing_right else width/2), y - height/2),
+        (x + (-width/2 if facing_right else width/2), y + height/2)
+    ]
+    pygame.draw.polygon(surface, color, points)
+    pygame.draw.polygon(surface, BLACK, points, 2)
+    
+    # Eye
+    eye_x = x + (10 if facing_right else -10)
+    pygame.draw.circle(surface, WHITE, (int(eye_x), int(y)), 4)
+    pygame.draw.circle(surface, BLACK, (int(eye_x + (2 if facing_right else -2)), int(y)), 2)
+
+def draw_tank(surface, rect, x, y, width, height, color, facing_right, core_radius):
+    # Heavier, armored appearance
+    pygame.draw.rect(surface, color, rect)
+    
+    # Armor plates
+    plate_spacing = 10
+    for i in range(3):
+        plate_y = rect.y + i * plate_spacing
+        pygame.draw.line(surface, BLACK,
+                       (rect.left, plate_y),
+                       (rect.right, plate_y), 3)
+    
+    # Viewport
+    viewport_width = 20
+    viewport_x = x + (viewport_width/2 if facing_right else -viewport_width/2)
+    viewport_rect = pygame.Rect(viewport_x - viewport_width/2, y - 5, viewport_width, 10)
+    pygame.draw.rect(surface, (200, 0, 0), viewport_rect)
+    pygame.draw.rect(surface, BLACK, viewport_rect, 2)
+
+def draw_shooter(surface, rect, x, y, width, height, color, facing_right, core_radius):
+    # Base body
+    pygame.draw.rect(surface, color, rect)
+    pygame.draw.rect(surface, BLACK, rect, 2)
+    
+    # Cannon
+    cannon_length = 20
+    cannon_x = x + (cannon_length if facing_right else -cannon_length)
+    pygame.draw.line(surface, BLACK,
+                    (x, y),
+                    (cannon_x, y), 6)
+    
+    # Energy core
+    pygame.draw.circle(surface, (100, 100, 255), (int(x), int(y)), core_radius)
+
+# Enemy types with a body to draw, the boss only shows its shield and health
+BODY_DRAWERS = {
+    "basic": draw_basic,
+    "runner": draw_runner,
+    "tank": draw_tank,
+    "shooter": draw_shooter
+}
+
+def render_health_bar(bar_width, bar_height, filled, health_color):
+    bar = pygame.Surface((bar_width, bar_height), pygame.SRCALPHA)
+    
+    # Background
+    bar.fill((50, 50, 50))
+    
+    # Health fill
+    if filled > 0:
+        pygame.draw.rect(bar, health_color, (0, 0, filled, bar_height))
+    return bar
+
+def render_shield(shield_radius, shield_alpha):
+    shield_surface = pygame.Surface((shield_radius*2, shield_radius*2), pygame.SRCALPHA)
+    pygame.draw.circle(shield_surface, (100, 200, 255, shield_alpha),
+                     (shield_radius, shield_radius), shield_radius)
+    return shield_surface
+
+def draw_health_bars(surface, enemies):
+    """Draw every enemy's health bar in one batched blit"""
+    surface.blits([enemy.health_bar() for enemy in enemies], False)
 
 
 class Boss(Enemy):
+    # Health fractions where phase 2 and phase 3 begin
+    phase_thresholds = (0.66, 0.33)
+    # Shared game lists and attack state, none of it drawn
+    simulation_only = ('minions', 'enemies', 'enemy_bullets', 'bullet_field', 'emitters')
+    
     def __init__(self, x, y):
         super().__init__(x, y, "boss")
         self.width = 80
@@ -497,12 +556,23 @@ class Boss(Enemy):
         self.shield_health = 100
         self.shield_max = 100
         self.minions = []
+        self.enemies = None  # Shared enemy list that spawned minions are added to
         self.minion_spawn_timer = 0
         self.rage_mode = False
         self.charge_target = None
         self.charge_speed = 500
+        self.charge_direction = 0
+        self.charge_timer = 0
+        self.pounding = False
+        self.pound_timer = 0
+        self.enemy_bullets = []
+        self.bullet_field = None  # Shared BulletField the pattern emitters fire into, none means no patterns
+        self.reset_emitters()
     
     def update(self, dt, player, platforms, enemy_bullets):
+        # Keep a handle on the shared bullet list for attacks started below
+        self.enemy_bullets = enemy_bullets
+        
         super().update(dt, player, platforms, enemy_bullets)
         
         # Update attack timer
@@ -526,17 +596,66 @@ class Boss(Enemy):
             self.phase = current_phase
             self.on_phase_change()
         
-        # Update minions
-        for minion in self.minions[:]:
-            minion.update(dt, player, platforms, enemy_bullets)
-            if minion.health <= 0:
-                self.minions.remove(minion)
+        # Bullet patterns of the current phase
+        if self.bullet_field is not None:
+            for emitter in self.emitters:
+                emitter.update(dt, self.x, self.y, player, self.bullet_field)
+        
+        # Minions are updated with the other enemies, just forget the dead ones
+        self.minions = [minion for minion in self.minions if minion.health > 0]
+    
+    def reset_emitters(self):
+        """Start the bullet patterns for the current phase from the top"""
+        self.emitters = [Emitter(spec) for spec in PATTERNS.get(self.phase, ())]
+    
+    def update_basic(self, dt, player, platforms):
+        # Charges and ground pounds take over movement until they finish
+        if self.charge_target is not None:
+            self.update_charge(dt, platforms)
+        elif self.pounding:
+            self.update_ground_pound(dt, platforms)
+        else:
+            super().update_basic(dt, player, platforms)
+    
+    def update_charge(self, dt, platforms):
+        if self.charge_direction == 0:
+            self.charge_direction = 1 if self.charge_target > self.x else -1
+        self.vel_x = self.charge_speed * self.charge_direction
+        self.vel_y = min(self.vel_y + GRAVITY * dt, 800)
+        self.move(dt, platforms)
+        self.facing_right = self.charge_direction > 0
+        self.handle_platform_collisions(platforms)
+        
+        # Done once past the target, stopped by a wall or out of time
+        self.charge_timer -= dt
+        passed = (self.charge_target - self.x) * self.charge_direction <= 0
+        if passed or self.vel_x == 0 or self.charge_timer <= 0:
+            self.charge_target = None
+            self.charge_direction = 0
+            self.vel_x = 0
+            if self.bullet_field is not None:
+                emit(CHARGE_BURST, self.bullet_field, self.x, self.y)
+    
+    def update_ground_pound(self, dt, platforms):
+        # Hang at the top of the jump, then come down twice as hard
+        self.vel_x = 0
+        self.vel_y = min(self.vel_y + GRAVITY * dt * (2 if self.vel_y > 0 else 1), 1200)
+        airborne = not self.on_ground
+        self.move(dt, platforms)
+        self.handle_platform_collisions(platforms)
+        
+        self.pound_timer -= dt
+        if (airborne and self.on_ground) or self.pound_timer <= 0:
+            self.pounding = False
+            if self.on_ground and self.bullet_field is not None:
+                # Shockwave along the floor either side
+                emit(SLAM_WAVE, self.bullet_field, self.x, self.rect.bottom)
     
     def get_current_phase(self):
         health_percent = self.health / self.max_health
-        if health_percent > 0.66:
+        if health_percent > self.phase_thresholds[0]:
             return 1
-        elif health_percent > 0.33:
+        elif health_percent > self.phase_thresholds[1]:
             return 2
         else:
             return 3
@@ -552,6 +671,7 @@ class Boss(Enemy):
         self.shield_active = True
         self.shield_health = self.shield_max
         self.minion_spawn_timer = 0  # Spawn minions immediately
+        self.reset_emitters()
     
     def start_new_attack(self, player):
         self.attack_pattern = (self.attack_pattern + 1) % 3
@@ -583,27 +703,29 @@ class Boss(Enemy):
                 (255, 50, 50),
                 target
             )
-            # Fix: Use the enemy_bullets parameter instead of self.enemy_bullets
-            if hasattr(self, 'enemy_bullets'):
-                self.enemy_bullets.append(missile)
-            else:
-                # This will be the parameter from the update method
-                from main import enemy_bullets
-                enemy_bullets.append(missile)
+            self.enemy_bullets.append(missile)
     
     def start_charge_attack(self, target):
-        self.charge_target = target.x
-        # Implementation of charge behavior would go in update
+        """Rush along the floor through where the target is now, bursting into a ring at the end"""
+        overshoot = 200 if target.x > self.x else -200
+        self.charge_target = max(self.width, min(SCREEN_WIDTH - self.width, target.x + overshoot))
+        self.charge_direction = 0
+        self.charge_timer = 1.5  # Seconds before giving up
     
     def start_ground_pound(self):
+        """Jump up and slam down, sending a shockwave along the floor"""
         self.vel_y = -400  # Jump up
-        # Ground pound behavior would be implemented in update
+        self.pounding = True
+        self.pound_timer = 3.0
     
     def spawn_minion(self):
         minion = Enemy(self.x + random.randint(-100, 100),
                       self.y - 50,
                       "shooter" if random.random() < 0.5 else "runner")
+        set_layer(minion, LAYER_MINION)
         self.minions.append(minion)
+        if self.enemies is not None:
+            self.enemies.append(minion)
         self.minion_spawn_timer = 10.0  # Time until next spawn
     
     def take_damage(self, amount):
@@ -613,25 +735,20 @@ class Boss(Enemy):
         else:
             return super().take_damage(amount)
     
-    def draw(self, surface):
-        # Draw minions
-        for minion in self.minions:
-            minion.draw(surface)
-        
+    def draw(self, surface, health_bar=True):
         # Base enemy drawing
-        super().draw(surface)
+        super().draw(surface, health_bar)
         
         # Draw shield if active
         if self.shield_active:
             shield_radius = max(self.width, self.height) * 0.75
-            shield_surface = pygame.Surface((shield_radius*2, shield_radius*2), pygame.SRCALPHA)
-            shield_alpha = int(255 * (self.shield_health / self.shield_max))
-            pygame.draw.circle(shield_surface, (100, 200, 255, shield_alpha),
-                             (shield_radius, shield_radius), shield_radius)
+            shield_alpha = max(0, int(255 * (self.shield_health / self.shield_max)))
+            key = ('shield', shield_radius, shield_alpha)
+            shield_surface = enemy_frames.get(key, render_shield, shield_radius, shield_alpha)
             surface.blit(shield_surface, (self.x - shield_radius, self.y - shield_radius))
         
         # Draw phase indicator
         phase_text = f"Phase {self.phase}"
-        font = pygame.font.SysFont('arial', 24)
+        font = get_font('arial', 24)
         text_surface = font.render(phase_text, True, WHITE)
         surface.blit(text_surface, (self.x - text_surface.get_width()/2, self.rect.top - 40))
\ No newline at end of file
@@ -0,0 +1,62 @@
+# Event types
+BULLET_HIT = 0
+ENEMY_KILLED = 1
+PLAYER_DAMAGED = 2
+POWERUP_COLLECTED = 3
+
+# Events are plain tuples to keep emitting cheap inside the collision loops:
+# (event_type, x, y, value, tag, color)
+# value is points or damage, tag is the enemy type, power type or damage source.
+
+class Subscription:
+    def __init__(self, event_types, handler, budget=None):
+        self.event_types = frozenset(event_types)
+        self.handler = handler
+        self.budget = budget  # Most events handed over per dispatch, None for no limit
+        self.dropped = 0
+
+class EventBus:
+    """Collects events during the physics phase and hands them out in batches afterwards.
+
+    Handlers receive a list of events in the order they were emitted. Cosmetic
+    handlers can be given a budget; events past it are dropped for that
+    handler only, so gameplay consumers always see everything.
+    """
+    def __init__(self):
+        self.queue = []
+        self.subscriptions = []
+
+    def emit(self, event_type, x, y, value=0, tag=None, color=None):
+        self.queue.append((event_type, x, y, value, tag, color))
+
+    def subscribe(self, event_types, handler, budget=None):
+        subscription = Subscription(event_types, handler, budget)
+        self.subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        if subscription in self.subscriptions:
+            self.subscriptions.remove(subscription)
+
+    def clear(self):
+        self.queue = []
+
+    def dispatch(self):
+        """Deliver everything queued since the last dispatch"""
+        if not self.queue:
+            return
+
+        events = self.queue
+        self.queue = []
+
+        for subscription in self.subscriptions:
+            batch = [event for event in events if event[0] in subscription.event_types]
+            if not batch:
+                continue
+
+            budget = subscription.budget
+            if budget is not None and len(batch) > budget:
+                subscription.dropped += len(batch) - budget
+                batch = batch[:budget]
+
+            subscription.handler(batch)
@@ -0,0 +1,69 @@
+import os
+import json
+import pygame
+
+# Resolved font file paths are kept between runs, because finding a system
+# font by name means scanning every installed font (slow on Linux)
+FONT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "font_cache.json")
+
+# name -> path (None when the font isn't installed and the default font is used)
+_font_paths = None
+
+# (name, size) -> pygame.font.Font
+_fonts = {}
+
+def load_font_paths():
+    """Read the on-disk cache, dropping entries for font files that went away"""
+    try:
+        with open(FONT_CACHE_PATH) as f:
+            paths = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    
+    if not isinstance(paths, dict):
+        return {}
+    return {name: path for name, path in paths.items() if path is None or os.path.exists(path)}
+
+def save_font_paths(paths):
+    """Write the cache without leaving half-written files behind"""
+    try:
+        temp_path = FONT_CACHE_PATH + ".tmp"
+        with open(temp_path, "w") as f:
+            json.dump(paths, f)
+        os.replace(temp_path, FONT_CACHE_PATH)
+    except OSError:
+        # The cache is only an optimization
+        pass
+
+def resolve_font(name):
+    """Path of the system font called name, or None for pygame's default font"""
+    global _font_paths
+    if _font_paths is None:
+        _font_paths = load_font_paths()
+    
+    if name not in _font_paths:
+        _font_paths[name] = pygame.font.match_font(name)
+        save_font_paths(_font_paths)
+    
+    return _font_paths[name]
+
+def get_font(name, size):
+    """Font by system name and size, created on first use and shared afterwards"""
+    key = (name, size)
+    font = _fonts.get(key)
+    if font is None:
+        if not pygame.font.get_init():
+            pygame.font.init()
+        font = pygame.font.Font(resolve_font(name), size)
+        _fonts[key] = font
+    return font
+
+class LazyFont:
+    """Stands in for a pygame Font, only loading it the first time text is rendered"""
+    def __init__(self, name, size):
+        self.name = name
+        self.size_pt = size
+    
+    def __getattr__(self, attr):
+        # Anything not defined here (render, size, get_height...) goes to the real font
+        return getattr(get_font(self.name, self.size_pt), attr)
\ No newline at end of file
@@ -0,0 +1,587 @@
+import pygame
+import random
+import math
+from enum import Enum
+from concurrent.futures import ThreadPoolExecutor
+from constants import *
+from player import Player
+from platforms import PlatformSet, create_platform_layout
+from enemies import Enemy, Boss
+from particles import ParticleSystem
+from patterns import BulletField
+from waves import WaveDirector
+from powerups import PowerUp
+from projectiles import Shots
+from level_generator import get_level_layout, build_platforms
+from collision import candidates, LAYER_PLAYER_BULLET, LAYER_ENEMY_BULLET, LAYER_POWERUP
+from events import EventBus, BULLET_HIT, ENEMY_KILLED, PLAYER_DAMAGED, POWERUP_COLLECTED
+
+# Game states
+class GameState(Enum):
+    TITLE = 0
+    PLAYING = 1
+    LEVEL_COMPLETE = 2
+    GAME_OVER = 3
+    PAUSE = 4
+    VICTORY = 5
+    BOSS_INTRO = 6
+
+level_themes = ["forest", "ice", "desert", "volcano", "tech"]
+
+# Second player in co-op, told apart from the first by color
+PARTNER_COLOR = (250, 140, 50)
+
+# Input bits for driving the game without a keyboard (agents, replays, remote players)
+INPUT_LEFT = 1
+INPUT_RIGHT = 2
+INPUT_JUMP = 4
+INPUT_DASH = 8
+INPUT_SHOOT = 16
+
+# Keys that each input bit stands for
+INPUT_KEYS = {
+    pygame.K_LEFT: INPUT_LEFT,
+    pygame.K_a: INPUT_LEFT,
+    pygame.K_RIGHT: INPUT_RIGHT,
+    pygame.K_d: INPUT_RIGHT,
+    pygame.K_SPACE: INPUT_JUMP,
+    pygame.K_w: INPUT_JUMP,
+    pygame.K_UP: INPUT_JUMP,
+    pygame.K_LSHIFT: INPUT_DASH,
+    pygame.K_RSHIFT: INPUT_DASH
+}
+
+class InputState:
+    """Stand-in for pygame.key.get_pressed() built from an input bitmask"""
+    def __init__(self, bits=0):
+        self.bits = bits
+    
+    def __getitem__(self, key):
+        return bool(self.bits & INPUT_KEYS.get(key, 0))
+
+def keys_to_bits(pressed):
+    """Input bitmask for a pygame.key.get_pressed() result"""
+    bits = 0
+    for key, bit in INPUT_KEYS.items():
+        if pressed[key]:
+            bits |= bit
+    return bits
+
+class Game:
+    """Game session state and simulation, independent of the window and event loop"""
+    def __init__(self, total_levels=5, effects=True, enemy_overrides=None, coop=False, history=None,
+                 patterns=True):
+        self.current_level = 0
+        self.total_levels = total_levels
+        self.score = 0
+        self.lives = 3
+        self.state = GameState.TITLE
+        self.endless_mode = False
+        self.endless_seed = 0
+        self.level_layout = None  # Generated layout for the current endless level
+        self.horde = None  # WaveDirector in horde mode, where one level's enemies come in endless waves
+        
+        # Next level being built in the background: (level, future)
+        self.loader = None
+        self.preloaded = None
+        
+        self.player = None
+        self.coop = coop  # Two players sharing the lives, the second one driven by apply_partner_input
+        self.partner = None
+        self.platforms = PlatformSet()
+        self.enemies = []
+        self.bullets = Shots()  # Player shots and enemy missiles move and age as ECS entities
+        self.enemy_bullets = Shots()
+        self.powerups = []
+        self.particle_system = ParticleSystem(enabled=effects)
+        
+        # Boss bullet patterns, as arrays. Without patterns bosses only fire their missiles
+        self.patterns = patterns
+        self.bullet_field = BulletField()
+        
+        # Stat changes per enemy type, e.g. {"runner": {"move_speed": 320}}
+        self.enemy_overrides = enemy_overrides or {}
+        
+        # Combat side effects run from queued events after the physics phase
+        self.events = EventBus()
+        self.events.subscribe((ENEMY_KILLED, POWERUP_COLLECTED), self.add_score)
+        self.events.subscribe((ENEMY_KILLED, PLAYER_DAMAGED, POWERUP_COLLECTED), self.record_stats)
+        self.effects_subscription = None
+        if effects:
+            # Cosmetic, so it is the one that gets throttled when a frame gets busy
+            self.effects_subscription = self.events.subscribe(
+                (BULLET_HIT, ENEMY_KILLED, PLAYER_DAMAGED, POWERUP_COLLECTED), self.spawn_effects, budget=32)
+        self.reset_stats()
+        
+        # Previous input bits, so held jump only triggers once like a key press
+        self.last_input = 0
+        self.last_partner_input = 0
+        
+        # Optional RunHistory, each run and level attempt goes to it when they end
+        self.history = history
+        self.run_id = None
+    
+    def start(self, endless=False, seed=None, level=0, horde=False):
+        """Start a new run, from the first level unless told otherwise.
+        
+        A horde run stays on that level and fights waves rolled from the seed.
+        """
+        self.current_level = level
+        self.score = 0
+        self.lives = 3
+        self.endless_mode = endless
+        self.endless_seed = seed if seed is not None else random.randrange(1000000)
+        self.horde = WaveDirector(self.endless_seed) if horde else None
+        self.preloaded = None
+        self.initialize_level()
+        self.state = GameState.PLAYING
+        if self.history is not None:
+            self.run_id = self.history.start_run(2 if horde else self.endless_mode, self.endless_seed)
+    
+    def next_level(self):
+        """Advance past a completed level"""
+        self.current_level += 1
+        if self.current_level >= self.total_levels and not self.endless_mode:
+            self.state = GameState.VICTORY
+            self.finish_run("victory", self.total_levels - 1)
+        else:
+            self.state = GameState.PLAYING
+            if self.preloaded is not None and self.preloaded[0] == self.current_level:
+                # Usually finished while the level complete screen was up
+                self.apply_level(self.preloaded[1].result())
+            else:
+                self.initialize_level()
+        self.preloaded = None
+    
+    def get_theme(self):
+        return level_themes[self.current_level % len(level_themes)]
+    
+    def get_wave(self):
+        """(wave, seconds until the next one) in horde mode, otherwise None"""
+        if self.horde is None:
+            return None
+        return self.horde.wave, self.horde.break_timer
+    
+    def initialize_level(self):
+        """Build the player, platforms, enemies and powerups for the current level"""
+        self.apply_level(self.build_level(self.current_level))
+    
+    def build_level(self, level):
+        """Create everything for a level without touching the running game.
+        
+        Safe to call from a worker thread, the result goes to apply_level.
+        """
+        theme = level_themes[level % len(level_themes)]
+        
+        # Create player
+        player = Player(SCREEN_WIDTH // 2, SCREEN_HEIGHT - 150)
+        partner = None
+        if self.coop:
+            partner = Player(SCREEN_WIDTH // 2 + 60, SCREEN_HEIGHT - 150)
+            partner.color = PARTNER_COLOR
+        
+        # Create platforms for the level
+        if self.endless_mode:
+            # Endless levels are generated from the run seed, difficulty grows with the level
+            layout = get_level_layout(self.endless_seed, level)
+            platforms = build_platforms(layout, theme)
+        else:
+            layout = None
+            platforms = create_platform_layout(level, theme)
+        
+        return {
+            'level': level,
+            'theme': theme,
+            'layout': layout,
+            'player': player,
+            'partner': partner,
+            'platforms': platforms,
+            'powerups': self.create_powerups(platforms, layout),
+            'enemies': self.create_enemies(level, platforms, layout)
+        }
+    
+    def apply_level(self, build):
+        """Swap a built level in as the current one"""
+        self.current_level = build['level']
+        self.level_layout = build['layout']
+        self.player = build['player']
+        self.partner = build['partner']
+        self.platforms = PlatformSet(build['platforms'])
+        self.powerups = build['powerups']
+        self.enemies = build['enemies']
+        
+        # Clear other objects
+        self.bullets.clear()
+        self.enemy_bullets.clear()
+        self.bullet_field.clear()
+        self.last_input = 0
+        self.last_partner_input = 0
+        self.events.clear()
+        self.reset_stats()
+    
+    def preload_next_level(self, bake=None):
+        """Start building the next level on a worker thread, picked up by next_level.
+        
+        bake(build) runs on the worker afterwards for any art that goes with
+        the level. Headless runs don't preload, so their levels come out of
+        the global random generator in the same order every time.
+        """
+        level = self.current_level + 1
+        if level >= self.total_levels and not self.endless_mode:
+            return
+        
+        if self.loader is None:
+            self.loader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="level-loader")
+        self.preloaded = (level, self.loader.submit(self.build_and_bake, level, bake))
+    
+    def build_and_bake(self, level, bake):
+        build = self.build_level(level)
+        if bake is not None:
+            bake(build)
+        return build
+    
+    def create_powerups(self, platforms, layout):
+        """Power-ups for a level"""
+        powerups = []
+        
+        if layout is not None:
+            # Generated levels come with their own spawn points
+            for power_x, power_y, power_type in layout['powerups']:
+                powerups.append(PowerUp(power_x, power_y, power_type))
+            return powerups
+        
+        # Add 2-3 random powerups
+        num_powerups = random.randint(2, 3)
+        power_types = ["health", "speed", "jump", "shield"]
+        
+        for _ in range(num_powerups):
+            # Find a platform to place the powerup on
+            if len(platforms) > 1:  # Skip the ground platform
+                platform = random.choice(platforms[1:])
+                
+                # Place powerup on top of the platform
+                power_x = platform.x + random.randint(20, platform.width - 20)
+                power_y = platform.y - 20
+                
+                # Choose random power type
+                power_type = random.choice(power_types)
+                
+                powerups.append(PowerUp(power_x, power_y, power_type))
+        
+        return powerups
+    
+    def create_enemies(self, level, platforms, layout):
+        """Enemies based on the level"""
+        enemies = []
+        
+        if self.horde is not None:
+            # The wave director brings them in
+            return enemies
+        
+        if layout is not None:
+            for spawn_x, spawn_y, enemy_type in layout['enemies']:
+                enemies.append(self.create_enemy(spawn_x, spawn_y, enemy_type, enemies))
+            return enemies
+        
+        if level < self.total_levels - 1:
+            # Regular levels
+            num_enemies = 2 + level
+            
+            for _ in range(num_enemies):
+                # Randomly choose enemy type based on level progress
+                if level == 0:
+                    enemy_type = "basic"  # Only basic enemies in first level
+                elif level == 1:
+                    enemy_type = random.choice(["basic", "runner"])
+                elif level == 2:
+                    enemy_type = random.choice(["basic", "runner", "tank"])
+                else:
+                    enemy_type = random.choice(["basic", "runner", "tank", "shooter"])
+                
+                # Find a suitable platform to spawn the enemy
+                if len(platforms) > 1:  # Skip ground platform
+                    platform = random.choice(platforms[1:])
+                    spawn_x = platform.x + random.randint(20, platform.width - 20)
+                    spawn_y = platform.y - 30
+                    
+                    enemies.append(self.create_enemy(spawn_x, spawn_y, enemy_type, enemies))
+        else:
+            # Boss level
+            boss_x = SCREEN_WIDTH // 2
+            boss_y = SCREEN_HEIGHT // 2
+            enemies.append(self.create_enemy(boss_x, boss_y, "boss", enemies))
+        
+        return enemies
+    
+    def create_enemy(self, x, y, enemy_type, enemies=None, pool=None):
+        """Create an enemy (or take one from an EnemyPool) and apply any stat overrides for its type"""
+        if pool is not None:
+            enemy = pool.acquire(x, y, enemy_type)
+        elif enemy_type == "boss":
+            enemy = Boss(x, y)
+            # Minions join the shared list so bullets can hit them
+            enemy.enemies = self.enemies if enemies is None else enemies
+            if self.patterns:
+                enemy.bullet_field = self.bullet_field
+        else:
+            enemy = Enemy(x, y, enemy_type)
+        
+        for name, value in self.enemy_overrides.get(enemy_type, {}).items():
+            setattr(enemy, name, value)
+        
+        return enemy
+    
+    def reset_stats(self):
+        """Per-level combat stats, filled in from events"""
+        self.kills = {}  # enemy_type -> count
+        self.damage_taken = 0
+        self.powerups_collected = {}  # power_type -> count
+        self.level_time = 0.0
+    
+    def record_level(self, outcome):
+        """Queue the current level's stats in the run history, if there is one"""
+        if self.history is not None and self.run_id is not None:
+            self.history.record_level(self.run_id, self.level_reached(), outcome, self.level_time,
+                                      self.damage_taken, self.score, self.kills, self.powerups_collected)
+    
+    def finish_run(self, outcome, level=None):
+        """Queue the run's final score and the last level it reached"""
+        if self.history is not None and self.run_id is not None:
+            level = self.level_reached() if level is None else level
+            self.history.finish_run(self.run_id, self.score, level, outcome)
+            self.run_id = None
+    
+    def level_reached(self):
+        """What the run history calls a level: the wave in horde mode"""
+        return self.current_level if self.horde is None else self.horde.wave
+    
+    def add_score(self, events):
+        for event in events:
+            self.score += event[3]
+    
+    def record_stats(self, events):
+        for event_type, x, y, value, tag, color in events:
+            if event_type == ENEMY_KILLED:
+                self.kills[tag] = self.kills.get(tag, 0) + 1
+            elif event_type == PLAYER_DAMAGED:
+                self.damage_taken += value
+            elif event_type == POWERUP_COLLECTED:
+                self.powerups_collected[tag] = self.powerups_collected.get(tag, 0) + 1
+    
+    def spawn_effects(self, events):
+        # Particle bursts sized by what happened
+        particle_system = self.particle_system
+        for event_type, x, y, value, tag, color in events:
+            if event_type == BULLET_HIT or event_type == POWERUP_COLLECTED:
+                particle_system.create_explosion(x, y, color, 15)
+            elif event_type == ENEMY_KILLED:
+                particle_system.create_explosion(x, y, color, 20)
+            elif event_type == PLAYER_DAMAGED:
+                particle_system.create_explosion(x, y, color, 10 if tag == "bullet" else 15)
+    
+    def apply_input(self, bits):
+        """Feed one frame of bitmask input, the headless version of handle_events"""
+        pressed = bits & ~self.last_input
+        self.last_input = bits
+        
+        if pressed & INPUT_JUMP:
+            self.player.jump()
+        if bits & INPUT_SHOOT:
+            self.player.shoot(self.bullets)
+        
+        return InputState(bits)
+    
+    def apply_partner_input(self, bits):
+        """apply_input for the second player in co-op, pass the result to update as partner_keys"""
+        pressed = bits & ~self.last_partner_input
+        self.last_partner_input = bits
+        
+        if pressed & INPUT_JUMP:
+            self.partner.jump()
+        if bits & INPUT_SHOOT:
+            self.partner.shoot(self.bullets)
+        
+        return InputState(bits)
+    
+    def update(self, dt, keys=None, partner_keys=None):
+        """Update game logic"""
+        player = self.player
+        partner = self.partner
+        players = [player] if partner is None else [player, partner]
+        platforms = self.platforms
+        enemies = self.enemies
+        bullets = self.bullets
+        enemy_bullets = self.enemy_bullets
+        powerups = self.powerups
+        particle_system = self.particle_system
+        platforms.begin_frame()
+        self.level_time += dt
+        
+        # Let player class handle its own keyboard input
+        player.update(platforms, dt, keys)
+        if partner is not None:
+            # Never the local keyboard, the partner only moves on the input it is given
+            partner.update(platforms, dt, partner_keys or InputState())
+        
+        # Update platforms
+        retired = []
+        for platform in platforms:
+            platform.update(dt)
+            if not platform.is_active:
+                retired.append(platform)
+                continue
+            
+            # Check for special platform interactions with player (only when landing on top)
+            for rider in players:
+                if platform.platform_type == "bounce" and platform in rider.landed_on:
+                    platform.apply_bounce(rider)
+                
+                elif platform.platform_type == "falling" and platform in rider.landed_on:
+                    platform.trigger_fall()
+                
+                elif platform.platform_type == "crumbling" and platform in rider.landed_on:
+                    platform.trigger_crumble()
+        
+        # Fallen and crumbled platforms leave the level for good
+        for platform in retired:
+            platforms.retire(platform)
+        platforms.moved()  # Enemies collide with where the platforms are now
+        
+        events = self.events
+        spent_bullets = set()
+        dead_enemies = set()
+        
+        # Broad phase: who each kind of shot or pickup can touch at all, sorted out once by layer
+        shootable = candidates(enemies, LAYER_PLAYER_BULLET)
+        
+        # Move bullets, dropping the ones that left the screen or ran out, then check collisions with enemies
+        bullets.update(dt)
+        for bullet in bullets:
+            for enemy in shootable:
+                if enemy in dead_enemies or not bullet.check_collision(enemy):
+                    continue
+                
+                events.emit(BULLET_HIT, bullet.x, bullet.y, color=bullet.color)
+                
+                # If it's an explosive bullet, trigger explosion
+                if bullet.explosive and not bullet.has_exploded:
+                    bullets.explode(bullet)
+                    # Check for other enemies in blast radius
+                    for other_enemy in shootable:
+                        if other_enemy is not enemy and other_enemy not in dead_enemies:
+                            dx = other_enemy.x - bullet.x
+                            dy = other_enemy.y - bullet.y
+                            dist = math.sqrt(dx*dx + dy*dy)
+                            if dist < bullet.explosion_radius:
+                                if other_enemy.take_damage(30):  # Splash damage
+                                    dead_enemies.add(other_enemy)
+                                    events.emit(ENEMY_KILLED, other_enemy.x, other_enemy.y,
+                                                other_enemy.points_value, other_enemy.enemy_type, RED)
+                else:
+                    spent_bullets.add(bullet)
+                
+                # Apply damage to enemy
+                if enemy.take_damage(50):  # Returns True if enemy died
+                    dead_enemies.add(enemy)
+                    events.emit(ENEMY_KILLED, enemy.x, enemy.y, enemy.points_value, enemy.enemy_type, RED)
+                break
+        
+        # Drop spent bullets and dead enemies in one pass each (the lists are shared, so edit in place)
+        if spent_bullets:
+            bullets.remove(spent_bullets)
+        if dead_enemies:
+            enemies[:] = [enemy for enemy in enemies if enemy not in dead_enemies]
+            if self.horde is not None:
+                self.horde.pool.release(dead_enemies)
+        
+        # Update enemy bullets
+        spent_bullets = set()
+        targets = candidates(players, LAYER_ENEMY_BULLET)
+        enemy_bullets.update(dt)
+        for bullet in enemy_bullets:
+            for target in targets:
+                if bullet.check_collision(target) and not target.is_invulnerable():
+                    health = target.health
+                    target.take_damage()
+                    events.emit(PLAYER_DAMAGED, bullet.x, bullet.y, health - target.health, "bullet", (255, 0, 0))
+                    spent_bullets.add(bullet)
+                    break
+        
+        if spent_bullets:
+            enemy_bullets.remove(spent_bullets)
+        
+        # Boss pattern bullets move and test against each player as whole arrays
+        bullet_field = self.bullet_field
+        if len(bullet_field):
+            bullet_field.update(dt)
+            for target in targets:
+                if target.is_invulnerable():
+                    continue
+                hits = bullet_field.hits(target.rect)
+                if len(hits):
+                    health = target.health
+                    target.take_damage()
+                    events.emit(PLAYER_DAMAGED, target.x, target.y, health - target.health, "bullet", (255, 0, 0))
+                    bullet_field.remove(hits)
+        
+        # Update enemies
+        for enemy in enemies[:]:
+            # In co-op each enemy goes after whichever player is closer
+            target = player
+            if partner is not None:
+                target = min(players, key=lambda p: abs(p.x - enemy.x) + abs(p.y - enemy.y))
+            enemy.update(dt, target, platforms, enemy_bullets)
+            
+            # Check for collision with player
+            for target in players:
+                if enemy.check_collision(target) and not target.is_invulnerable():
+                    health = target.health
+                    target.take_damage()
+                    events.emit(PLAYER_DAMAGED, target.x, target.y, health - target.health, "contact", RED)
+        
+        # Update powerups
+        collected = False
+        collectors = candidates(players, LAYER_POWERUP)
+        for powerup in powerups:
+            powerup.update(dt)
+            for target in collectors:
+                if powerup.check_collision(target):
+                    score_value = powerup.collect(target)
+                    events.emit(POWERUP_COLLECTED, powerup.x, powerup.y, score_value or 0,
+                                powerup.power_type, powerup.color)
+                    collected = True
+                    break
+        
+        if collected:
+            powerups[:] = [powerup for powerup in powerups if not powerup.collected]
+        
+        # Physics is done, let scoring, stats and effects catch up
+        events.dispatch()
+        
+        # Update particles
+        particle_system.update(dt)
+        
+        # Check for level completion (no more enemies), in horde mode the next wave follows instead
+        if self.horde is not None:
+            if self.horde.update(dt, self):
+                self.record_level("cleared")
+                self.reset_stats()
+                if not powerups:
+                    # A fresh set of powerups for the next wave
+                    powerups[:] = self.create_powerups(platforms, self.level_layout)
+        elif len(enemies) == 0:
+            self.state = GameState.LEVEL_COMPLETE
+            self.record_level("cleared")
+        
+        # Check for game over, in co-op either player going down costs a shared life
+        if player.health <= 0 or (partner is not None and partner.health <= 0):
+            self.lives -= 1
+            self.record_level("died")
+            if self.lives > 0:
+                # Reset the current level
+                if self.horde is not None:
+                    self.horde.restart_wave(enemies)
+                self.initialize_level()
+            else:
+                self.state = GameState.GAME_OVER
+                self.finish_run("game over")
\ No newline at end of file
@@ -0,0 +1,173 @@
+import time
+import uuid
+import queue
+import sqlite3
+import threading
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id TEXT PRIMARY KEY,
+    started REAL NOT NULL,
+    finished REAL,
+    endless INTEGER NOT NULL,  -- 0 campaign, 1 endless levels, 2 horde mode
+    seed INTEGER NOT NULL,
+    score INTEGER NOT NULL DEFAULT 0,
+    level INTEGER NOT NULL DEFAULT 0,
+    outcome TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_by_score ON runs (score DESC) WHERE finished IS NOT NULL;
+
+CREATE TABLE IF NOT EXISTS levels (
+    run_id TEXT NOT NULL REFERENCES runs (id),
+    level INTEGER NOT NULL,
+    attempt INTEGER NOT NULL,
+    outcome TEXT NOT NULL,
+    seconds REAL NOT NULL,
+    damage INTEGER NOT NULL,
+    score INTEGER NOT NULL,
+    PRIMARY KEY (run_id, level, attempt)
+);
+
+CREATE TABLE IF NOT EXISTS level_kills (
+    run_id TEXT NOT NULL,
+    level INTEGER NOT NULL,
+    attempt INTEGER NOT NULL,
+    enemy_type TEXT NOT NULL,
+    count INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS level_kills_by_run ON level_kills (run_id, level);
+
+CREATE TABLE IF NOT EXISTS level_powerups (
+    run_id TEXT NOT NULL,
+    level INTEGER NOT NULL,
+    attempt INTEGER NOT NULL,
+    power_type TEXT NOT NULL,
+    count INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS level_powerups_by_run ON level_powerups (run_id, level);
+"""
+
+TOP_SCORES = """
+SELECT score, level, outcome, endless, finished FROM runs
+WHERE finished IS NOT NULL ORDER BY score DESC LIMIT ?
+"""
+
+class RunHistory:
+    """Run history and high scores in SQLite, written from a background thread.
+    
+    The game thread only puts statements on a queue. The writer thread
+    takes whatever has piled up (waiting up to flush_interval for more) and
+    commits it as one transaction, so disk I/O never lands in a frame.
+    leaderboard is refreshed by the writer after each finished run and can
+    be read from any thread without touching the database.
+    """
+    def __init__(self, path="history.db", flush_interval=0.5, leaderboard_size=5):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.leaderboard_size = leaderboard_size
+        self.leaderboard = []  # (score, level, outcome, endless, finished) rows, best first
+        self.attempts = {}  # (run_id, level) -> attempts recorded so far
+        
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+    
+    # Game thread side, these only queue work
+    
+    def start_run(self, endless, seed):
+        run_id = uuid.uuid4().hex
+        self.queue.put(("INSERT INTO runs (id, started, endless, seed) VALUES (?, ?, ?, ?)",
+                        (run_id, time.time(), int(endless), seed)))
+        return run_id
+    
+    def resume_run(self, run_id):
+        """Carry on numbering level attempts from the database, for a run continued from a save"""
+        connection = sqlite3.connect(self.path)
+        try:
+            rows = connection.execute("SELECT level, MAX(attempt) FROM levels WHERE run_id = ? GROUP BY level",
+                                      (run_id,)).fetchall()
+        except sqlite3.Error:
+            rows = []  # Not created yet, nothing recorded either
+        finally:
+            connection.close()
+        for level, attempt in rows:
+            # Attempts still queued this session are ahead of the database
+            self.attempts[(run_id, level)] = max(attempt, self.attempts.get((run_id, level), 0))
+    
+    def record_level(self, run_id, level, outcome, seconds, damage, score, kills, powerups):
+        """One attempt at a level, cleared or died, with its kills and powerups by type"""
+        attempt = self.attempts.get((run_id, level), 0) + 1
+        self.attempts[(run_id, level)] = attempt
+        
+        self.queue.put(("INSERT INTO levels VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (run_id, level, attempt, outcome, seconds, damage, score)))
+        for enemy_type, count in kills.items():
+            self.queue.put(("INSERT INTO level_kills VALUES (?, ?, ?, ?, ?)",
+                            (run_id, level, attempt, enemy_type, count)))
+        for power_type, count in powerups.items():
+            self.queue.put(("INSERT INTO level_powerups VALUES (?, ?, ?, ?, ?)",
+                            (run_id, level, attempt, power_type, count)))
+    
+    def finish_run(self, run_id, score, level, outcome):
+        self.queue.put(("UPDATE runs SET finished = ?, score = ?, level = ?, outcome = ? WHERE id = ?",
+                        (time.time(), score, level, outcome, run_id)))
+        self.queue.put(None)  # Refresh the leaderboard once this is committed
+        self.attempts = {key: value for key, value in self.attempts.items() if key[0] != run_id}
+    
+    def close(self):
+        """Write out everything still queued and stop the writer"""
+        self.queue.put(StopIteration)
+        self.thread.join()
+    
+    # Reading, safe from any thread with its own connection
+    
+    def top_scores(self, limit=10):
+        connection = sqlite3.connect(self.path)
+        try:
+            return connection.execute(TOP_SCORES, (limit,)).fetchall()
+        finally:
+            connection.close()
+    
+    # Writer thread
+    
+    def run(self):
+        connection = sqlite3.connect(self.path)
+        connection.execute("PRAGMA journal_mode=WAL")  # Readers don't wait on the writer
+        connection.executescript(SCHEMA)
+        self.leaderboard = connection.execute(TOP_SCORES, (self.leaderboard_size,)).fetchall()
+        
+        running = True
+        while running:
+            batch = [self.queue.get()]
+            deadline = time.perf_counter() + self.flush_interval
+            while batch[-1] is not StopIteration:
+                try:
+                    batch.append(self.queue.get(timeout=max(0.0, deadline - time.perf_counter())))
+                except queue.Empty:
+                    break
+            
+            running = StopIteration not in batch
+            refresh = None in batch
+            statements = [item for item in batch if item is not StopIteration and item is not None]
+            try:
+                with connection:
+                    for statement in statements:
+                        connection.execute(*statement)
+            except sqlite3.Error as error:
+                # The batch was rolled back, so go again one statement at a time and only lose the bad ones
+                print(f"Run history batch failed ({error}), retrying statement by statement")
+                for statement in statements:
+                    try:
+                        with connection:
+                            connection.execute(*statement)
+                    except sqlite3.Error as error:
+                        print(f"Run history dropped {statement[0].split('(')[0].strip()}: {error}")
+            
+            if refresh:
+                # Swapped in whole, so readers never see a half built list
+                try:
+                    self.leaderboard = connection.execute(TOP_SCORES, (self.leaderboard_size,)).fetchall()
+                except sqlite3.Error as error:
+                    print(f"Run history couldn't refresh the high scores: {error}")
+        
+        connection.close()
\ No newline at end of file
@@ -0,0 +1,170 @@
+import os
+import math
+import numpy as np
+
+# Hot loops of the simulation, written once in the subset of Python that Numba compiles.
+# use() picks the backend: "numba" compiles them to machine code, "python" runs the same
+# functions as they are. Callers go through the module (kernels.resolve_body(...)) so they
+# always get the current backend.
+#
+# Platform bounds come from PlatformSet.bounds() as rows of (left, top, right, bottom):
+# a float64 array for Numba, a list of tuples for plain Python, whichever is fastest to walk.
+
+BACKENDS = ("auto", "numba", "python")
+
+def overlapping_py(left, top, right, bottom, bounds):
+    """Indices of the bounds that overlap the box, in order"""
+    return [i for i, bound in enumerate(bounds)
+            if left < bound[2] and right > bound[0] and top < bound[3] and bottom > bound[1]]
+
+def fill_overlapping(left, top, right, bottom, bounds, hits):
+    # Compiled half of overlapping, writes the indices into hits and returns how many
+    count = 0
+    for i in range(len(bounds)):
+        bound = bounds[i]
+        if left < bound[2] and right > bound[0] and top < bound[3] and bottom > bound[1]:
+            hits[count] = i
+            count += 1
+    return count
+
+def resolve_body_py(left, top, right, bottom, x, y, half_width, half_height, vel_x, vel_y, bounds):
+    """Push a body out of every platform its rect overlaps, along the shallowest axis each time.
+    
+    Every overlap is measured against the rect the body had coming in, and
+    later platforms win, same as Enemy.handle_platform_collisions always did.
+    Returns (x, y, vel_x, vel_y, on_ground).
+    """
+    on_ground = False
+    for bound in bounds:
+        if not (left < bound[2] and right > bound[0] and top < bound[3] and bottom > bound[1]):
+            continue
+        
+        dx_left = right - bound[0]
+        dx_right = bound[2] - left
+        dy_top = bottom - bound[1]
+        dy_bottom = bound[3] - top
+        
+        if min(dx_left, dx_right) < min(dy_top, dy_bottom):
+            if dx_left < dx_right:
+                x = bound[0] - half_width
+            else:
+                x = bound[2] + half_width
+            vel_x = 0.0
+        else:
+            if dy_top < dy_bottom:
+                y = bound[1] - half_height
+                on_ground = True
+            else:
+                y = bound[3] + half_height
+            vel_y = 0.0
+    return x, y, vel_x, vel_y, on_ground
+
+def steer_py(x, y, vel_x, vel_y, target_x, target_y, wave_angle, turn_speed, speed, dt):
+    """Turn a homing missile toward its target, with a wiggle. Returns (vel_x, vel_y, wave_angle)"""
+    target_angle = math.atan2(target_y - y, target_x - x)
+    current_angle = math.atan2(vel_y, vel_x)
+    
+    # Shortest way round, limited by the turn speed
+    angle_diff = target_angle - current_angle
+    while angle_diff > math.pi:
+        angle_diff -= 2 * math.pi
+    while angle_diff < -math.pi:
+        angle_diff += 2 * math.pi
+    if angle_diff > turn_speed * dt:
+        angle_diff = turn_speed * dt
+    elif angle_diff < -turn_speed * dt:
+        angle_diff = -turn_speed * dt
+    
+    wave_angle += 10 * dt
+    new_angle = current_angle + angle_diff + math.sin(wave_angle) * 0.4
+    return math.cos(new_angle) * speed, math.sin(new_angle) * speed, wave_angle
+
+def integrate_py(x, y, vel_x, vel_y, gravity, n, dt):
+    """Apply gravity and move the first n entities. NumPy already runs this at C speed"""
+    vel_y[:n] += gravity[:n] * dt
+    x[:n] += vel_x[:n] * dt
+    y[:n] += vel_y[:n] * dt
+
+def integrate_loop(x, y, vel_x, vel_y, gravity, n, dt):
+    # Compiled, one pass over the entities instead of three over the arrays
+    for i in range(n):
+        vel_y[i] += gravity[i] * dt
+        x[i] += vel_x[i] * dt
+        y[i] += vel_y[i] * dt
+
+def pack_bounds_py(rects):
+    return [(rect.left, rect.top, rect.right, rect.bottom) for rect in rects]
+
+def pack_bounds_array(rects):
+    return np.array(pack_bounds_py(rects), dtype=np.float64).reshape(-1, 4)
+
+backend = None
+
+def compile_numba():
+    """The compiled kernels, or None without Numba. Safe to run on a background thread.
+    
+    Signatures are given up front so everything compiles (or loads from the
+    cache in __pycache__) here rather than on the first call in a frame, and
+    ints passed in are converted instead of compiling another version.
+    """
+    try:
+        import numba
+    except ImportError:
+        return None
+    
+    def jit(signature, function):
+        return numba.njit(signature, cache=True, nogil=True)(function)
+    
+    fill = jit("int64(int64, int64, int64, int64, float64[:, ::1], int64[::1])", fill_overlapping)
+    
+    def overlapping(left, top, right, bottom, bounds):
+        hits = np.empty(len(bounds), dtype=np.int64)
+        return hits[:fill(left, top, right, bottom, bounds, hits)]
+    
+    return {
+        'overlapping': overlapping,
+        'resolve_body': jit("Tuple((float64, float64, float64, float64, boolean))(int64, int64, int64, int64, "
+                            "float64, float64, float64, float64, float64, float64, float64[:, ::1])",
+                            resolve_body_py),
+        # A call into compiled code costs about a microsecond, more than steer's handful of float ops
+        'steer': steer_py,
+        'integrate': jit("void(float32[::1], float32[::1], float32[::1], float32[::1], float32[::1], int64, "
+                         "float64)", integrate_loop),
+        'pack_bounds': pack_bounds_array
+    }
+
+def use(name="auto", compiled=None):
+    """Switch every kernel to a backend, returns the one actually in use.
+    
+    "auto" and "numba" fall back to plain Python when Numba isn't installed.
+    Pass what compile_numba() returned to switch without compiling here.
+    Only switch between frames, bounds packed for one backend don't suit the other.
+    """
+    global backend, overlapping, resolve_body, steer, integrate, pack_bounds
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown kernel backend {name!r}, expected auto, numba or python")
+    
+    if name != "python" and compiled is None:
+        compiled = compile_numba()
+    if name == "python" or compiled is None:
+        compiled = {
+            'overlapping': overlapping_py,
+            'resolve_body': resolve_body_py,
+            'steer': steer_py,
+            'integrate': integrate_py,
+            'pack_bounds': pack_bounds_py
+        }
+        backend = "python"
+    else:
+        backend = "numba"
+    
+    overlapping = compiled['overlapping']
+    resolve_body = compiled['resolve_body']
+    steer = compiled['steer']
+    integrate = compiled['integrate']
+    pack_bounds = compiled['pack_bounds']
+    return backend
+
+# Plain Python unless PLATFORMER_KERNELS says otherwise, importing and compiling Numba takes a
+# while. main.py does that on a background thread and switches over when it's ready (--kernels)
+use(os.environ.get("PLATFORMER_KERNELS", "python"))
\ No newline at end of file
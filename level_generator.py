@@ -0,0 +1,323 @@
+import os
+import json
+import random
+from constants import *
+from player import Player
+from platforms import Platform, apply_theme_colors
+
+# Bump whenever the generation algorithm changes so stale cache files are rebuilt
+GENERATOR_VERSION = 1
+
+# Generated layouts are stored next to the game as small JSON files
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "level_cache")
+
+# In-memory copy of layouts loaded this session
+_layout_cache = {}
+
+GROUND_HEIGHT = 50
+PLATFORM_HEIGHT = 20
+TOP_MARGIN = 100  # Keep platforms below the HUD
+
+# Platform types that stay put long enough to be used as a stepping stone
+STABLE_TYPES = ("normal", "moving", "bounce")
+
+def get_player_physics():
+    """Read movement parameters off a fresh Player so the solver follows tuning changes"""
+    player = Player(0, 0)
+    return {
+        'width': player.width,
+        'height': player.height,
+        'gravity': player.gravity,
+        'move_speed': player.move_speed,
+        'jump_power': player.jump_power,
+        'double_jump_factor': player.double_jump_factor,
+        'dash_power': player.dash_power,
+        'dash_duration': player.dash_duration,
+        'dash_lift': player.dash_lift,
+        'max_fall_speed': player.max_fall_speed
+    }
+
+def get_reach_limits(physics):
+    """Upper bounds on how far a jump can carry the player, used to prune solver calls"""
+    gravity = physics['gravity']
+    jump_height = physics['jump_power'] ** 2 / (2 * gravity)
+    double_jump_height = (physics['jump_power'] * physics['double_jump_factor']) ** 2 / (2 * gravity)
+    dash_height = physics['dash_lift'] ** 2 / (2 * gravity)
+    max_height = jump_height + double_jump_height + dash_height
+    
+    # Time spent in the air going up and coming back down from the highest point
+    air_time = 2 * (abs(physics['jump_power']) + abs(physics['jump_power'] * physics['double_jump_factor'])) / gravity
+    max_distance = physics['move_speed'] * air_time + physics['dash_power'] * physics['dash_duration']
+    
+    return max_height, max_distance
+
+def simulate_jump(physics, start_x, start_y, target_rect, double_jump, dash, dt=1/60):
+    """Step the Player movement model from a standing position and report whether it lands on target_rect.
+    
+    start_y is the platform top the player stands on. The simulated player steers toward
+    the target the same way a human would, optionally using the double jump and dash at
+    the top of the arc.
+    """
+    half_w = physics['width'] / 2
+    half_h = physics['height'] / 2
+    target_left, target_top, target_width, _ = target_rect
+    target_center = target_left + target_width / 2
+    direction = 1 if target_center >= start_x else -1
+    
+    x = start_x
+    y = start_y - half_h
+    vel_y = physics['jump_power']
+    used_double_jump = not double_jump
+    used_dash = not dash
+    dash_timer = 0
+    
+    for _ in range(int(3.0 / dt)):
+        if dash_timer > 0:
+            dash_timer -= dt
+            vel_x = physics['dash_power'] * direction
+        else:
+            vel_y = min(vel_y + physics['gravity'] * dt, physics['max_fall_speed'])
+            
+            # Stop steering once the feet are over the landing zone
+            if target_left + half_w <= x <= target_left + target_width - half_w:
+                vel_x = 0
+            else:
+                vel_x = physics['move_speed'] * direction
+            
+            # Spend the air abilities at the top of the arc
+            if vel_y >= 0 and not used_double_jump:
+                vel_y = physics['jump_power'] * physics['double_jump_factor']
+                used_double_jump = True
+            elif vel_y >= 0 and not used_dash:
+                dash_timer = physics['dash_duration']
+                vel_y = physics['dash_lift']
+                used_dash = True
+        
+        prev_bottom = y + half_h
+        x += vel_x * dt
+        y += vel_y * dt
+        bottom = y + half_h
+        
+        # Landed if the feet crossed the platform top while falling with the body over it
+        if vel_y > 0 and prev_bottom <= target_top <= bottom:
+            if target_left <= x <= target_left + target_width:
+                return True
+        
+        # Fell past the target, no way back up
+        if vel_y > 0 and bottom > target_top + physics['height']:
+            return False
+    
+    return False
+
+def is_reachable(physics, source_rect, target_rect):
+    """Check whether the player can get from the top of source_rect onto target_rect"""
+    max_height, max_distance = get_reach_limits(physics)
+    source_left, source_top, source_width, _ = source_rect
+    target_left, target_top, target_width, _ = target_rect
+    
+    # Horizontal gap between the two platforms (0 if they overlap)
+    gap = max(target_left - (source_left + source_width), source_left - (target_left + target_width), 0)
+    if source_top - target_top > max_height or gap > max_distance:
+        return False
+    
+    # Take off from the edge of the source closest to the target
+    half_w = physics['width'] / 2
+    target_center = target_left + target_width / 2
+    start_x = min(max(target_center, source_left + half_w), source_left + source_width - half_w)
+    
+    # Try the cheapest move first
+    for double_jump, dash in ((False, False), (True, False), (False, True), (True, True)):
+        if simulate_jump(physics, start_x, source_top, target_rect, double_jump, dash):
+            return True
+    
+    return False
+
+def has_clearance(physics, rect, placed):
+    """Make sure the player can stand on and pass under rect without getting wedged"""
+    left, top, width, height = rect
+    clearance = physics['height'] + 20
+    
+    for other in placed:
+        other_left, other_top, other_width, other_height = other['rect']
+        overlap_x = left < other_left + other_width + 40 and other_left < left + width + 40
+        if not overlap_x:
+            continue
+        
+        if top + height + clearance > other_top and other_top + other_height + clearance > top:
+            return False
+    
+    return True
+
+def choose_platform_type(rng, difficulty):
+    """Pick a platform type, mixing in trickier ones as difficulty rises"""
+    weights = {
+        "normal": 6,
+        "moving": min(4, difficulty),
+        "bounce": min(2, difficulty // 2),
+        "falling": min(3, max(0, difficulty - 2)),
+        "crumbling": min(3, max(0, difficulty - 2))
+    }
+    types = list(weights.keys())
+    return rng.choices(types, [weights[t] for t in types])[0]
+
+def choose_enemy_type(rng, difficulty):
+    """Same progression as the hand-made levels, continuing past the last one"""
+    if difficulty == 0:
+        return "basic"
+    elif difficulty == 1:
+        return rng.choice(["basic", "runner"])
+    elif difficulty == 2:
+        return rng.choice(["basic", "runner", "tank"])
+    else:
+        return rng.choice(["basic", "runner", "tank", "shooter"])
+
+def generate_level(seed, difficulty, physics=None):
+    """Build a reachable platform layout with enemy and powerup spawns"""
+    if physics is None:
+        physics = get_player_physics()
+    
+    rng = random.Random(f"{seed}-{difficulty}")
+    ground_top = SCREEN_HEIGHT - GROUND_HEIGHT
+    
+    ground = {
+        'rect': (0, ground_top, SCREEN_WIDTH, GROUND_HEIGHT),
+        'type': "normal"
+    }
+    placed = [ground]
+    
+    # Harder levels get more, narrower platforms
+    target_count = min(10, 5 + difficulty // 2)
+    min_width = max(80, 160 - difficulty * 10)
+    max_width = max(min_width + 20, 220 - difficulty * 10)
+    
+    attempts = 0
+    while len(placed) - 1 < target_count and attempts < target_count * 60:
+        attempts += 1
+        
+        # Grow upward from a random stable platform that is already reachable
+        sources = [p for p in placed if p['type'] in STABLE_TYPES]
+        source = rng.choice(sources)
+        source_left, source_top, source_width, _ = source['rect']
+        
+        width = rng.randrange(min_width, max_width + 1, 10)
+        y = source_top - rng.randint(80, 220)
+        x = source_left + source_width / 2 + rng.randint(-350, 350) - width / 2
+        x = int(min(max(x, 20), SCREEN_WIDTH - width - 20))
+        if y < TOP_MARGIN:
+            continue
+        
+        rect = (x, y, width, PLATFORM_HEIGHT)
+        if not has_clearance(physics, rect, placed):
+            continue
+        
+        if not is_reachable(physics, source['rect'], rect):
+            continue
+        
+        platform = {
+            'rect': rect,
+            'type': choose_platform_type(rng, difficulty)
+        }
+        
+        # Moving platforms get a range that keeps them on screen
+        if platform['type'] == "moving":
+            platform['move_distance'] = min(300, SCREEN_WIDTH - x - width - 20)
+            platform['move_speed'] = 100 + 10 * min(difficulty, 8)
+            if platform['move_distance'] < 60:
+                platform['type'] = "normal"
+                del platform['move_distance']
+                del platform['move_speed']
+        
+        placed.append(platform)
+    
+    layout = {
+        'version': GENERATOR_VERSION,
+        'seed': seed,
+        'difficulty': difficulty,
+        'physics': physics,
+        'platforms': placed,
+        'enemies': [],
+        'powerups': []
+    }
+    
+    # Spawn points sit on top of non-ground platforms
+    spawn_platforms = [p for p in placed[1:] if p['type'] in STABLE_TYPES] or placed
+    
+    num_enemies = min(12, 2 + difficulty)
+    for _ in range(num_enemies):
+        left, top, width, _ = rng.choice(spawn_platforms)['rect']
+        spawn_x = left + rng.randint(min(20, width // 2), max(width // 2, width - 20))
+        layout['enemies'].append((spawn_x, top - 30, choose_enemy_type(rng, difficulty)))
+    
+    num_powerups = rng.randint(2, 3)
+    for _ in range(num_powerups):
+        left, top, width, _ = rng.choice(spawn_platforms)['rect']
+        power_x = left + rng.randint(min(20, width // 2), max(width // 2, width - 20))
+        power_type = rng.choice(["health", "speed", "jump", "shield"])
+        layout['powerups'].append((power_x, top - 20, power_type))
+    
+    return layout
+
+def get_cache_path(seed, difficulty):
+    return os.path.join(CACHE_DIR, f"level_{seed}_{difficulty}.json")
+
+def load_cached_layout(seed, difficulty, physics):
+    """Return the cached layout for this seed, or None if missing or out of date"""
+    path = get_cache_path(seed, difficulty)
+    try:
+        with open(path) as f:
+            layout = json.load(f)
+    except (OSError, ValueError):
+        return None
+    
+    # Layouts solved against other physics or an older generator can't be trusted
+    if layout.get('version') != GENERATOR_VERSION or layout.get('physics') != physics:
+        return None
+    
+    return layout
+
+def save_cached_layout(layout):
+    """Write a layout to the cache directory without leaving half-written files behind"""
+    path = get_cache_path(layout['seed'], layout['difficulty'])
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        temp_path = path + ".tmp"
+        with open(temp_path, "w") as f:
+            json.dump(layout, f)
+        os.replace(temp_path, path)
+    except OSError:
+        # The cache is only an optimization
+        pass
+
+def get_level_layout(seed, difficulty):
+    """Load a generated layout from the cache, generating and caching it on a miss"""
+    key = (seed, difficulty)
+    if key in _layout_cache:
+        return _layout_cache[key]
+    
+    physics = get_player_physics()
+    layout = load_cached_layout(seed, difficulty, physics)
+    if layout is None:
+        layout = generate_level(seed, difficulty, physics)
+        
+        # Round-trip through JSON so fresh and cached layouts look the same
+        layout = json.loads(json.dumps(layout))
+        save_cached_layout(layout)
+    
+    _layout_cache[key] = layout
+    return layout
+
+def build_platforms(layout, theme):
+    """Create Platform objects for a generated layout"""
+    platforms = []
+    
+    for data in layout['platforms']:
+        x, y, width, height = data['rect']
+        platform = Platform(x, y, width, height, platform_type=data['type'])
+        if data['type'] == "moving":
+            platform.move_distance = data['move_distance']
+            platform.move_speed = data['move_speed']
+        platforms.append(platform)
+    
+    apply_theme_colors(platforms, theme)
+    
+    return platforms
\ No newline at end of file
@@ -0,0 +1,134 @@
+import gc
+import os
+import sys
+import tracemalloc
+from game import GameState
+
+# Classes defined in modules from this directory are the ones worth counting
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Leaving one of these for PLAYING means a new run started
+STOPPED = (GameState.TITLE, GameState.GAME_OVER, GameState.VICTORY)
+
+def game_modules():
+    """Names of the loaded modules that are part of the game"""
+    names = set()
+    for name, module in list(sys.modules.items()):
+        path = getattr(module, '__file__', None)
+        if path and os.path.dirname(os.path.abspath(path)) == ROOT:
+            names.add(name)
+    return names
+
+def count_objects(modules):
+    """Live instances per class, for classes defined in the given modules"""
+    counts = {}
+    for obj in gc.get_objects():
+        cls = type(obj)
+        if cls.__module__ in modules:
+            name = cls.__module__ + "." + cls.__qualname__
+            counts[name] = counts.get(name, 0) + 1
+    return counts
+
+class MemoryDiagnostics:
+    """tracemalloc snapshots at level start and end, deaths and restarts, reported as growth.
+    
+    watch(game) is called once a frame and only compares a few fields, the
+    snapshots and object counts happen at the checkpoints it spots. Each
+    report lists allocation growth by module and by line since the last
+    checkpoint, plus live object counts per game class; classes that grew at
+    several checkpoints in a row are flagged as likely leaks.
+    """
+    def __init__(self, out=None, top=10, frames=1, streak=3):
+        self.out = out or sys.stdout
+        self.top = top  # Lines and modules per report
+        self.frames = frames  # Stack depth tracemalloc records per allocation
+        self.streak = streak  # Checkpoints of growth in a row before a class is flagged
+        
+        self.snapshot = None
+        self.counts = {}
+        self.growth = {}  # Class name -> checkpoints in a row it grew at
+        self.watched = None
+        self.checkpoints = 0
+    
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+        self.snapshot = self.take_snapshot()
+        self.counts = count_objects(game_modules())
+    
+    def stop(self):
+        tracemalloc.stop()
+    
+    def take_snapshot(self):
+        # Leave out tracemalloc's own bookkeeping and the import machinery
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+            tracemalloc.Filter(False, "<unknown>")
+        ))
+    
+    def watch(self, game):
+        """Spot checkpoints from how the game changed since the last frame"""
+        # The player by id, holding on to it here would keep a replaced one alive
+        watched = (game.state, game.current_level, game.lives, id(game.player))
+        previous = self.watched
+        self.watched = watched
+        if previous is None:
+            return
+        
+        state, level, lives, player = watched
+        last_state, last_level, last_lives, last_player = previous
+        
+        if lives > last_lives or (state == GameState.PLAYING and last_state in STOPPED):
+            self.checkpoint(f"restart, level {level + 1}")
+        elif lives < last_lives:
+            self.checkpoint(f"death, level {level + 1}, {lives} lives left")
+        elif state != last_state and state == GameState.LEVEL_COMPLETE:
+            self.checkpoint(f"level {level + 1} end")
+        elif level != last_level or (player != last_player and state == GameState.PLAYING):
+            self.checkpoint(f"level {level + 1} start")
+    
+    def checkpoint(self, label):
+        """Take a snapshot now and report what grew since the last one"""
+        snapshot = self.take_snapshot()
+        counts = count_objects(game_modules())
+        self.checkpoints += 1
+        
+        def write(line=""):
+            print(line, file=self.out)
+        
+        current, peak = tracemalloc.get_traced_memory()
+        write(f"== Memory checkpoint {self.checkpoints}: {label} "
+              f"({current / 1024:.0f} KiB traced, {peak / 1024:.0f} KiB peak)")
+        
+        if self.snapshot is not None:
+            write("Growth by module:")
+            for stat in self.largest(snapshot.compare_to(self.snapshot, 'filename')):
+                frame = stat.traceback[0]
+                write(f"  {stat.size_diff / 1024:+9.1f} KiB {stat.count_diff:+7d} blocks  {frame.filename}")
+            
+            write("Growth by line:")
+            for stat in self.largest(snapshot.compare_to(self.snapshot, 'lineno')):
+                frame = stat.traceback[0]
+                write(f"  {stat.size_diff / 1024:+9.1f} KiB {stat.count_diff:+7d} blocks  "
+                      f"{frame.filename}:{frame.lineno}")
+        
+        write("Live objects:")
+        for name in sorted(counts, key=lambda name: -counts[name]):
+            change = counts[name] - self.counts.get(name, 0)
+            self.growth[name] = self.growth.get(name, 0) + 1 if change > 0 else 0
+            flag = ""
+            if self.growth[name] >= self.streak:
+                flag = f"  <- grew at the last {self.growth[name]} checkpoints"
+            write(f"  {counts[name]:7d} ({change:+d})  {name}{flag}")
+        write()
+        self.out.flush()
+        
+        self.snapshot = snapshot
+        self.counts = counts
+    
+    def largest(self, stats):
+        """The stats that grew the most, biggest first"""
+        grown = [stat for stat in stats if stat.size_diff > 0]
+        return sorted(grown, key=lambda stat: -stat.size_diff)[:self.top]
\ No newline at end of file
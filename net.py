@@ -0,0 +1,814 @@
+import os
+import time
+import random
+import socket
+import struct
+import argparse
+import weakref
+from collections import deque
+
+# The server never opens a window
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from constants import *
+from game import Game, GameState, InputState, INPUT_LEFT, INPUT_RIGHT, INPUT_JUMP, INPUT_SHOOT, \
+    PARTNER_COLOR, level_themes
+from player import Player
+from enemies import Enemy, Boss
+from projectiles import Bullet, HomingMissile, ExplosiveBullet
+from powerups import PowerUp
+from platforms import Platform
+from particles import ParticleSystem
+from patterns import BulletField
+
+# Message types, the first byte of every packet
+INPUT = 1
+SNAPSHOT = 2
+
+# Client to server: type, newest snapshot tick received, newest input sequence, inputs that follow.
+# Each input is one byte of INPUT_* bits, oldest first, repeated over a few packets in case some get lost
+INPUT_HEADER = struct.Struct('<BIIB')
+REDUNDANT_INPUTS = 4
+
+# Server to client: type, tick, baseline tick the entities are relative to (0 for none), newest input
+# sequence simulated for this client, its player slot, game state, level, lives, score, endless, seed
+SNAPSHOT_HEADER = struct.Struct('<BIIIBBHBiBI')
+COUNT = struct.Struct('<H')
+ENTITY = struct.Struct('<HBH')  # Net id, kind, mask of the fields that follow
+
+# Entity kinds
+PLAYER = 0
+ENEMY = 1
+BULLET = 2
+ENEMY_BULLET = 3
+POWERUP = 4
+PLATFORM = 5
+
+# Fields sent per kind, every one an int16. Positions are quarter pixels (platforms are whole pixels
+# already), velocities whole pixels a second. Only fields that differ from the baseline go out
+FIELDS = {
+    PLAYER: ('x', 'y', 'vel_x', 'vel_y', 'health', 'flags', 'power', 'slot'),
+    ENEMY: ('x', 'y', 'health', 'type', 'flags', 'phase', 'shield'),
+    BULLET: ('x', 'y', 'vel_x', 'vel_y', 'style', 'timer', 'red', 'green', 'blue'),
+    ENEMY_BULLET: ('x', 'y', 'vel_x', 'vel_y', 'style', 'timer', 'red', 'green', 'blue'),
+    POWERUP: ('x', 'y', 'type'),
+    PLATFORM: ('x', 'y', 'width', 'height', 'type', 'active', 'red', 'green', 'blue')
+}
+POSITION_SCALE = 4
+
+# Codes for the string and class fields
+ENEMY_TYPES = ("basic", "runner", "tank", "shooter", "boss")
+POWER_TYPES = (None, "health", "speed", "jump", "shield")
+PLATFORM_TYPES = ("normal", "bounce", "moving", "falling", "crumbling")
+BULLET_STYLES = (Bullet, HomingMissile, ExplosiveBullet)
+EXPLODED = 3  # Style of an explosive bullet that already went off
+
+PLAYER_COLORS = ((50, 150, 250), PARTNER_COLOR)
+
+HISTORY = 64  # Snapshots both sides keep to delta against
+MAX_QUEUED_INPUTS = 6  # Inputs the server holds per client before dropping the oldest
+CLIENT_TIMEOUT = 5.0  # Seconds of silence before a client's slot frees up
+RESTART_DELAY = 3.0  # Seconds the server shows level complete and game over before moving on
+
+def quantize(value, scale=1):
+    return max(-32768, min(32767, int(round(value * scale))))
+
+class NetIds:
+    """Small ids for game objects, held weakly so finished bullets and enemies can go.
+    
+    Ids wrap after 65535, but platforms and pooled enemies can outlive a
+    whole lap, so ids still held by a live object are skipped rather than
+    handed out twice.
+    """
+    def __init__(self):
+        self.ids = weakref.WeakKeyDictionary()
+        self.objects = weakref.WeakValueDictionary()  # The other way round, to see which ids are taken
+        self.next_id = 1
+    
+    def get(self, obj):
+        net_id = self.ids.get(obj)
+        if net_id is None:
+            for _ in range(65535):
+                net_id = self.next_id
+                self.next_id = self.next_id % 65535 + 1
+                if net_id not in self.objects:
+                    break
+            else:
+                raise RuntimeError("Out of net ids, 65535 objects are live")
+            self.ids[obj] = net_id
+            self.objects[net_id] = obj
+        return net_id
+
+# Server side: game objects to records
+
+def player_values(player, slot):
+    flags = (player.facing_right | player.on_ground << 1 | player.dashing << 2 | player.invulnerable << 3 |
+             player.can_double_jump << 4 | player.dash_available << 5)
+    return (quantize(player.x, POSITION_SCALE), quantize(player.y, POSITION_SCALE),
+            quantize(player.vel_x), quantize(player.vel_y), quantize(player.health), flags,
+            POWER_TYPES.index(player.special_power), slot)
+
+def enemy_values(enemy):
+    flags = enemy.facing_right | (enemy.damaged_timer > 0) << 1 | getattr(enemy, 'shield_active', False) << 2
+    return (quantize(enemy.x, POSITION_SCALE), quantize(enemy.y, POSITION_SCALE), quantize(enemy.health),
+            ENEMY_TYPES.index(enemy.enemy_type), flags, getattr(enemy, 'phase', 1),
+            quantize(getattr(enemy, 'shield_health', 0)))
+
+def bullet_values(bullet):
+    timer = 0
+    if isinstance(bullet, HomingMissile):
+        style = 1
+    elif isinstance(bullet, ExplosiveBullet):
+        style = 2
+        if bullet.has_exploded:
+            style = EXPLODED
+            timer = quantize(bullet.explosion_timer * 1000)
+    else:
+        style = 0
+    return (quantize(bullet.x, POSITION_SCALE), quantize(bullet.y, POSITION_SCALE),
+            quantize(bullet.vel_x), quantize(bullet.vel_y), style, timer, *bullet.color[:3])
+
+def powerup_values(powerup):
+    return (quantize(powerup.x, POSITION_SCALE), quantize(powerup.y, POSITION_SCALE),
+            POWER_TYPES.index(powerup.power_type))
+
+def platform_values(platform):
+    return (platform.rect.x, platform.rect.y, platform.rect.width, platform.rect.height,
+            PLATFORM_TYPES.index(platform.platform_type), platform.is_active, *platform.color[:3])
+
+def capture(game, ids):
+    """Records ({net id: (kind, values)}) for everything a client draws"""
+    records = {}
+    for slot, player in enumerate((game.player, game.partner)):
+        if player is not None:
+            records[ids.get(player)] = (PLAYER, player_values(player, slot))
+    for enemy in game.enemies:
+        records[ids.get(enemy)] = (ENEMY, enemy_values(enemy))
+    for bullet in game.bullets:
+        records[ids.get(bullet)] = (BULLET, bullet_values(bullet))
+    for bullet in game.enemy_bullets:
+        records[ids.get(bullet)] = (ENEMY_BULLET, bullet_values(bullet))
+    for powerup in game.powerups:
+        if not powerup.collected:
+            records[ids.get(powerup)] = (POWERUP, powerup_values(powerup))
+    for platform in game.platforms:
+        records[ids.get(platform)] = (PLATFORM, platform_values(platform))
+    return records
+
+# Delta encoding
+
+def encode_entities(records, baseline):
+    """Removed ids, then every new or changed entity with only the fields that changed"""
+    removed = [net_id for net_id in baseline if net_id not in records]
+    parts = [COUNT.pack(len(removed)), struct.pack(f'<{len(removed)}H', *removed)]
+    
+    changed = []
+    for net_id, (kind, values) in records.items():
+        old = baseline.get(net_id)
+        if old is not None and old[0] == kind:
+            old_values = old[1]
+            if old_values == values:
+                continue
+            mask = 0
+            sent = []
+            for i, value in enumerate(values):
+                if value != old_values[i]:
+                    mask |= 1 << i
+                    sent.append(value)
+        else:
+            mask = (1 << len(values)) - 1
+            sent = values
+        changed.append(ENTITY.pack(net_id, kind, mask) + struct.pack(f'<{len(sent)}h', *sent))
+    
+    parts.append(COUNT.pack(len(changed)))
+    parts.extend(changed)
+    return b"".join(parts)
+
+def decode_entities(data, offset, baseline):
+    """Records rebuilt from an encode_entities body and the baseline it was made against"""
+    records = dict(baseline)
+    (count,) = COUNT.unpack_from(data, offset)
+    offset += COUNT.size
+    for net_id in struct.unpack_from(f'<{count}H', data, offset):
+        records.pop(net_id, None)
+    offset += 2 * count
+    
+    (count,) = COUNT.unpack_from(data, offset)
+    offset += COUNT.size
+    for _ in range(count):
+        net_id, kind, mask = ENTITY.unpack_from(data, offset)
+        offset += ENTITY.size
+        
+        size = len(FIELDS[kind])
+        old = baseline.get(net_id)
+        values = list(old[1]) if old is not None and old[0] == kind else [0] * size
+        sent = bin(mask).count("1")
+        new_values = struct.unpack_from(f'<{sent}h', data, offset)
+        offset += 2 * sent
+        
+        j = 0
+        for i in range(size):
+            if mask & (1 << i):
+                values[i] = new_values[j]
+                j += 1
+        records[net_id] = (kind, tuple(values))
+    return records
+
+# Transports
+
+class UdpTransport:
+    """Non-blocking UDP socket, send(data, address) and receive() -> [(data, address)]"""
+    def __init__(self, bind=("127.0.0.1", 0)):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(bind)
+        self.sock.setblocking(False)
+        self.address = self.sock.getsockname()
+    
+    def send(self, data, address):
+        try:
+            self.sock.sendto(data, address)
+        except OSError:
+            pass  # Full buffer or the other end is gone, it's a lost packet either way
+    
+    def receive(self):
+        packets = []
+        while True:
+            try:
+                packets.append(self.sock.recvfrom(65535))
+            except (BlockingIOError, ConnectionResetError):
+                return packets
+    
+    def close(self):
+        self.sock.close()
+
+class LoopbackNetwork:
+    """In-process stand-in for a network, with optional latency and packet loss"""
+    def __init__(self, latency=0.0, loss=0.0):
+        self.latency = latency
+        self.loss = loss
+        self.endpoints = {}
+    
+    def transport(self, address):
+        endpoint = LoopbackTransport(self, address)
+        self.endpoints[address] = endpoint
+        return endpoint
+
+class LoopbackTransport:
+    def __init__(self, network, address):
+        self.network = network
+        self.address = address
+        self.inbox = deque()
+    
+    def send(self, data, address):
+        network = self.network
+        endpoint = network.endpoints.get(address)
+        if endpoint is not None and random.random() >= network.loss:
+            endpoint.inbox.append((time.perf_counter() + network.latency, bytes(data), self.address))
+    
+    def receive(self):
+        now = time.perf_counter()
+        packets = []
+        inbox = self.inbox
+        while inbox and inbox[0][0] <= now:
+            _, data, address = inbox.popleft()
+            packets.append((data, address))
+        return packets
+    
+    def close(self):
+        self.network.endpoints.pop(self.address, None)
+
+# Server
+
+class RemoteClient:
+    def __init__(self, address, slot):
+        self.address = address
+        self.slot = slot
+        self.inputs = deque()  # (sequence, bits) waiting to be simulated, one per tick
+        self.received = 0  # Newest input sequence received
+        self.processed = 0  # Newest input sequence simulated
+        self.bits = 0  # Held until the next input arrives
+        self.ack = 0  # Newest snapshot tick the client has, the baseline for its deltas
+        self.heard = time.perf_counter()
+
+class NetServer:
+    """Runs the authoritative co-op Game and streams delta snapshots to up to two clients.
+    
+    Each tick takes one queued input per client, steps the game and, every
+    send_every ticks, sends each client the entities that changed since the
+    last snapshot it acknowledged. stats() reports bandwidth and the CPU time
+    a tick costs.
+    """
+    def __init__(self, transport, rate=FPS, send_every=2, endless=False, seed=None):
+        self.transport = transport
+        # Pattern bullets come by the thousand, too many for snapshots, so bosses keep to missiles
+        self.game = Game(effects=False, coop=True, patterns=False)
+        self.rate = rate
+        self.step_time = 1.0 / rate
+        self.send_every = send_every
+        self.endless = endless
+        self.seed = seed
+        
+        self.clients = {}
+        self.ids = NetIds()
+        self.history = {}  # Tick -> records sent then
+        self.tick = 0
+        self.waiting = 0  # Ticks spent on a level complete or game over screen
+        
+        # Totals for stats()
+        self.ticks = 0
+        self.cpu_time = 0.0
+        self.bytes_sent = 0
+        self.packets_sent = 0
+        self.full_bytes = 0  # What the same snapshots would have cost without deltas
+    
+    def receive(self):
+        now = time.perf_counter()
+        for data, address in self.transport.receive():
+            if len(data) < INPUT_HEADER.size or data[0] != INPUT:
+                continue
+            
+            client = self.clients.get(address)
+            if client is None:
+                taken = {client.slot for client in self.clients.values()}
+                free = [slot for slot in (0, 1) if slot not in taken]
+                if not free:
+                    continue  # Two players already
+                client = RemoteClient(address, free[0])
+                self.clients[address] = client
+            
+            _, ack, newest, count = INPUT_HEADER.unpack_from(data)
+            client.ack = max(client.ack, ack)
+            client.heard = now
+            
+            bits = data[INPUT_HEADER.size:INPUT_HEADER.size + count]
+            first = newest - len(bits) + 1
+            for i, value in enumerate(bits):
+                sequence = first + i
+                if sequence > client.received:
+                    client.inputs.append((sequence, value))
+                    client.received = sequence
+            
+            # A burst of late packets shouldn't turn into lasting input lag
+            while len(client.inputs) > MAX_QUEUED_INPUTS:
+                client.inputs.popleft()
+        
+        for address, client in list(self.clients.items()):
+            if now - client.heard > CLIENT_TIMEOUT:
+                del self.clients[address]
+    
+    def step(self):
+        started = time.perf_counter()
+        self.receive()
+        game = self.game
+        
+        # The first player to join starts the run
+        if game.state == GameState.TITLE and self.clients:
+            game.start(endless=self.endless, seed=self.seed)
+        
+        bits = [0, 0]
+        for client in self.clients.values():
+            if client.inputs:
+                client.processed, client.bits = client.inputs.popleft()
+            bits[client.slot] = client.bits
+        
+        if game.state == GameState.PLAYING:
+            keys = game.apply_input(bits[0])
+            partner_keys = game.apply_partner_input(bits[1])
+            game.update(self.step_time, keys, partner_keys)
+            self.waiting = 0
+        elif game.state != GameState.TITLE:
+            # Nobody to press a key on the server, move on after a short pause
+            self.waiting += 1
+            if self.waiting >= RESTART_DELAY * self.rate:
+                self.waiting = 0
+                if game.state == GameState.LEVEL_COMPLETE:
+                    game.next_level()
+                else:
+                    game.start(endless=self.endless, seed=self.seed)
+        
+        self.tick += 1
+        if self.tick % self.send_every == 0:
+            self.broadcast()
+        
+        self.ticks += 1
+        self.cpu_time += time.perf_counter() - started
+    
+    def broadcast(self):
+        game = self.game
+        tick = self.tick
+        records = capture(game, self.ids)
+        self.history[tick] = records
+        self.history.pop(tick - HISTORY * self.send_every, None)
+        
+        full = None
+        for client in self.clients.values():
+            baseline_tick = client.ack if client.ack in self.history else 0
+            baseline = self.history[baseline_tick] if baseline_tick else {}
+            header = SNAPSHOT_HEADER.pack(SNAPSHOT, tick, baseline_tick, client.processed, client.slot,
+                                          game.state.value, game.current_level, game.lives, game.score,
+                                          game.endless_mode, game.endless_seed)
+            packet = header + encode_entities(records, baseline)
+            self.transport.send(packet, client.address)
+            
+            self.bytes_sent += len(packet)
+            self.packets_sent += 1
+            if full is None:
+                full = len(header) + len(encode_entities(records, {}))
+            self.full_bytes += full
+    
+    def stats(self):
+        """Per tick CPU cost and snapshot sizes so far"""
+        ticks = max(1, self.ticks)
+        packets = max(1, self.packets_sent)
+        return {
+            'ticks': self.ticks,
+            'cpu_ms_per_tick': self.cpu_time / ticks * 1000,
+            'bytes_per_snapshot': self.bytes_sent / packets,
+            'full_bytes_per_snapshot': self.full_bytes / packets,
+            'kbit_per_second_per_client': self.bytes_sent / packets * self.rate / self.send_every * 8 / 1000
+        }
+    
+    def run(self, duration=None):
+        """Step in real time until duration seconds pass, or forever"""
+        started = next_tick = time.perf_counter()
+        while duration is None or time.perf_counter() - started < duration:
+            self.step()
+            next_tick += self.step_time
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_tick = time.perf_counter()  # Fell behind, don't try to catch up in a burst
+
+# Client
+
+class NetView:
+    """What a client draws, the same attributes the renderer reads from a Game"""
+    def __init__(self):
+        self.state = GameState.TITLE
+        self.current_level = 0
+        self.score = 0
+        self.lives = 3
+        self.endless_mode = False
+        self.endless_seed = 0
+        self.player = None
+        self.partner = None
+        self.platforms = []
+        self.enemies = []
+        self.bullets = []
+        self.enemy_bullets = []
+        self.powerups = []
+        self.particle_system = ParticleSystem(enabled=False)
+        self.bullet_field = BulletField()
+    
+    def get_theme(self):
+        return level_themes[self.current_level % len(level_themes)]
+    
+    def get_wave(self):
+        return None  # Networked games are never horde runs
+
+def apply_player(player, values, x, y):
+    player.x = x
+    player.y = y
+    player.vel_x = values[2]
+    player.vel_y = values[3]
+    player.health = values[4]
+    flags = values[5]
+    player.facing_right = bool(flags & 1)
+    player.on_ground = bool(flags & 2)
+    player.dashing = bool(flags & 4)
+    player.invulnerable = bool(flags & 8)
+    player.can_double_jump = bool(flags & 16)
+    player.dash_available = bool(flags & 32)
+    
+    # Powers change move speed and jump height, so prediction needs them too
+    power = POWER_TYPES[values[6]]
+    if power != player.special_power:
+        player.deactivate_power()
+        if power is not None:
+            player.activate_power(power)
+    player.update_shape()
+
+def make_object(kind, values, x, y):
+    if kind == PLAYER:
+        player = Player(x, y)
+        player.color = PLAYER_COLORS[values[7] % len(PLAYER_COLORS)]
+        return player
+    if kind == ENEMY:
+        enemy_type = ENEMY_TYPES[values[3]]
+        return Boss(x, y) if enemy_type == "boss" else Enemy(x, y, enemy_type)
+    if kind == BULLET or kind == ENEMY_BULLET:
+        style = BULLET_STYLES[min(values[4], 2)]
+        return style(x, y, values[2], values[3], tuple(values[6:9]))
+    if kind == POWERUP:
+        return PowerUp(x, y, POWER_TYPES[values[2]])
+    return Platform(values[0], values[1], values[2], values[3], tuple(values[6:9]), PLATFORM_TYPES[values[4]])
+
+def apply_values(kind, obj, values, x, y, dt):
+    if kind == PLAYER:
+        apply_player(obj, values, x, y)
+        obj.update_animation(dt)
+    elif kind == ENEMY:
+        obj.x = x
+        obj.y = y
+        obj.rect.x = x - obj.width / 2
+        obj.rect.y = y - obj.height / 2
+        obj.health = values[2]
+        obj.facing_right = bool(values[4] & 1)
+        obj.damaged_timer = obj.damage_flash_duration if values[4] & 2 else 0
+        if isinstance(obj, Boss):
+            obj.shield_active = bool(values[4] & 4)
+            obj.phase = values[5]
+            obj.shield_health = values[6]
+    elif kind == BULLET or kind == ENEMY_BULLET:
+        obj.vel_x = values[2]
+        obj.vel_y = values[3]
+        obj.move_to(x, y)
+        if values[4] == EXPLODED:
+            obj.has_exploded = True
+            obj.explosion_timer = values[5] / 1000
+    elif kind == POWERUP:
+        obj.x = x
+        obj.y = y
+        obj.rect.center = (int(x), int(y))
+        obj.update(dt)
+
+class NetClient:
+    """Sends input to a NetServer and rebuilds the game from its snapshots for drawing.
+    
+    The local player is predicted: inputs run through Player.update right
+    away, and every snapshot resets it to the server's state and replays
+    the inputs the server hasn't simulated yet. Everything else is drawn
+    interpolation seconds in the past, between the two snapshots around
+    that time, so it moves smoothly at any snapshot rate.
+    """
+    def __init__(self, transport, server_address, rate=FPS, interpolation=0.1):
+        self.transport = transport
+        self.server_address = server_address
+        self.rate = rate
+        self.step_time = 1.0 / rate
+        self.interpolation_ticks = interpolation * rate
+        
+        self.sequence = 0
+        self.inputs = deque()  # (sequence, bits) the server hasn't simulated yet
+        self.acked_bits = 0  # Bits of the newest input the server simulated
+        self.last_bits = 0
+        self.pressed = 0
+        self.accumulator = 0.0
+        self.last_time = None
+        
+        self.states = {}  # Server tick -> records
+        self.latest_tick = 0
+        self.received_at = 0.0
+        self.slot = None
+        
+        self.player = None  # Predicted local player
+        self.player_id = None
+        self.objects = {}  # Net id -> (kind, object) for everything else
+        self.platform_objects = {}
+        self.platforms = []
+        self.view = NetView()
+        self.bytes_received = 0
+    
+    def press(self, bits):
+        """Jump or shoot on the next tick even if the key is already up again by then"""
+        self.pressed |= bits
+    
+    def update(self, bits):
+        """Call once a frame with the held input bits, then draw self.view"""
+        now = time.perf_counter()
+        if self.last_time is None:
+            self.last_time = now
+        self.accumulator = min(self.accumulator + now - self.last_time, 0.25)
+        self.last_time = now
+        
+        self.receive()
+        while self.accumulator >= self.step_time:
+            self.accumulator -= self.step_time
+            self.tick(bits | self.pressed)
+            self.pressed = 0
+        self.refresh_view(now, self.step_time)
+    
+    def tick(self, bits):
+        self.sequence += 1
+        self.inputs.append((self.sequence, bits))
+        while len(self.inputs) > HISTORY:
+            self.inputs.popleft()
+        
+        recent = list(self.inputs)[-REDUNDANT_INPUTS:]
+        packet = INPUT_HEADER.pack(INPUT, self.latest_tick, self.sequence, len(recent))
+        self.transport.send(packet + bytes(value for _, value in recent), self.server_address)
+        
+        if self.player is not None and self.view.state == GameState.PLAYING:
+            self.predict(bits, self.last_bits)
+        self.last_bits = bits
+    
+    def predict(self, bits, last_bits):
+        if bits & ~last_bits & INPUT_JUMP:
+            self.player.jump()
+        self.player.update(self.platforms, self.step_time, InputState(bits))
+    
+    def receive(self):
+        for data, address in self.transport.receive():
+            if len(data) < SNAPSHOT_HEADER.size or data[0] != SNAPSHOT:
+                continue
+            (_, tick, baseline_tick, input_ack, slot, state, level, lives, score,
+             endless, seed) = SNAPSHOT_HEADER.unpack_from(data)
+            if tick <= self.latest_tick:
+                continue  # Arrived late, a newer one is already in
+            
+            baseline = {}
+            if baseline_tick:
+                baseline = self.states.get(baseline_tick)
+                if baseline is None:
+                    continue  # Too old to rebuild, the server moves on once a newer tick is acked
+            
+            records = decode_entities(data, SNAPSHOT_HEADER.size, baseline)
+            self.bytes_received += len(data)
+            self.states[tick] = records
+            for old_tick in [old_tick for old_tick in self.states if old_tick <= tick - HISTORY * 2]:
+                del self.states[old_tick]
+            self.latest_tick = tick
+            self.received_at = time.perf_counter()
+            self.slot = slot
+            
+            view = self.view
+            view.state = GameState(state)
+            view.current_level = level
+            view.lives = lives
+            view.score = score
+            view.endless_mode = bool(endless)
+            view.endless_seed = seed
+            
+            self.sync_platforms(records)
+            self.reconcile(records, input_ack)
+    
+    def sync_platforms(self, records):
+        """Platforms follow the newest snapshot, prediction collides with them"""
+        objects = self.platform_objects
+        live = set()
+        for net_id, (kind, values) in records.items():
+            if kind != PLATFORM:
+                continue
+            live.add(net_id)
+            platform = objects.get(net_id)
+            if platform is None:
+                platform = objects[net_id] = make_object(kind, values, values[0], values[1])
+            platform.x = platform.rect.x = values[0]
+            platform.y = platform.rect.y = values[1]
+            platform.is_active = bool(values[5])
+        for net_id in [net_id for net_id in objects if net_id not in live]:
+            del objects[net_id]
+        self.platforms = [platform for platform in objects.values() if platform.is_active]
+    
+    def reconcile(self, records, input_ack):
+        """Reset the local player to the server's state and replay what it hasn't seen yet"""
+        own = None
+        for net_id, (kind, values) in records.items():
+            if kind == PLAYER and values[7] == self.slot:
+                own = net_id, values
+                break
+        if own is None:
+            self.player = None
+            return
+        
+        net_id, values = own
+        x = values[0] / POSITION_SCALE
+        y = values[1] / POSITION_SCALE
+        if self.player is None or self.player_id != net_id:
+            self.player = make_object(PLAYER, values, x, y)
+            self.player_id = net_id
+        apply_player(self.player, values, x, y)
+        
+        while self.inputs and self.inputs[0][0] <= input_ack:
+            self.acked_bits = self.inputs.popleft()[1]
+        if self.view.state == GameState.PLAYING:
+            last_bits = self.acked_bits
+            for _, bits in self.inputs:
+                self.predict(bits, last_bits)
+                last_bits = bits
+    
+    def refresh_view(self, now, dt):
+        """Place everything but the local player between the snapshots around the render time"""
+        view = self.view
+        view.player = self.player
+        view.platforms = self.platforms
+        if not self.states:
+            return
+        
+        render_tick = self.latest_tick + (now - self.received_at) * self.rate - self.interpolation_ticks
+        ticks = sorted(self.states)
+        older = ticks[0]
+        newer = ticks[-1]
+        for tick in ticks:
+            if tick <= render_tick:
+                older = tick
+            else:
+                newer = tick
+                break
+        if newer < older:
+            newer = older
+        fraction = 1.0
+        if newer != older:
+            fraction = min(1.0, max(0.0, (render_tick - older) / (newer - older)))
+        old_records = self.states[older]
+        
+        lists = {ENEMY: [], BULLET: [], ENEMY_BULLET: [], POWERUP: []}
+        view.partner = None
+        live = {}
+        for net_id, (kind, values) in self.states[newer].items():
+            if kind == PLATFORM or (kind == PLAYER and values[7] == self.slot):
+                continue
+            
+            x = values[0] / POSITION_SCALE
+            y = values[1] / POSITION_SCALE
+            old = old_records.get(net_id)
+            if old is not None and old[0] == kind:
+                x = old[1][0] / POSITION_SCALE + (x - old[1][0] / POSITION_SCALE) * fraction
+                y = old[1][1] / POSITION_SCALE + (y - old[1][1] / POSITION_SCALE) * fraction
+            
+            entry = self.objects.get(net_id)
+            if entry is None or entry[0] != kind:
+                entry = (kind, make_object(kind, values, x, y))
+            live[net_id] = entry
+            obj = entry[1]
+            apply_values(kind, obj, values, x, y, dt)
+            
+            if kind == PLAYER:
+                view.partner = obj
+            else:
+                lists[kind].append(obj)
+        
+        self.objects = live
+        view.enemies = lists[ENEMY]
+        view.bullets = lists[BULLET]
+        view.enemy_bullets = lists[ENEMY_BULLET]
+        view.powerups = lists[POWERUP]
+
+# Benchmark and dedicated server
+
+def bench_bits(tick, slot):
+    """Scripted input for benchmark clients: walk back and forth, hop and shoot now and then"""
+    bits = INPUT_RIGHT if (tick // 90 + slot) % 2 else INPUT_LEFT
+    if tick % 40 == slot * 20:
+        bits |= INPUT_JUMP
+    if tick % 15 == 0:
+        bits |= INPUT_SHOOT
+    return bits
+
+def run_bench(seconds, latency, loss, send_every):
+    """Server and two clients on a loopback network in one process, in real time"""
+    network = LoopbackNetwork(latency=latency, loss=loss)
+    server = NetServer(network.transport("server"), send_every=send_every, seed=1)
+    clients = [NetClient(network.transport(f"client{slot}"), "server") for slot in range(2)]
+    
+    next_tick = time.perf_counter()
+    for tick in range(int(seconds * FPS)):
+        for slot, client in enumerate(clients):
+            client.receive()
+            client.tick(bench_bits(tick, slot))
+            client.refresh_view(time.perf_counter(), 1.0 / FPS)
+        server.step()
+        
+        next_tick += 1.0 / FPS
+        delay = next_tick - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+    
+    stats = server.stats()
+    print(f"{stats['ticks']} ticks, server {stats['cpu_ms_per_tick']:.3f} ms per tick")
+    print(f"snapshots {stats['bytes_per_snapshot']:.0f} bytes with deltas, "
+          f"{stats['full_bytes_per_snapshot']:.0f} bytes without")
+    print(f"{stats['kbit_per_second_per_client']:.1f} kbit/s per client at {FPS / send_every:.0f} snapshots/s")
+    for slot, client in enumerate(clients):
+        print(f"client {slot}: slot {client.slot}, {client.bytes_received} bytes received, "
+              f"{len(client.inputs)} inputs awaiting the server")
+
+def main():
+    parser = argparse.ArgumentParser(description="Co-op server, clients connect with main.py --connect HOST:PORT")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on")
+    parser.add_argument("--port", type=int, default=5005)
+    parser.add_argument("--endless", action="store_true", help="Play generated endless levels")
+    parser.add_argument("--send-every", type=int, default=2, help="Ticks between snapshots")
+    parser.add_argument("--bench", type=float, default=None, metavar="SECONDS",
+                        help="Instead of serving, run two scripted clients over loopback and report costs")
+    parser.add_argument("--latency", type=float, default=0.05, help="Benchmark one-way latency in seconds")
+    parser.add_argument("--loss", type=float, default=0.02, help="Benchmark packet loss rate")
+    args = parser.parse_args()
+    
+    if args.bench is not None:
+        run_bench(args.bench, args.latency, args.loss, args.send_every)
+        return
+    
+    server = NetServer(UdpTransport((args.host, args.port)), send_every=args.send_every, endless=args.endless)
+    print(f"Serving co-op on {args.host}:{args.port}")
+    try:
+        server.run()
+    except KeyboardInterrupt:
+        pass
+    stats = server.stats()
+    print(f"{stats['ticks']} ticks, {stats['cpu_ms_per_tick']:.3f} ms per tick, "
+          f"{stats['kbit_per_second_per_client']:.1f} kbit/s per client")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,186 @@
+import pygame
+import math
+import numpy as np
+from ecs import World, integrate, expire, render_state
+from quality import governor
+from sprites import prepare
+
+# Pixel offsets covered by a particle of each radius, built on first use
+disc_offsets = {}
+
+def get_disc_offsets(radius):
+    """(dx, dy) arrays of the pixels in a filled circle, relative to its center pixel"""
+    offsets = disc_offsets.get(radius)
+    if offsets is None:
+        dx, dy = np.meshgrid(np.arange(-radius, radius), np.arange(-radius, radius), indexing='ij')
+        inside = (dx + 0.5) ** 2 + (dy + 0.5) ** 2 <= radius * radius
+        offsets = (dx[inside].astype(np.int32), dy[inside].astype(np.int32))
+        disc_offsets[radius] = offsets
+    return offsets
+
+class ParticleSystem:
+    """Particles live as entities in an ECS world, updated a whole array at a time"""
+    def __init__(self, enabled=True):
+        self.world = World(capacity=512)
+        self.enabled = enabled  # Headless simulations skip cosmetic particles
+    
+    def __len__(self):
+        return self.world.count
+    
+    def update(self, dt):
+        # Move particles, then remove the ones that faded out
+        integrate(self.world, dt)
+        expire(self.world, dt)
+    
+    def clear(self):
+        self.world.clear()
+    
+    def copy(self):
+        particle_system = ParticleSystem.__new__(ParticleSystem)
+        particle_system.world = self.world.copy()
+        particle_system.enabled = self.enabled
+        return particle_system
+    
+    def add_particle(self, x, y, vel_x, vel_y, color, size, lifetime):
+        if self.enabled:
+            self.world.create(x=x, y=y, vel_x=vel_x, vel_y=vel_y, gravity=np.random.uniform(50, 150),
+                              size=size, lifetime=lifetime, color=color)
+    
+    def add_particles(self, count, x, y, vel_x, vel_y, color, size, lifetime):
+        """Spawn a batch of particles from per-particle arrays"""
+        if self.enabled and count > 0:
+            self.world.create_many(count, x=x, y=y, vel_x=vel_x, vel_y=vel_y,
+                                   gravity=np.random.uniform(50, 150, count),
+                                   size=size, lifetime=lifetime, color=color)
+    
+    def draw(self, surface):
+        world = self.world
+        slots, radius, alpha = render_state(world)
+        
+        for slot, r, a in zip(slots.tolist(), radius.tolist(), alpha.tolist()):
+            if r < 1:
+                continue
+            
+            # Create surface for semi-transparent particle
+            particle_surface = pygame.Surface((r * 2, r * 2), pygame.SRCALPHA)
+            color = (int(world.red[slot]), int(world.green[slot]), int(world.blue[slot]), a)
+            pygame.draw.circle(particle_surface, color, (r, r), r)
+            
+            # Blit to screen
+            surface.blit(particle_surface, (int(world.x[slot]) - r, int(world.y[slot]) - r))
+    
+    def create_explosion(self, x, y, color, count=20):
+        if not self.enabled:
+            return
+        
+        count = governor.count(count)
+        angle = np.random.uniform(0, 2 * math.pi, count)
+        speed = np.random.uniform(50, 200, count)
+        size = np.random.randint(2, 7, count)
+        lifetime = np.random.uniform(0.5, 1.5, count)
+        
+        self.add_particles(count, x, y, np.cos(angle) * speed, np.sin(angle) * speed, color, size, lifetime)
+    
+    def create_trail(self, x, y, color, direction, count=5):
+        if not self.enabled:
+            return
+        
+        count = governor.count(count)
+        angle = np.random.uniform(-0.5, 0.5, count) + direction
+        speed = np.random.uniform(10, 30, count)
+        size = np.random.randint(1, 4, count)
+        lifetime = np.random.uniform(0.3, 0.7, count)
+        
+        # Negative to go opposite of direction
+        self.add_particles(count, x, y, -np.cos(angle) * speed, -np.sin(angle) * speed, color, size, lifetime)
+
+class ParticleRasterizer:
+    """Draws every live particle in one pass with NumPy instead of one blit each.
+    
+    Particles are splatted as discs into a screen-sized buffer through
+    pygame.surfarray and the region around them goes to the screen in a
+    single blit, so the cost follows the pixels covered rather than the
+    particle count. Overlaps are blended per pixel: alpha mode averages the colors
+    weighted by alpha and stacks the coverage, additive mode sums the light.
+    """
+    def __init__(self, additive=False):
+        self.additive = additive
+        self.buffer = None
+    
+    def get_buffer(self, size):
+        if self.buffer is None or self.buffer.get_size() != size:
+            self.buffer = prepare(pygame.Surface(size, pygame.SRCALPHA))
+        return self.buffer
+    
+    def draw(self, particle_system, surface):
+        world = particle_system.world
+        slots, radius, alpha = render_state(world)
+        visible = radius >= 1
+        if not visible.any():
+            return
+        
+        slots = slots[visible]
+        radius = radius[visible]
+        opacity = np.minimum(alpha[visible], 254) / 255.0  # Full opacity would take log(0) below
+        x = world.x[slots].astype(np.int32)
+        y = world.y[slots].astype(np.int32)
+        colors = np.stack((world.red[slots], world.green[slots], world.blue[slots]), axis=1).astype(np.float64)
+        
+        # Only the box around all particles gets touched
+        width, height = surface.get_size()
+        left = max(0, int((x - radius).min()))
+        top = max(0, int((y - radius).min()))
+        right = min(width, int((x + radius).max()))
+        bottom = min(height, int((y + radius).max()))
+        if left >= right or top >= bottom:
+            return
+        
+        # Every covered pixel as a column-major screen index, one batch per radius
+        pixels = []
+        owners = []
+        for r in np.unique(radius).tolist():
+            group = np.flatnonzero(radius == r)
+            dx, dy = get_disc_offsets(r)
+            px = x[group, None] + dx
+            py = y[group, None] + dy
+            inside = (px >= left) & (px < right) & (py >= top) & (py < bottom)
+            pixels.append((px * height + py)[inside])
+            owners.append(np.broadcast_to(group[:, None], px.shape)[inside])
+        owners = np.concatenate(owners)
+        if not len(owners):
+            return
+        
+        # Accumulate per distinct pixel, so overlaps blend and empty space costs nothing
+        pixels, slot = np.unique(np.concatenate(pixels), return_inverse=True)
+        count = len(pixels)
+        weight = opacity[owners]
+        rgb = np.empty((count, 3))
+        for channel in range(3):
+            rgb[:, channel] = np.bincount(slot, weight * colors[owners, channel], count)
+        
+        if self.additive:
+            np.minimum(rgb, 255, out=rgb)
+            coverage = np.where(rgb.any(axis=1), 255, 0)
+            flags = pygame.BLEND_RGB_ADD
+        else:
+            # Overlapping particles cover 1 - prod(1 - alpha) of the pixel, in their alpha weighted average color
+            total = np.bincount(slot, weight, count)
+            rgb /= np.maximum(total, 1e-6)[:, None]
+            coverage = 255 * (1 - np.exp(np.bincount(slot, np.log1p(-weight), count)))
+            flags = 0
+        
+        # Clear what the last frame left in the region, then write the covered pixels
+        buffer = self.get_buffer((width, height))
+        region = pygame.Rect(left, top, right - left, bottom - top)
+        buffer.fill((0, 0, 0, 0), region)
+        column = pixels // height
+        row = pixels % height
+        
+        color_view = pygame.surfarray.pixels3d(buffer)
+        color_view[column, row] = rgb
+        del color_view
+        alpha_view = pygame.surfarray.pixels_alpha(buffer)
+        alpha_view[column, row] = coverage
+        del alpha_view
+        
+        surface.blit(buffer, region.topleft, region, flags)
\ No newline at end of file
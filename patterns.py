@@ -0,0 +1,155 @@
+import math
+import pygame
+import numpy as np
+from constants import *
+from ecs import World, integrate, offscreen, overlapping
+from sprites import SpriteCache
+
+# Boss bullet patterns as data. Each phase runs its emitters side by side; an emitter fires
+# its shape every interval seconds. Angles are radians, 0 pointing right and pi/2 down.
+#   ring:   count bullets spread evenly round a circle (or over arc), turning at spin per second
+#   spiral: count arms, the whole spiral turning by step every shot
+#   fan:    count bullets over spread, aimed at the player
+#   wave:   a fan aimed at the player that sweeps amplitude either side over period seconds
+PATTERNS = {
+    1: (
+        {'shape': 'fan', 'interval': 1.6, 'count': 5, 'spread': 0.8, 'speed': 220, 'color': (255, 120, 60)},
+        {'shape': 'ring', 'interval': 3.0, 'delay': 1.5, 'count': 16, 'speed': 150, 'spin': 0.5,
+         'color': (255, 200, 80)}
+    ),
+    2: (
+        {'shape': 'spiral', 'interval': 0.08, 'count': 3, 'step': 0.19, 'speed': 170, 'color': (255, 80, 160)},
+        {'shape': 'fan', 'interval': 2.0, 'count': 7, 'spread': 1.0, 'speed': 240, 'color': (255, 120, 60)}
+    ),
+    3: (
+        {'shape': 'spiral', 'interval': 0.05, 'count': 5, 'step': -0.23, 'speed': 190, 'radius': 4,
+         'color': (255, 60, 60)},
+        {'shape': 'ring', 'interval': 1.2, 'count': 32, 'speed': 160, 'spin': -0.8, 'color': (255, 200, 80)},
+        {'shape': 'wave', 'interval': 0.1, 'count': 3, 'spread': 0.25, 'amplitude': 0.9, 'period': 2.0,
+         'speed': 260, 'color': (200, 120, 255)}
+    )
+}
+
+# One-off bursts for the boss's attacks
+CHARGE_BURST = {'shape': 'ring', 'count': 12, 'speed': 200, 'color': (255, 160, 40)}
+SLAM_WAVE = {'shape': 'ring', 'count': 15, 'arc': (math.pi, 2 * math.pi), 'speed': 280, 'radius': 6,
+             'color': (255, 220, 120)}
+
+BULLET_RADIUS = 5
+BULLET_MARGIN = 50  # How far off screen a bullet gets before it's dropped
+MAX_BULLETS = 4096  # Emitters hold fire rather than grow past this
+
+bullet_sprites = SpriteCache()  # By (radius, color)
+
+def ring_angles(spec, time, shots, aim):
+    arc = spec.get('arc')
+    if arc is None:
+        angles = np.arange(spec['count']) * (2 * math.pi / spec['count'])
+    else:
+        angles = np.linspace(arc[0], arc[1], spec['count'])
+    return angles + spec.get('spin', 0) * time
+
+def spiral_angles(spec, time, shots, aim):
+    return np.arange(spec['count']) * (2 * math.pi / spec['count']) + shots * spec['step']
+
+def fan_angles(spec, time, shots, aim):
+    spread = spec['spread']
+    return aim + np.linspace(-spread / 2, spread / 2, spec['count'])
+
+def wave_angles(spec, time, shots, aim):
+    sweep = spec['amplitude'] * math.sin(2 * math.pi * time / spec['period'])
+    return fan_angles(spec, time, shots, aim + sweep)
+
+SHAPES = {'ring': ring_angles, 'spiral': spiral_angles, 'fan': fan_angles, 'wave': wave_angles}
+
+class BulletField:
+    """Simple linear bullets by the thousand, stored, moved and hit-tested a whole array at a time.
+    
+    Bullets are entities in an ECS world like particles, with a collider
+    for the hit tests and no lifetime: they fly straight until they leave
+    the screen or hit someone.
+    """
+    def __init__(self, capacity=1024):
+        self.world = World(capacity=capacity)
+    
+    def __len__(self):
+        return self.world.count
+    
+    def spawn(self, x, y, angles, speed, radius=BULLET_RADIUS, color=WHITE):
+        count = min(len(angles), MAX_BULLETS - self.world.count)
+        if count <= 0:
+            return
+        angles = angles[:count]
+        self.world.create_many(count, x=x, y=y, vel_x=np.cos(angles) * speed, vel_y=np.sin(angles) * speed,
+                               width=radius * 2, size=radius, color=color)
+    
+    def update(self, dt):
+        integrate(self.world, dt)
+        self.world.remove(offscreen(self.world, BULLET_MARGIN))
+    
+    def hits(self, rect):
+        """Slots of the bullets touching a pygame.Rect"""
+        return overlapping(self.world, rect)
+    
+    def remove(self, slots):
+        dead = np.zeros(self.world.count, dtype=bool)
+        dead[slots] = True
+        self.world.remove(dead)
+    
+    def clear(self):
+        self.world.clear()
+    
+    def copy(self):
+        field = BulletField.__new__(BulletField)
+        field.world = self.world.copy()
+        return field
+    
+    def draw(self, surface):
+        """Every bullet in one Surface.blits call per look, thousands fit in a couple of milliseconds"""
+        world = self.world
+        n = world.count
+        if n == 0:
+            return
+        
+        radii = world.size[:n].astype(np.int32)
+        left = world.x[:n].astype(np.int32) - radii
+        top = world.y[:n].astype(np.int32) - radii
+        looks = (radii.astype(np.int64) << 24 | world.red[:n].astype(np.int64) << 16 |
+                 world.green[:n].astype(np.int64) << 8 | world.blue[:n])
+        for look in np.unique(looks).tolist():
+            group = np.flatnonzero(looks == look)
+            radius, color = look >> 24, ((look >> 16) & 255, (look >> 8) & 255, look & 255)
+            sprite = bullet_sprites.get((radius, color), render_bullet, radius, color)
+            surface.blits([(sprite, position) for position in zip(left[group].tolist(), top[group].tolist())],
+                          False)
+
+def render_bullet(radius, color):
+    # A disc with a hot core, so bullets read against any background
+    surface = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+    pygame.draw.circle(surface, color, (radius, radius), radius)
+    core = tuple(min(255, channel + 120) for channel in color)
+    pygame.draw.circle(surface, core, (radius, radius), max(1, radius // 2))
+    return surface
+
+def emit(spec, field, x, y, aim=0.0, time=0.0, shots=0):
+    """Fire one shot of a pattern spec into the field"""
+    angles = SHAPES[spec['shape']](spec, time, shots, aim)
+    field.spawn(x, y, angles, spec['speed'], spec.get('radius', BULLET_RADIUS), spec.get('color', WHITE))
+
+class Emitter:
+    """Fires one pattern spec on its interval, keeping the time and shot count its shape needs"""
+    def __init__(self, spec):
+        self.spec = spec
+        self.timer = spec.get('delay', 0.0)
+        self.time = 0.0
+        self.shots = 0
+    
+    def update(self, dt, x, y, target, field):
+        self.time += dt
+        self.timer -= dt
+        # Short intervals can come round more than once in a long frame
+        while self.timer <= 0:
+            aim = math.atan2(target.y - y, target.x - x)
+            emit(self.spec, field, x, y, aim, self.time, self.shots)
+            self.shots += 1
+            self.timer += self.spec['interval']
\ No newline at end of file
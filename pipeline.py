@@ -0,0 +1,138 @@
+import time
+import threading
+from constants import *
+from game import GameState
+
+# Platforms that never change once built, snapshots share them instead of copying
+STATIC_PLATFORMS = ("normal", "bounce")
+
+# Render state that updates change in place, so freeze copies it. Everything else drawing reads is
+# numbers, strings and tuples, or lists the simulation replaces rather than edits
+RENDER_STATE = ('rect', 'trail_points')
+
+def freeze(entity):
+    """Copy of an entity for drawing that later updates to the original can't reach.
+    
+    Only the render state is copied. Attributes a class names in
+    simulation_only (shared game lists, targets, AI state) are left out,
+    so a snapshot never holds on to live game objects.
+    """
+    cls = type(entity)
+    clone = cls.__new__(cls)
+    clone_state = clone.__dict__
+    clone_state.update(entity.__dict__)
+    for name in cls.simulation_only:
+        clone_state.pop(name, None)
+    for name in RENDER_STATE:
+        value = clone_state.get(name)
+        if value is not None:
+            clone_state[name] = value.copy()
+    return clone
+
+class Snapshot:
+    """Everything the renderer reads from a Game, copied at the end of a simulation step"""
+    def __init__(self, game):
+        self.state = game.state
+        self.theme = game.get_theme()
+        self.current_level = game.current_level
+        self.score = game.score
+        self.lives = game.lives
+        self.endless_mode = game.endless_mode
+        self.endless_seed = game.endless_seed
+        self.wave = game.get_wave()
+        
+        self.player = freeze(game.player) if game.player is not None else None
+        self.partner = freeze(game.partner) if game.partner is not None else None
+        self.platforms = [platform if platform.platform_type in STATIC_PLATFORMS else freeze(platform)
+                          for platform in game.platforms]
+        self.enemies = [freeze(enemy) for enemy in game.enemies]
+        self.bullets = [freeze(bullet) for bullet in game.bullets]
+        self.enemy_bullets = [freeze(bullet) for bullet in game.enemy_bullets]
+        self.powerups = [freeze(powerup) for powerup in game.powerups]
+        self.particle_system = game.particle_system.copy()
+        self.bullet_field = game.bullet_field.copy()
+    
+    def get_theme(self):
+        return self.theme
+    
+    def get_wave(self):
+        return self.wave
+
+class SimulationThread(threading.Thread):
+    """Runs Game.update at a fixed rate on its own thread and publishes snapshots.
+    
+    Snapshots are double buffered: the simulation fills the back slot and then
+    flips which slot is the front, so the renderer always gets a complete
+    frame without waiting on the simulation. Anything else that changes the
+    game (menu keys, pausing) must hold lock while doing it. Input reaches the
+    simulation as bitmasks through press() and hold().
+    """
+    def __init__(self, game, rate=FPS):
+        super().__init__(daemon=True)
+        self.game = game
+        self.step = 1.0 / rate
+        self.lock = threading.Lock()
+        self.running = True
+        self.steps = 0  # Simulation steps taken so far
+        
+        self.buffers = [Snapshot(game), None]
+        self.front = 0
+        self.published_state = game.state
+        
+        # Input captured on the main thread
+        self.held = 0
+        self.pressed = 0
+        self.input_lock = threading.Lock()
+    
+    def hold(self, bits):
+        """Set the inputs currently held down"""
+        self.held = bits
+    
+    def press(self, bits):
+        """Queue one-off presses (jump, shoot) so they aren't missed between steps"""
+        with self.input_lock:
+            self.pressed |= bits
+    
+    def latest(self):
+        """The most recent complete snapshot"""
+        return self.buffers[self.front]
+    
+    def publish(self):
+        back = 1 - self.front
+        self.buffers[back] = Snapshot(self.game)
+        self.front = back
+        self.published_state = self.game.state
+    
+    def run(self):
+        game = self.game
+        next_time = time.perf_counter()
+        
+        while self.running:
+            with self.lock:
+                if game.state == GameState.PLAYING:
+                    with self.input_lock:
+                        pressed = self.pressed
+                        self.pressed = 0
+                    
+                    # A queued press counts even if the key is still held from before
+                    game.last_input &= ~pressed
+                    keys = game.apply_input(self.held | pressed)
+                    game.update(self.step, keys)
+                    self.steps += 1
+                    self.publish()
+                elif game.state != self.published_state:
+                    # Menus only need a new snapshot when something changed
+                    self.publish()
+            
+            # Sleep until the next step, or carry on right away if we fell behind
+            next_time += self.step
+            delay = next_time - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_time = time.perf_counter()
+    
+    def stop(self):
+        self.running = False
+        if self.is_alive():
+            self.join(timeout=1)
\ No newline at end of file
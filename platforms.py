@@ -2,8 +2,14 @@ import pygame
 import random
 import math
 from constants import *
+import kernels
+from collision import mask_for, LAYER_PLATFORM
 
 class Platform:
+    collision_layer = LAYER_PLATFORM
+    collision_mask = mask_for(LAYER_PLATFORM)
+    simulation_only = ()  # Attributes snapshots for drawing leave out
+    
     def __init__(self, x, y, width, height, color=None, platform_type="normal"):
         self.x = x
         self.y = y
@@ -273,6 +279,71 @@ class Platform:
         # Draw outline
         pygame.draw.rect(surface, self.outline_color, self.rect, 2)
 
+class PlatformSet:
+    """A level's platforms, split into live geometry and retired (fallen or crumbled) ones.
+    
+    Iterating, len() and indexing only see active platforms, so it stands in
+    for the old platform list. Retiring swaps the platform with the last
+    active one, which keeps it O(1) but doesn't keep the order.
+    """
+    def __init__(self, platforms=()):
+        self.active = list(platforms)
+        self.retired = []
+        self.slots = {platform: i for i, platform in enumerate(self.active)}
+        
+        # Platforms handed out by iteration this frame and the last, to check dead ones are skipped
+        self.visits = 0
+        self.last_frame_visits = 0
+        
+        self.packed = None  # Bounds of the active platforms for the kernels, until something moves
+    
+    def __iter__(self):
+        self.visits += len(self.active)
+        return iter(self.active)
+    
+    def __len__(self):
+        return len(self.active)
+    
+    def __getitem__(self, index):
+        return self.active[index]
+    
+    def __contains__(self, platform):
+        return platform in self.slots
+    
+    def retire(self, platform):
+        """Stop updating, colliding with and drawing a platform"""
+        slot = self.slots.pop(platform, None)
+        if slot is None:
+            return
+        
+        last = self.active.pop()
+        if last is not platform:
+            self.active[slot] = last
+            self.slots[last] = slot
+        self.retired.append(platform)
+        self.moved()
+    
+    def begin_frame(self):
+        self.last_frame_visits = self.visits
+        self.visits = 0
+        self.moved()
+    
+    def bounds(self):
+        """The active platforms' rects packed for the collision kernels, in iteration order"""
+        if self.packed is None:
+            self.packed = kernels.pack_bounds([platform.rect for platform in self.active])
+        return self.packed
+    
+    def moved(self):
+        """Platforms moved, or the set changed, so bounds() gets packed again"""
+        self.packed = None
+
+def get_bounds(platforms):
+    """Kernel bounds for a PlatformSet, cached, or for any other list of platforms"""
+    if isinstance(platforms, PlatformSet):
+        return platforms.bounds()
+    return kernels.pack_bounds([platform.rect for platform in platforms])
+
 def create_platform_layout(level_num, theme):
     """Create a platform layout for a specific level"""
     platforms = []
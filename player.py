@@ -2,8 +2,149 @@ import pygame
 import math
 import random  # Make sure random is imported
 from constants import *
+from sprites import SpriteCache
+from collision import move_box, collides, mask_for, LAYER_PLAYER
+from platforms import get_bounds
+import kernels
+from quality import governor
+
+# Player frames, trail ghosts, shield and health bars are drawn once and reused
+player_frames = SpriteCache()
+
+def player_layout(width, height):
+    """Body part rects relative to the player's center"""
+    # Main body - torso
+    torso_width = width * 0.8
+    torso_height = height * 0.4
+    torso_left = -torso_width // 2
+    torso_top = -torso_height // 2 - height * 0.1
+    
+    # Head
+    head_radius = width * 0.35
+    head_y = torso_top - head_radius
+    
+    # Legs
+    leg_width = width * 0.2
+    leg_height = height * 0.35
+    leg_left_x = -torso_width // 2 + leg_width // 2
+    leg_right_x = torso_width // 2 - leg_width // 2
+    leg_top = height * 0.05
+    
+    # Arms
+    arm_width = width * 0.2
+    arm_height = height * 0.3
+    arm_left_x = -torso_width // 2 - arm_width // 2
+    arm_right_x = torso_width // 2 + arm_width // 2
+    arm_top = -height * 0.2
+    
+    return {
+        'torso': (torso_left, torso_top, torso_width, torso_height),
+        'head': (0, head_y, head_radius),
+        'legs': [(leg_left_x, leg_top, leg_width, leg_height),
+                (leg_right_x, leg_top, leg_width, leg_height)],
+        'arms': [(arm_left_x, arm_top, arm_width, arm_height),
+                (arm_right_x, arm_top, arm_width, arm_height)]
+    }
+
+def frame_size(width, height):
+    # Room for the arms sticking out past the torso and the head above it
+    return (int(width * 1.5), int(height * 1.4))
+
+def frame_center(width, height):
+    return (int(width * 0.75), int(height * 0.8))
+
+def render_player_frame(width, height, color, stride, facing_right, flash, shooting):
+    """Draw one player pose onto its own surface, centered at frame_center(width, height)"""
+    layout = player_layout(width, height)
+    origin_x, origin_y = frame_center(width, height)
+    frame = pygame.Surface(frame_size(width, height), pygame.SRCALPHA)
+    
+    # Flashing while invulnerable lightens the legs and head
+    color_mod = 50 if flash else 0
+    
+    # Draw legs, one up and one down depending on the stride
+    for i, leg in enumerate(layout['legs']):
+        leg_x, leg_y, leg_w, leg_h = leg
+        leg_x += origin_x
+        leg_y += origin_y + (-5 if stride == i else 5)
+        
+        # Calculate leg color with proper capping
+        lr = min(255, max(0, int(color[0] - 30 + color_mod)))
+        lg = min(255, max(0, int(color[1] - 30 + color_mod)))
+        lb = min(255, max(0, int(color[2] - 30 + color_mod)))
+        leg_color = (lr, lg, lb)
+        
+        pygame.draw.rect(frame, leg_color, (leg_x, leg_y, leg_w, leg_h))
+        pygame.draw.rect(frame, BLACK, (leg_x, leg_y, leg_w, leg_h), 2)
+    
+    # Draw torso
+    torso_x, torso_y, torso_w, torso_h = layout['torso']
+    torso_x += origin_x
+    torso_y += origin_y
+    pygame.draw.rect(frame, color, (torso_x, torso_y, torso_w, torso_h))
+    pygame.draw.rect(frame, BLACK, (torso_x, torso_y, torso_w, torso_h), 2)
+    
+    # Draw arms, swinging opposite to the legs
+    for i, arm in enumerate(layout['arms']):
+        arm_x, arm_y, arm_w, arm_h = arm
+        arm_x += origin_x
+        arm_y += origin_y + (5 if stride == i else -5)
+        
+        # Front arm is raised into shooting position right after a shot
+        if shooting and i == (1 if facing_right else 0):
+            arm_y = torso_y + torso_h * 0.2
+        
+        pygame.draw.rect(frame, BLACK, (arm_x, arm_y, arm_w, arm_h), 2)
+    
+    # Draw head
+    head_x, head_y, head_r = layout['head']
+    head_x += origin_x
+    head_y += origin_y
+    
+    # Calculate head color with proper capping
+    hr = min(255, max(0, int(color[0] + 20 + color_mod)))
+    hg = min(255, max(0, int(color[1] + 20 + color_mod)))
+    hb = min(255, max(0, int(color[2] + 20 + color_mod)))
+    head_color = (hr, hg, hb)
+    
+    pygame.draw.circle(frame, head_color, (int(head_x), int(head_y)), int(head_r))
+    pygame.draw.circle(frame, BLACK, (int(head_x), int(head_y)), int(head_r), 2)
+    
+    # Draw eyes
+    eye_offset = 5 if facing_right else -5
+    pygame.draw.circle(frame, WHITE, (int(head_x + eye_offset), int(head_y - 2)), 5)
+    pygame.draw.circle(frame, BLACK, (int(head_x + eye_offset*1.5), int(head_y - 2)), 2)
+    
+    return frame
+
+def render_ghost(width, height, alpha):
+    """White silhouette box left behind while dashing"""
+    s = pygame.Surface((width, height), pygame.SRCALPHA)
+    s.fill((255, 255, 255, alpha))
+    return s
+
+def render_shield(shield_radius):
+    shield_surface = pygame.Surface((shield_radius*2, shield_radius*2), pygame.SRCALPHA)
+    pygame.draw.circle(shield_surface, (100, 200, 255, 100), (shield_radius, shield_radius), shield_radius)
+    pygame.draw.circle(shield_surface, (150, 220, 255, 150), (shield_radius, shield_radius), shield_radius, 3)
+    return shield_surface
+
+def render_health_bar(health_width, health_height, filled, health_color):
+    bar = pygame.Surface((health_width, health_height), pygame.SRCALPHA)
+    
+    # Health bar background
+    bar.fill((50, 50, 50))
+    
+    # Health bar
+    if filled > 0:
+        pygame.draw.rect(bar, health_color, (0, 0, filled, health_height))
+    return bar
 
 class Player:
+    collision_layer = LAYER_PLAYER
+    collision_mask = mask_for(LAYER_PLAYER)
+    simulation_only = ('landed_on',)  # Attributes snapshots for drawing leave out
+    
     def __init__(self, x, y):
         self.x = x
         self.y = y
@@ -21,7 +162,7 @@ class Player:
         self.invulnerable_timer = 0
         self.invulnerable_duration = 1.5  # seconds
         self.color = (50, 150, 250)
-        self.shape_points = []
+        self.layout = player_layout(self.width, self.height)
         self.update_shape()
         self.double_jump = False
         self.can_double_jump = True
@@ -36,55 +177,23 @@ class Player:
         self.dash_duration = 0.15
         self.dashing = False
         self.dash_timer = 0
+        self.dash_lift = -200  # Slight vertical boost at the start of a dash
+        self.double_jump_factor = 0.8  # Double jump is slightly weaker
+        self.max_fall_speed = 1000
         self.facing_right = True
         self.animation_state = 0
         self.animation_timer = 0
         self.wall_sliding = False
         self.wall_jump_cooldown = 0
+        self.keys = None
+        self.landed_on = []  # Platforms landed on during the last update
     
     def update_shape(self):
-        # Update player shape points based on current position
+        # Body parts are drawn relative to the center, only the hitbox follows the position
         self.rect = pygame.Rect(self.x - self.width // 2, self.y - self.height // 2, 
                                self.width, self.height)
-        
-        # Create a more interesting player shape
-        self.shape_points = []
-        
-        # Main body - torso
-        torso_width = self.width * 0.8
-        torso_height = self.height * 0.4
-        torso_left = self.x - torso_width // 2
-        torso_top = self.y - torso_height // 2 - self.height * 0.1
-        
-        # Head
-        head_radius = self.width * 0.35
-        head_y = torso_top - head_radius
-        
-        # Legs
-        leg_width = self.width * 0.2
-        leg_height = self.height * 0.35
-        leg_left_x = self.x - torso_width // 2 + leg_width // 2
-        leg_right_x = self.x + torso_width // 2 - leg_width // 2
-        leg_top = self.y + self.height * 0.05
-        
-        # Arms
-        arm_width = self.width * 0.2
-        arm_height = self.height * 0.3
-        arm_left_x = self.x - torso_width // 2 - arm_width // 2
-        arm_right_x = self.x + torso_width // 2 + arm_width // 2
-        arm_top = self.y - self.height * 0.2
-        
-        # Store shape info for drawing
-        self.shape_info = {
-            'torso': (torso_left, torso_top, torso_width, torso_height),
-            'head': (self.x, head_y, head_radius),
-            'legs': [(leg_left_x, leg_top, leg_width, leg_height),
-                    (leg_right_x, leg_top, leg_width, leg_height)],
-            'arms': [(arm_left_x, arm_top, arm_width, arm_height),
-                    (arm_right_x, arm_top, arm_width, arm_height)]
-        }
     
-    def update(self, platforms, dt):
+    def update(self, platforms, dt, keys=None):
         # Handle invulnerability timer
         if self.invulnerable:
             self.invulnerable_timer -= dt
@@ -123,11 +232,13 @@ class Player:
             self.vel_y += self.gravity * dt
         
         # Cap falling speed
-        if self.vel_y > 1000:
-            self.vel_y = 1000
+        if self.vel_y > self.max_fall_speed:
+            self.vel_y = self.max_fall_speed
         
-        # Get keyboard input
-        keys = pygame.key.get_pressed()
+        # Get keyboard input (headless drivers pass their own key state)
+        if keys is None:
+            keys = pygame.key.get_pressed()
+        self.keys = keys
         
         # Reset horizontal movement if not dashing
         if not self.dashing:
@@ -155,25 +266,29 @@ class Player:
                 self.vel_x = -self.dash_power
             
             # Slight vertical boost during dash
-            self.vel_y = -200
+            self.vel_y = self.dash_lift
         
         # Handle jump directly from keys (instead of only through events)
         if (keys[pygame.K_SPACE] or keys[pygame.K_w] or keys[pygame.K_UP]) and self.on_ground:
             self.jump()
         
-        # Move the player
-        self.x += self.vel_x * dt
-        self.y += self.vel_y * dt
+        # Move the player, swept against the platforms so fast falls and dashes can't skip through them
+        move_x, move_y = move_box(self.x - self.width / 2, self.y - self.height / 2, self.width, self.height,
+                                  self.vel_x * dt, self.vel_y * dt, [platform.rect for platform in platforms])
+        self.x += move_x
+        self.y += move_y
+        self.update_shape()
         
         # Flag to check if player was on ground before collision checks
         was_on_ground = self.on_ground
         self.on_ground = False
         self.wall_sliding = False
+        self.landed_on = []
         
-        # Check for collisions with platforms
-        for platform in platforms:
-            if self.check_collision_with_platform(platform):
-                self.handle_platform_collision(platform)
+        # Check for collisions with platforms, the overlap tests run over all of them in one kernel call
+        rect = self.rect
+        for i in kernels.overlapping(rect.left, rect.top, rect.right, rect.bottom, get_bounds(platforms)):
+            self.handle_platform_collision(platforms[i])
         
         # Reset double jump if player has landed
         if self.on_ground and not was_on_ground:
@@ -228,7 +343,7 @@ class Player:
                 if self.vel_y > 0 and not self.on_ground:
                     self.wall_sliding = True
                     self.vel_y = min(self.vel_y, 150)  # Cap falling speed during wall slide
-                    if self.wall_jump_cooldown <= 0 and (pygame.key.get_pressed()[pygame.K_SPACE]):
+                    if self.wall_jump_cooldown <= 0 and (self.keys[pygame.K_SPACE]):
                         self.vel_y = self.jump_power * 0.8
                         self.vel_x = self.move_speed * 1.2  # Jump away from wall
                         self.wall_jump_cooldown = 0.3
@@ -239,7 +354,7 @@ class Player:
                 if self.vel_y > 0 and not self.on_ground:
                     self.wall_sliding = True
                     self.vel_y = min(self.vel_y, 150)  # Cap falling speed during wall slide
-                    if self.wall_jump_cooldown <= 0 and (pygame.key.get_pressed()[pygame.K_SPACE]):
+                    if self.wall_jump_cooldown <= 0 and (self.keys[pygame.K_SPACE]):
                         self.vel_y = self.jump_power * 0.8
                         self.vel_x = -self.move_speed * 1.2  # Jump away from wall
                         self.wall_jump_cooldown = 0.3
@@ -248,6 +363,8 @@ class Player:
             # Vertical collision
             if dy_top < dy_bottom:
                 # Landed on top of platform
+                if self.vel_y > 0:
+                    self.landed_on.append(platform)
                 self.y = platform.rect.top - self.height / 2
                 self.vel_y = 0
                 self.on_ground = True
@@ -265,7 +382,7 @@ class Player:
                 # Wall jump logic is handled in the platform collision
                 pass
         elif self.can_double_jump:
-            self.vel_y = self.jump_power * 0.8  # Slightly weaker double jump
+            self.vel_y = self.jump_power * self.double_jump_factor  # Slightly weaker double jump
             self.can_double_jump = False
     
     def shoot(self, bullets_list):
@@ -341,92 +458,25 @@ class Player:
     
     def check_collision(self, entity):
         # Check collision with another entity
-        return self.rect.colliderect(entity.rect)
+        return collides(self, entity) and self.rect.colliderect(entity.rect)
     
     def is_invulnerable(self):
         return self.invulnerable
     
     def draw(self, surface):
-        # Extract shape info
-        torso = self.shape_info['torso']
-        head = self.shape_info['head']
-        legs = self.shape_info['legs']
-        arms = self.shape_info['arms']
-        
         # If invulnerable, flash the player
-        if self.invulnerable and (pygame.time.get_ticks() % 200) < 100:
-            alpha = 128
-            color_mod = 50
-        else:
-            alpha = 255
-            color_mod = 0
+        flash = self.invulnerable and (pygame.time.get_ticks() % 200) < 100
         
-        # Draw legs with animation
-        for i, leg in enumerate(legs):
-            leg_x, leg_y, leg_w, leg_h = leg
-            
-            # Animate legs when walking
-            if self.animation_state in [1, 3] and i == 0:
-                leg_y -= 5
-            elif self.animation_state in [1, 3] and i == 1:
-                leg_y += 5
-            elif self.animation_state in [0, 2] and i == 0:
-                leg_y += 5
-            elif self.animation_state in [0, 2] and i == 1:
-                leg_y -= 5
-            
-            # Calculate leg color with proper capping
-            lr = min(255, max(0, int(self.color[0] - 30 + color_mod)))
-            lg = min(255, max(0, int(self.color[1] - 30 + color_mod)))
-            lb = min(255, max(0, int(self.color[2] - 30 + color_mod)))
-            leg_color = (lr, lg, lb)
-            
-            pygame.draw.rect(surface, leg_color, (leg_x, leg_y, leg_w, leg_h))
-            pygame.draw.rect(surface, BLACK, (leg_x, leg_y, leg_w, leg_h), 2)
-        
-        # Draw torso
-        torso_x, torso_y, torso_w, torso_h = torso
-        pygame.draw.rect(surface, self.color, (torso_x, torso_y, torso_w, torso_h))
-        pygame.draw.rect(surface, BLACK, (torso_x, torso_y, torso_w, torso_h), 2)
-        
-        # Draw arms with animation
-        for i, arm in enumerate(arms):
-            arm_x, arm_y, arm_w, arm_h = arm
-            
-            # Animate arms when walking
-            if self.animation_state in [1, 3] and i == 0:
-                arm_y += 5
-            elif self.animation_state in [1, 3] and i == 1:
-                arm_y -= 5
-            elif self.animation_state in [0, 2] and i == 0:
-                arm_y -= 5
-            elif self.animation_state in [0, 2] and i == 1:
-                arm_y += 5
-            
-            # Adjust arm positions when facing left/right
-            if (self.facing_right and i == 1) or (not self.facing_right and i == 0):
-                # Draw arm in shooting position if cooldown is low
-                if self.shoot_cooldown < self.shoot_delay * 0.5:
-                    arm_y = torso_y + torso_h * 0.2
-            
-            pygame.draw.rect(surface, BLACK, (arm_x, arm_y, arm_w, arm_h), 2)
-        
-        # Draw head
-        head_x, head_y, head_r = head
-        
-        # Calculate head color with proper capping
-        hr = min(255, max(0, int(self.color[0] + 20 + color_mod)))
-        hg = min(255, max(0, int(self.color[1] + 20 + color_mod)))
-        hb = min(255, max(0, int(self.color[2] + 20 + color_mod)))
-        head_color = (hr, hg, hb)
+        # Legs and arms swap places every other animation state
+        stride = 0 if self.animation_state in [1, 3] else 1
         
-        pygame.draw.circle(surface, head_color, (int(head_x), int(head_y)), int(head_r))
-        pygame.draw.circle(surface, BLACK, (int(head_x), int(head_y)), int(head_r), 2)
+        # Draw arm in shooting position if cooldown is low
+        shooting = self.shoot_cooldown < self.shoot_delay * 0.5
         
-        # Draw eyes
-        eye_offset = 5 if self.facing_right else -5
-        pygame.draw.circle(surface, WHITE, (int(head_x + eye_offset), int(head_y - 2)), 5)
-        pygame.draw.circle(surface, BLACK, (int(head_x + eye_offset*1.5), int(head_y - 2)), 2)
+        key = (self.width, self.height, self.color, stride, self.facing_right, flash, shooting)
+        frame = player_frames.get(key, render_player_frame, *key)
+        origin_x, origin_y = frame_center(self.width, self.height)
+        surface.blit(frame, (int(self.x) - origin_x, int(self.y) - origin_y))
         
         # Draw special effects
         if self.dashing:
@@ -434,15 +484,15 @@ class Player:
             for i in range(5):
                 alpha = 50 - i * 10
                 offset = -i * 10 if self.facing_right else i * 10
-                s = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
-                s.fill((255, 255, 255, alpha))
+                key = ('ghost', self.width, self.height, alpha)
+                s = player_frames.get(key, render_ghost, self.width, self.height, alpha)
                 surface.blit(s, (self.x - self.width//2 + offset, self.y - self.height//2))
         
         # Draw power-up effects
         if self.special_power:
             if self.special_power == "speed":
                 # Speed lines
-                for i in range(10):
+                for i in range(governor.count(10)):
                     start_x = self.x - 30 - random.randint(0, 20)
                     start_y = self.y - 20 + random.randint(0, 40)
                     end_x = start_x - 20 - random.randint(0, 30)
@@ -451,7 +501,7 @@ class Player:
             
             elif self.special_power == "jump":
                 # Jump sparkles under feet
-                for i in range(8):
+                for i in range(governor.count(8)):
                     sparkle_x = self.x - 15 + random.randint(0, 30)
                     sparkle_y = self.y + self.height/2 + random.randint(0, 10)
                     pygame.draw.circle(surface, CYAN, (int(sparkle_x), int(sparkle_y)), random.randint(1, 3))
@@ -459,31 +509,28 @@ class Player:
             elif self.special_power == "shield":
                 # Shield bubble
                 shield_radius = self.width + 10
-                shield_surface = pygame.Surface((shield_radius*2, shield_radius*2), pygame.SRCALPHA)
-                pygame.draw.circle(shield_surface, (100, 200, 255, 100), (shield_radius, shield_radius), shield_radius)
-                pygame.draw.circle(shield_surface, (150, 220, 255, 150), (shield_radius, shield_radius), shield_radius, 3)
+                shield_surface = player_frames.get(('shield', shield_radius), render_shield, shield_radius)
                 surface.blit(shield_surface, (self.x - shield_radius, self.y - shield_radius))
         
         # Draw health bar above head
+        head_x, head_y, head_r = self.layout['head']
         health_width = 50
         health_height = 5
         health_x = self.x - health_width/2
-        health_y = head_y - head_r - 15
+        health_y = self.y + head_y - head_r - 15
         
-        # Health bar background
-        pygame.draw.rect(surface, (50, 50, 50), (health_x, health_y, health_width, health_height))
-        
-        # Health bar
+        # One bar surface per fill width and color, so it only changes when health does
         health_percent = self.health / self.max_health
-        if health_percent > 0:
-            health_color = GREEN
-            if health_percent < 0.5:
-                health_color = YELLOW
-            if health_percent < 0.25:
-                health_color = RED
-                
-            pygame.draw.rect(surface, health_color, 
-                            (health_x, health_y, health_width * health_percent, health_height))
+        health_color = GREEN
+        if health_percent < 0.5:
+            health_color = YELLOW
+        if health_percent < 0.25:
+            health_color = RED
+        filled = max(0, int(health_width * health_percent))
+        
+        key = ('health', health_width, health_height, filled, health_color)
+        bar = player_frames.get(key, render_health_bar, health_width, health_height, filled, health_color)
+        surface.blit(bar, (int(health_x), int(health_y)))
         
         # Debug: Draw collision box
         # pygame.draw.rect(surface, (255, 0, 0), self.rect, 1)
\ No newline at end of file
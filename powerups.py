@@ -0,0 +1,113 @@
+import pygame
+import math
+from constants import *
+from collision import collides, mask_for, LAYER_POWERUP
+
+class PowerUp:
+    collision_layer = LAYER_POWERUP
+    collision_mask = mask_for(LAYER_POWERUP)
+    simulation_only = ()  # Attributes snapshots for drawing leave out
+    
+    def __init__(self, x, y, power_type):
+        self.x = x
+        self.y = y
+        self.width = 30
+        self.height = 30
+        self.rect = pygame.Rect(x - 15, y - 15, 30, 30)
+        self.power_type = power_type  # "health", "speed", "jump", "shield"
+        self.collected = False
+        self.bob_offset = 0
+        self.bob_speed = 2
+        self.rotation = 0
+        self.rotation_speed = 60
+        
+        # Set color based on power type
+        if power_type == "health":
+            self.color = RED
+        elif power_type == "speed":
+            self.color = YELLOW
+        elif power_type == "jump":
+            self.color = CYAN
+        elif power_type == "shield":
+            self.color = PURPLE
+        else:
+            self.color = WHITE
+    
+    def update(self, dt):
+        if self.collected:
+            return
+        
+        # Bobbing animation
+        self.bob_offset = 5 * math.sin(pygame.time.get_ticks() / 300)
+        
+        # Rotation animation
+        self.rotation += self.rotation_speed * dt
+        if self.rotation >= 360:
+            self.rotation -= 360
+    
+    def draw(self, surface):
+        if self.collected:
+            return
+        
+        # Draw power-up with bobbing effect and rotation
+        adjusted_y = self.y + self.bob_offset
+        
+        # Create a surface for the power-up
+        power_surface = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
+        
+        # Draw the base shape
+        if self.power_type == "health":
+            # Draw health cross
+            pygame.draw.rect(power_surface, self.color, (10, 5, 10, 20))
+            pygame.draw.rect(power_surface, self.color, (5, 10, 20, 10))
+        elif self.power_type == "speed":
+            # Draw speed arrow
+            points = [(5, 15), (20, 5), (20, 10), (25, 10), (25, 20), (20, 20), (20, 25), (5, 15)]
+            pygame.draw.polygon(power_surface, self.color, points)
+        elif self.power_type == "jump":
+            # Draw jump spring
+            pygame.draw.rect(power_surface, self.color, (10, 5, 10, 15))
+            pygame.draw.rect(power_surface, self.color, (5, 20, 20, 5))
+        elif self.power_type == "shield":
+            # Draw shield bubble
+            pygame.draw.circle(power_surface, self.color, (15, 15), 10, 2)
+            pygame.draw.circle(power_surface, self.color, (15, 15), 5)
+        
+        # Draw glow effect
+        glow_surface = pygame.Surface((self.width + 10, self.height + 10), pygame.SRCALPHA)
+        pygame.draw.circle(glow_surface, (*self.color, 100), (self.width//2 + 5, self.height//2 + 5), self.width//2 + 5)
+        
+        # Draw glow
+        rotated_glow = pygame.transform.rotate(glow_surface, self.rotation)
+        glow_rect = rotated_glow.get_rect(center=(self.x, adjusted_y))
+        surface.blit(rotated_glow, glow_rect)
+        
+        # Rotate and draw the power-up
+        rotated_surface = pygame.transform.rotate(power_surface, self.rotation)
+        rotated_rect = rotated_surface.get_rect(center=(self.x, adjusted_y))
+        surface.blit(rotated_surface, rotated_rect)
+        
+        # Draw sparkles
+        t = pygame.time.get_ticks() / 1000
+        for i in range(3):
+            spark_x = self.x + 15 * math.cos(t * 2 + i * 2)
+            spark_y = adjusted_y + 15 * math.sin(t * 2 + i * 2)
+            size = 2 + math.sin(t * 5 + i) * 1
+            pygame.draw.circle(surface, WHITE, (int(spark_x), int(spark_y)), int(size))
+    
+    def check_collision(self, player):
+        return collides(self, player) and self.rect.colliderect(player.rect)
+    
+    def collect(self, player):
+        if self.collected:
+            return
+        
+        self.collected = True
+        
+        # Apply power-up effect
+        if self.power_type == "health":
+            player.heal(20)
+        elif self.power_type == "speed" or self.power_type == "jump" or self.power_type == "shield":
+            player.activate_power(self.power_type)
+        
+        return 50  # Score for collecting
\ No newline at end of file
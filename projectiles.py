@@ -1,9 +1,23 @@
 import pygame
 import math
 import random
-from constants import *
+import weakref
+import numpy as np
+from collision import segment_vs_rect, collides, mask_for, LAYER_PLAYER_BULLET, LAYER_ENEMY_BULLET
+from ecs import World, integrate, expire, offscreen
+from quality import governor
+import kernels
+
+SHOT_MARGIN = 50  # How far off screen a shot gets before it's dropped
 
 class Bullet:
+    explosive = False  # Explosive bullets splash nearby enemies instead of disappearing on hit
+    homing = False  # Homing missiles steer before each move
+    has_exploded = False
+    simulation_only = ()  # Attributes snapshots for drawing leave out
+    collision_layer = LAYER_PLAYER_BULLET
+    collision_mask = mask_for(LAYER_PLAYER_BULLET)
+    
     def __init__(self, x, y, vel_x, vel_y, color):
         self.x = x
         self.y = y
@@ -16,11 +30,15 @@ class Bullet:
         self.lifespan = 2.0  # seconds
         self.trail_points = []
         self.max_trail_length = 10
+        self.prev_x = x  # Where the last move started, for swept hit tests
+        self.prev_y = y
         
-    def update(self, dt):
-        # Update position
-        self.x += self.vel_x * dt
-        self.y += self.vel_y * dt
+    def move_to(self, x, y):
+        # Remember where the move started
+        self.prev_x = self.x
+        self.prev_y = self.y
+        self.x = x
+        self.y = y
         
         # Update rect
         self.rect.x = self.x - self.radius
@@ -32,36 +50,34 @@ class Bullet:
         # Limit trail length
         if len(self.trail_points) > self.max_trail_length:
             self.trail_points.pop(0)
-        
-        # Decrease lifespan
-        self.lifespan -= dt
-    
-    def is_off_screen(self):
-        return (self.x < -50 or self.x > SCREEN_WIDTH + 50 or
-                self.y < -50 or self.y > SCREEN_HEIGHT + 50 or
-                self.lifespan <= 0)
     
     def check_collision(self, entity):
-        return self.rect.colliderect(entity.rect)
+        # Test the whole path since the last update, a fast bullet can jump clean over an enemy in one step
+        if not collides(self, entity):
+            return False
+        return segment_vs_rect(self.prev_x, self.prev_y, self.x, self.y, entity.rect,
+                               self.radius, self.radius) is not None
     
     def draw(self, surface):
-        # Draw trail
-        if len(self.trail_points) > 1:
-            for i in range(len(self.trail_points) - 1):
-                trail_alpha = int(255 * (i / len(self.trail_points)))
-                trail_width = 1 + int(3 * (i / len(self.trail_points)))
+        # Draw trail, only the newest points at lower detail
+        trail_points = self.trail_points[-governor.trail_length(self.max_trail_length):]
+        if len(trail_points) > 1:
+            for i in range(len(trail_points) - 1):
+                trail_alpha = int(255 * (i / len(trail_points)))
+                trail_width = 1 + int(3 * (i / len(trail_points)))
                 
                 pygame.draw.line(surface, 
                                (self.color[0], self.color[1], self.color[2]), 
-                               self.trail_points[i], 
-                               self.trail_points[i+1], 
+                               trail_points[i],
+                               trail_points[i+1],
                                trail_width)
         
         # Draw glow effect
-        glow_radius = self.radius * 2
-        glow_surface = pygame.Surface((glow_radius*2, glow_radius*2), pygame.SRCALPHA)
-        pygame.draw.circle(glow_surface, (*self.color, 50), (glow_radius, glow_radius), glow_radius)
-        surface.blit(glow_surface, (self.x - glow_radius, self.y - glow_radius))
+        if governor.glow:
+            glow_radius = self.radius * 2
+            glow_surface = pygame.Surface((glow_radius*2, glow_radius*2), pygame.SRCALPHA)
+            pygame.draw.circle(glow_surface, (*self.color, 50), (glow_radius, glow_radius), glow_radius)
+            surface.blit(glow_surface, (self.x - glow_radius, self.y - glow_radius))
         
         # Draw main bullet
         pygame.draw.circle(surface, self.color, (int(self.x), int(self.y)), self.radius)
@@ -76,65 +92,46 @@ class Bullet:
 
 
 class HomingMissile(Bullet):
+    homing = True
+    simulation_only = ('target',)
+    collision_layer = LAYER_ENEMY_BULLET  # Only enemies fire them
+    collision_mask = mask_for(LAYER_ENEMY_BULLET)
+    
     def __init__(self, x, y, vel_x, vel_y, color, target=None):
         super().__init__(x, y, vel_x, vel_y, color)
-        self.target = target
+        # Weak, so a missile still in flight doesn't keep a replaced player (or a dead enemy) alive
+        self.target = weakref.ref(target) if target is not None else None
         self.turn_speed = 5.0  # radians per second
         self.speed = 300
         self.lifespan = 5.0
         self.max_trail_length = 20
         self.wave_angle = 0
     
-    def update(self, dt):
-        # If we have a target, adjust velocity to track it
-        if self.target and self.target.health > 0:
-            # Calculate direction to target
-            target_dx = self.target.x - self.x
-            target_dy = self.target.y - self.y
-            target_angle = math.atan2(target_dy, target_dx)
-            
-            # Calculate current velocity angle
-            current_angle = math.atan2(self.vel_y, self.vel_x)
-            
-            # Find the shortest angle to rotate
-            angle_diff = target_angle - current_angle
-            while angle_diff > math.pi:
-                angle_diff -= 2 * math.pi
-            while angle_diff < -math.pi:
-                angle_diff += 2 * math.pi
-            
-            # Limit rotation by turn speed
-            if angle_diff > self.turn_speed * dt:
-                angle_diff = self.turn_speed * dt
-            elif angle_diff < -self.turn_speed * dt:
-                angle_diff = -self.turn_speed * dt
-            
-            # Apply rotation
-            new_angle = current_angle + angle_diff
-            
-            # Add snake-like movement
-            self.wave_angle += 10 * dt
-            wave_intensity = 0.4  # How much it wiggles
-            new_angle += math.sin(self.wave_angle) * wave_intensity
-            
-            # Update velocity
-            self.vel_x = math.cos(new_angle) * self.speed
-            self.vel_y = math.sin(new_angle) * self.speed
+    def steer(self, dt):
+        """Adjust velocity to track the target, returns False when there's nothing to track"""
+        target = self.target() if self.target is not None else None
+        if not target or target.health <= 0:
+            return False
         
-        # Call the parent update method
-        super().update(dt)
+        # Turn toward the target as far as the turn speed allows, wiggling as it goes
+        self.vel_x, self.vel_y, self.wave_angle = kernels.steer(
+            self.x, self.y, self.vel_x, self.vel_y, target.x, target.y, self.wave_angle, self.turn_speed,
+            self.speed, dt)
+        return True
     
     def draw(self, surface):
         # Draw trail with more vibrant colors
-        if len(self.trail_points) > 1:
-            for i in range(len(self.trail_points) - 1):
-                trail_alpha = int(255 * (i / len(self.trail_points)))
-                trail_width = 1 + int(4 * (i / len(self.trail_points)))
+        trail_points = self.trail_points[-governor.trail_length(self.max_trail_length):]
+        smoke_chance = 0.3 * governor.smoke
+        if len(trail_points) > 1:
+            for i in range(len(trail_points) - 1):
+                trail_alpha = int(255 * (i / len(trail_points)))
+                trail_width = 1 + int(4 * (i / len(trail_points)))
                 
                 # Calculate angle for smoke effect
-                if i < len(self.trail_points) - 2:
-                    dx = self.trail_points[i+1][0] - self.trail_points[i][0]
-                    dy = self.trail_points[i+1][1] - self.trail_points[i][1]
+                if i < len(trail_points) - 2 and smoke_chance > 0:
+                    dx = trail_points[i+1][0] - trail_points[i][0]
+                    dy = trail_points[i+1][1] - trail_points[i][1]
                     angle = math.atan2(dy, dx)
                     
                     # Add smoke particles perpendicular to trail
@@ -142,11 +139,11 @@ class HomingMissile(Bullet):
                     perp_y = -3 * math.cos(angle)
                     
                     # Random smoke "puffs"
-                    if random.random() < 0.3:
+                    if random.random() < smoke_chance:
                         smoke_size = random.randint(2, 4)
                         offset = random.randint(-5, 5)
-                        smoke_x = self.trail_points[i][0] + perp_x * offset
-                        smoke_y = self.trail_points[i][1] + perp_y * offset
+                        smoke_x = trail_points[i][0] + perp_x * offset
+                        smoke_y = trail_points[i][1] + perp_y * offset
                         smoke_color = (150, 150, 150, 100)
                         
                         smoke_surface = pygame.Surface((smoke_size*2, smoke_size*2), pygame.SRCALPHA)
@@ -156,8 +153,8 @@ class HomingMissile(Bullet):
                 # Main trail
                 pygame.draw.line(surface, 
                                (self.color[0], self.color[1], self.color[2]), 
-                               self.trail_points[i], 
-                               self.trail_points[i+1], 
+                               trail_points[i],
+                               trail_points[i+1],
                                trail_width)
         
         # Draw missile body
@@ -200,13 +197,16 @@ class HomingMissile(Bullet):
         pygame.draw.line(surface, flame_color, (back_x, back_y), (flame_x, flame_y), 3)
         
         # Add a little smoke at the back
-        smoke_size = random.randint(3, 6)
-        smoke_surface = pygame.Surface((smoke_size*2, smoke_size*2), pygame.SRCALPHA)
-        pygame.draw.circle(smoke_surface, (100, 100, 100, 150), (smoke_size, smoke_size), smoke_size)
-        surface.blit(smoke_surface, (back_x - smoke_size, back_y - smoke_size))
+        if governor.smoke > 0:
+            smoke_size = random.randint(3, 6)
+            smoke_surface = pygame.Surface((smoke_size*2, smoke_size*2), pygame.SRCALPHA)
+            pygame.draw.circle(smoke_surface, (100, 100, 100, 150), (smoke_size, smoke_size), smoke_size)
+            surface.blit(smoke_surface, (back_x - smoke_size, back_y - smoke_size))
 
 
 class ExplosiveBullet(Bullet):
+    explosive = True
+    
     def __init__(self, x, y, vel_x, vel_y, color):
         super().__init__(x, y, vel_x, vel_y, color)
         self.radius = 8
@@ -221,14 +221,6 @@ class ExplosiveBullet(Bullet):
         self.vel_x = 0
         self.vel_y = 0
     
-    def update(self, dt):
-        if self.has_exploded:
-            self.explosion_timer -= dt
-            if self.explosion_timer <= 0:
-                self.lifespan = 0
-        else:
-            super().update(dt)
-    
     def draw(self, surface):
         if self.has_exploded:
             # Calculate explosion progress
@@ -246,7 +238,7 @@ class ExplosiveBullet(Bullet):
                 surface.blit(explosion_surface, (self.x - radius, self.y - radius))
             
             # Draw some explosion particles
-            for _ in range(10):
+            for _ in range(governor.count(10)):
                 angle = random.uniform(0, 2 * math.pi)
                 distance = random.uniform(0, current_radius)
                 particle_x = self.x + math.cos(angle) * distance
@@ -257,13 +249,93 @@ class ExplosiveBullet(Bullet):
                                  (int(particle_x), int(particle_y)), particle_size)
         else:
             # Draw regular bullet with pulsating effect
-            pulse = 0.5 + 0.5 * math.sin(pygame.time.get_ticks() / 100)
-            glow_radius = self.radius * (1.5 + pulse)
-            
-            glow_surface = pygame.Surface((glow_radius*2, glow_radius*2), pygame.SRCALPHA)
-            pygame.draw.circle(glow_surface, (*self.color, 100), (glow_radius, glow_radius), glow_radius)
-            surface.blit(glow_surface, (self.x - glow_radius, self.y - glow_radius))
+            if governor.glow:
+                pulse = 0.5 + 0.5 * math.sin(pygame.time.get_ticks() / 100)
+                glow_radius = self.radius * (1.5 + pulse)
+                
+                glow_surface = pygame.Surface((glow_radius*2, glow_radius*2), pygame.SRCALPHA)
+                pygame.draw.circle(glow_surface, (*self.color, 100), (glow_radius, glow_radius), glow_radius)
+                surface.blit(glow_surface, (self.x - glow_radius, self.y - glow_radius))
             
             # Inner core
             pygame.draw.circle(surface, (255, 200, 0), (int(self.x), int(self.y)), self.radius)
-            pygame.draw.circle(surface, (255, 255, 200), (int(self.x - 2), int(self.y - 2)), self.radius // 2)
\ No newline at end of file
+            pygame.draw.circle(surface, (255, 255, 200), (int(self.x - 2), int(self.y - 2)), self.radius // 2)
+
+class Shots:
+    """Bullets or missiles in flight, moved and aged as entities in an ECS world.
+    
+    Position, velocity, collider and lifetime are components in the world's
+    arrays, so the integrate and expire systems move and age every shot at
+    once whatever mix of bullets is flying. The Bullet objects alongside,
+    in slot order, keep what only they need (trails, homing targets,
+    explosions) and get the new positions written back after each update
+    for hit tests, drawing and the network. Shots come in through append,
+    so anything that fired into a plain list fires into this the same way.
+    """
+    def __init__(self, capacity=64):
+        self.world = World(capacity=capacity)
+        self.items = []
+    
+    def __len__(self):
+        return len(self.items)
+    
+    def __iter__(self):
+        return iter(self.items)
+    
+    def append(self, shot):
+        self.world.create(x=shot.x, y=shot.y, vel_x=shot.vel_x, vel_y=shot.vel_y, width=shot.radius * 2,
+                          lifetime=shot.lifespan)
+        self.items.append(shot)
+    
+    def clear(self):
+        self.world.clear()
+        self.items = []
+    
+    def forget(self, dead):
+        """Drop the objects of slots the world just removed, flagged over the old slots"""
+        if dead.any():
+            self.items = [shot for shot, gone in zip(self.items, dead.tolist()) if not gone]
+    
+    def remove(self, spent):
+        """Take a set of shots out of play"""
+        dead = np.array([shot in spent for shot in self.items], dtype=bool)
+        self.world.remove(dead)
+        self.forget(dead)
+    
+    def explode(self, shot):
+        """Set off an explosive shot: it stops where it is and lasts as long as its blast"""
+        shot.explode()
+        slot = self.items.index(shot)
+        world = self.world
+        world.vel_x[slot] = 0
+        world.vel_y[slot] = 0
+        world.lifetime[slot] = shot.explosion_timer
+        world.max_lifetime[slot] = shot.explosion_timer
+    
+    def update(self, dt):
+        world = self.world
+        
+        # Missiles steer one by one, everything then moves and ages as arrays
+        for slot, shot in enumerate(self.items):
+            if shot.homing and shot.steer(dt):
+                world.vel_x[slot] = shot.vel_x
+                world.vel_y[slot] = shot.vel_y
+        integrate(world, dt)
+        
+        dead = offscreen(world, SHOT_MARGIN)
+        world.remove(dead)
+        self.forget(dead)
+        self.forget(expire(world, dt))
+        
+        # Write the results back to the objects
+        n = world.count
+        for shot, x, y, vel_x, vel_y, lifetime in zip(self.items, world.x[:n].tolist(), world.y[:n].tolist(),
+                                                      world.vel_x[:n].tolist(), world.vel_y[:n].tolist(),
+                                                      world.lifetime[:n].tolist()):
+            if shot.has_exploded:
+                shot.explosion_timer = lifetime
+            else:
+                shot.vel_x = vel_x
+                shot.vel_y = vel_y
+                shot.lifespan = lifetime
+                shot.move_to(x, y)
\ No newline at end of file
@@ -0,0 +1,80 @@
+from constants import *
+
+# Detail level of each fixed preset, auto mode slides between 0 and 1 on its own
+PRESETS = {'low': 0.0, 'medium': 0.5, 'high': 1.0}
+
+# Cosmetic settings at the lowest and at full detail, scaled linearly in between
+LOW_DETAIL = {'particles': 0.25, 'trail': 0.3, 'smoke': 0.0, 'effects_budget': 8}
+FULL_DETAIL = {'particles': 1.0, 'trail': 1.0, 'smoke': 1.0, 'effects_budget': 32}
+GLOW_DETAIL = 0.5  # Glow needs a new alpha surface per object per frame, it goes first
+
+# Auto mode tuning, as fractions of the frame budget
+SMOOTHING = 0.1  # Weight of the newest frame in the running average
+SLOW_FRAME = 0.9  # Drop detail when the average frame takes longer than this
+FAST_FRAME = 0.6  # Raise it again once frames come in under this
+STEP_DOWN = 0.1
+STEP_UP = 0.05  # Climb back slower than we fall, so detail doesn't flicker
+SETTLE_FRAMES = 30  # Frames to wait after a change before judging it
+
+class QualityGovernor:
+    """Scales cosmetic detail (particles, trails, glow, smoke) to keep frames inside the budget.
+    
+    Draw code reads particles, trail and smoke as multipliers and glow as a
+    switch. In auto mode end_frame() moves the detail down when frames run
+    long and back up when there is room to spare; the presets pin it.
+    """
+    def __init__(self, preset="auto", target_fps=FPS):
+        self.frame_budget = 1.0 / target_fps
+        self.average = self.frame_budget * FAST_FRAME
+        self.settle = 0
+        self.set_preset(preset)
+    
+    def set_preset(self, preset):
+        if preset != "auto" and preset not in PRESETS:
+            raise ValueError(f"Unknown quality preset {preset!r}, expected auto, low, medium or high")
+        
+        self.preset = preset
+        self.auto = preset == "auto"
+        self.settle = 0
+        self.set_detail(PRESETS.get(preset, 1.0))  # Auto starts at full detail and backs off if needed
+    
+    def set_detail(self, detail):
+        self.detail = min(1.0, max(0.0, detail))
+        
+        settings = {}
+        for name, low in LOW_DETAIL.items():
+            settings[name] = low + (FULL_DETAIL[name] - low) * self.detail
+        
+        self.particles = settings['particles']
+        self.trail = settings['trail']
+        self.smoke = settings['smoke']
+        self.effects_budget = int(round(settings['effects_budget']))
+        self.glow = self.detail >= GLOW_DETAIL
+    
+    def count(self, full_count):
+        """How many of full_count particles or sparkles to draw at the current detail"""
+        return max(1, int(full_count * self.particles + 0.5))
+    
+    def trail_length(self, full_length):
+        return max(2, int(full_length * self.trail + 0.5))
+    
+    def end_frame(self, frame_time):
+        """Feed in how long the last frame's work took in seconds, without the frame cap's wait"""
+        # A running average, so one slow frame (a level load, a GC pass) doesn't cost detail
+        self.average += (frame_time - self.average) * SMOOTHING
+        
+        if not self.auto:
+            return
+        if self.settle > 0:
+            self.settle -= 1
+            return
+        
+        if self.average > self.frame_budget * SLOW_FRAME and self.detail > 0:
+            self.set_detail(self.detail - STEP_DOWN)
+            self.settle = SETTLE_FRAMES
+        elif self.average < self.frame_budget * FAST_FRAME and self.detail < 1:
+            self.set_detail(self.detail + STEP_UP)
+            self.settle = SETTLE_FRAMES
+
+# Shared by everything that draws effects
+governor = QualityGovernor()
\ No newline at end of file
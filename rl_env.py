@@ -0,0 +1,341 @@
+import os
+import random
+import multiprocessing
+from multiprocessing import shared_memory
+
+# Worker processes never open a window
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import numpy as np
+from constants import *
+from game import Game, GameState
+
+# Actions are input bitmasks, so every combination of the five inputs is valid
+NUM_ACTIONS = 32
+
+# How many of each object type make it into an observation
+MAX_ENEMIES = 8
+MAX_ENEMY_BULLETS = 8
+MAX_POWERUPS = 3
+MAX_PLATFORMS = 12
+
+PLAYER_FEATURES = 11
+ENEMY_FEATURES = 5
+BULLET_FEATURES = 5
+POWERUP_FEATURES = 3
+PLATFORM_FEATURES = 4
+PROGRESS_FEATURES = 2
+
+OBS_SIZE = (PLAYER_FEATURES + MAX_ENEMIES * ENEMY_FEATURES + MAX_ENEMY_BULLETS * BULLET_FEATURES +
+            MAX_POWERUPS * POWERUP_FEATURES + MAX_PLATFORMS * PLATFORM_FEATURES + PROGRESS_FEATURES)
+
+ENEMY_TYPE_CODES = {"basic": 0.25, "runner": 0.5, "tank": 0.75, "shooter": 1.0, "boss": 2.0}
+
+# Reward shaping
+SCORE_REWARD = 0.01  # Per point of score
+HEALTH_REWARD = 0.01  # Per point of health gained or lost
+LIFE_LOST_REWARD = -1.0
+LEVEL_COMPLETE_REWARD = 1.0
+
+def nearest(objects, x, y, count):
+    """The count objects closest to (x, y)"""
+    return sorted(objects, key=lambda o: (o.x - x) ** 2 + (o.y - y) ** 2)[:count]
+
+class PlatformerEnv:
+    """Reinforcement learning environment around a headless Game.
+    
+    Follows the Gym API: reset() returns (observation, info) and step(action)
+    returns (observation, reward, terminated, truncated, info). Actions are
+    input bitmasks built from the INPUT_* flags in game.py.
+    """
+    def __init__(self, frame_skip=1, max_steps=5000, endless=False, total_levels=5, physics_rate=FPS):
+        self.frame_skip = frame_skip
+        self.max_steps = max_steps
+        self.endless = endless
+        self.dt = 1.0 / physics_rate  # Collisions are swept, so coarser steps stay solid
+        self.game = Game(total_levels=total_levels, effects=False)
+        self.steps = 0
+    
+    def reset(self, seed=None):
+        if seed is not None:
+            random.seed(seed)
+        self.game.start(endless=self.endless, seed=seed)
+        self.steps = 0
+        return self.get_observation(), self.get_info()
+    
+    def step(self, action):
+        game = self.game
+        reward = 0.0
+        
+        for _ in range(self.frame_skip):
+            score = game.score
+            health = game.player.health
+            lives = game.lives
+            
+            keys = game.apply_input(int(action))
+            game.update(self.dt, keys)
+            
+            reward += (game.score - score) * SCORE_REWARD
+            if game.lives < lives:
+                reward += LIFE_LOST_REWARD
+            else:
+                reward += (game.player.health - health) * HEALTH_REWARD
+            
+            if game.state == GameState.LEVEL_COMPLETE:
+                reward += LEVEL_COMPLETE_REWARD
+                game.next_level()
+            
+            if game.state != GameState.PLAYING:
+                break
+        
+        self.steps += 1
+        terminated = game.state in (GameState.GAME_OVER, GameState.VICTORY)
+        truncated = not terminated and self.steps >= self.max_steps
+        
+        return self.get_observation(), reward, terminated, truncated, self.get_info()
+    
+    def get_info(self):
+        return {
+            'score': self.game.score,
+            'lives': self.game.lives,
+            'level': self.game.current_level
+        }
+    
+    def get_observation(self, out=None):
+        """Flatten the game state into a fixed size float32 vector, optionally in place"""
+        if out is None:
+            out = np.zeros(OBS_SIZE, dtype=np.float32)
+        else:
+            out[:] = 0
+        
+        game = self.game
+        player = game.player
+        px, py = player.x, player.y
+        
+        out[0:PLAYER_FEATURES] = (
+            px / SCREEN_WIDTH,
+            py / SCREEN_HEIGHT,
+            player.vel_x / 1000,
+            player.vel_y / 1000,
+            player.health / player.max_health,
+            player.on_ground,
+            player.can_double_jump,
+            player.dash_available,
+            player.facing_right,
+            player.invulnerable,
+            player.shoot_cooldown <= 0
+        )
+        i = PLAYER_FEATURES
+        
+        # Positions are relative to the player so the agent doesn't have to learn the offset
+        for enemy in nearest(game.enemies, px, py, MAX_ENEMIES):
+            out[i:i + ENEMY_FEATURES] = (
+                (enemy.x - px) / SCREEN_WIDTH,
+                (enemy.y - py) / SCREEN_HEIGHT,
+                enemy.health / enemy.max_health,
+                ENEMY_TYPE_CODES.get(enemy.enemy_type, 0),
+                1
+            )
+            i += ENEMY_FEATURES
+        i = PLAYER_FEATURES + MAX_ENEMIES * ENEMY_FEATURES
+        
+        for bullet in nearest(game.enemy_bullets, px, py, MAX_ENEMY_BULLETS):
+            out[i:i + BULLET_FEATURES] = (
+                (bullet.x - px) / SCREEN_WIDTH,
+                (bullet.y - py) / SCREEN_HEIGHT,
+                bullet.vel_x / 1000,
+                bullet.vel_y / 1000,
+                1
+            )
+            i += BULLET_FEATURES
+        i = PLAYER_FEATURES + MAX_ENEMIES * ENEMY_FEATURES + MAX_ENEMY_BULLETS * BULLET_FEATURES
+        
+        for powerup in nearest(game.powerups, px, py, MAX_POWERUPS):
+            out[i:i + POWERUP_FEATURES] = (
+                (powerup.x - px) / SCREEN_WIDTH,
+                (powerup.y - py) / SCREEN_HEIGHT,
+                1
+            )
+            i += POWERUP_FEATURES
+        i = OBS_SIZE - PROGRESS_FEATURES - MAX_PLATFORMS * PLATFORM_FEATURES
+        
+        for platform in game.platforms[:MAX_PLATFORMS]:
+            out[i:i + PLATFORM_FEATURES] = (
+                platform.rect.x / SCREEN_WIDTH,
+                platform.rect.y / SCREEN_HEIGHT,
+                platform.rect.width / SCREEN_WIDTH,
+                platform.is_active
+            )
+            i += PLATFORM_FEATURES
+        
+        out[OBS_SIZE - PROGRESS_FEATURES:] = (
+            game.current_level / game.total_levels,
+            game.lives / 3
+        )
+        
+        return out
+
+def _attach(name, shape, dtype):
+    """Open a shared memory block created by the parent as a NumPy array"""
+    block = shared_memory.SharedMemory(name=name)
+    return block, np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+def _worker(conn, start, stop, num_envs, names, env_kwargs):
+    """Run envs[start:stop] in a child process, reading actions and writing results in shared memory"""
+    blocks = []
+    block, observations = _attach(names['obs'], (num_envs, OBS_SIZE), np.float32)
+    blocks.append(block)
+    block, actions = _attach(names['actions'], (num_envs,), np.int32)
+    blocks.append(block)
+    block, rewards = _attach(names['rewards'], (num_envs,), np.float32)
+    blocks.append(block)
+    block, dones = _attach(names['dones'], (num_envs, 2), np.uint8)
+    blocks.append(block)
+    
+    envs = [PlatformerEnv(**env_kwargs) for _ in range(start, stop)]
+    
+    try:
+        while True:
+            command, data = conn.recv()
+            
+            if command == "reset":
+                infos = []
+                for offset, env in enumerate(envs):
+                    seed = None if data is None else data + start + offset
+                    _, info = env.reset(seed)
+                    env.get_observation(observations[start + offset])
+                    infos.append(info)
+                rewards[start:stop] = 0
+                dones[start:stop] = 0
+                conn.send(infos)
+            
+            elif command == "step":
+                infos = []
+                for offset, env in enumerate(envs):
+                    index = start + offset
+                    _, reward, terminated, truncated, info = env.step(actions[index])
+                    rewards[index] = reward
+                    dones[index] = (terminated, truncated)
+                    
+                    # Start the next episode right away, the final info says how this one ended
+                    if terminated or truncated:
+                        env.reset()
+                    env.get_observation(observations[index])
+                    infos.append(info)
+                conn.send(infos)
+            
+            elif command == "close":
+                break
+    finally:
+        del observations, actions, rewards, dones
+        for block in blocks:
+            block.close()
+        conn.close()
+
+class VectorPlatformerEnv:
+    """Many PlatformerEnv instances spread over worker processes.
+    
+    Observations, actions, rewards and done flags live in shared memory as
+    batched arrays, so each step only sends a short command down each pipe.
+    Finished episodes reset automatically.
+    """
+    def __init__(self, num_envs, num_workers=None, **env_kwargs):
+        if num_workers is None:
+            num_workers = os.cpu_count() or 1
+        num_workers = max(1, min(num_workers, num_envs))
+        
+        self.num_envs = num_envs
+        self.num_workers = num_workers
+        self.closed = False
+        
+        # Shared buffers the workers write into directly
+        self.blocks = {}
+        self.observations = self._create("obs", (num_envs, OBS_SIZE), np.float32)
+        self.actions = self._create("actions", (num_envs,), np.int32)
+        self.rewards = self._create("rewards", (num_envs,), np.float32)
+        self.dones = self._create("dones", (num_envs, 2), np.uint8)
+        names = {key: block.name for key, block in self.blocks.items()}
+        
+        # Spawn keeps workers free of the parent's pygame state on every platform
+        context = multiprocessing.get_context("spawn")
+        self.connections = []
+        self.processes = []
+        per_worker = (num_envs + num_workers - 1) // num_workers
+        
+        for start in range(0, num_envs, per_worker):
+            stop = min(num_envs, start + per_worker)
+            parent_conn, child_conn = context.Pipe()
+            process = context.Process(target=_worker,
+                                      args=(child_conn, start, stop, num_envs, names, env_kwargs),
+                                      daemon=True)
+            process.start()
+            child_conn.close()
+            self.connections.append(parent_conn)
+            self.processes.append(process)
+    
+    def _create(self, key, shape, dtype):
+        size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        block = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        self.blocks[key] = block
+        array = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+        array[:] = 0
+        return array
+    
+    def _gather(self):
+        infos = []
+        for conn in self.connections:
+            infos.extend(conn.recv())
+        return infos
+    
+    def reset(self, seed=None):
+        for conn in self.connections:
+            conn.send(("reset", seed))
+        infos = self._gather()
+        return self.observations.copy(), infos
+    
+    def step(self, actions):
+        """Step every environment with one action each.
+        
+        Returns copies of the batched observation, reward, terminated and
+        truncated arrays plus a list of per-env info dicts.
+        """
+        self.actions[:] = actions
+        for conn in self.connections:
+            conn.send(("step", None))
+        infos = self._gather()
+        
+        return (self.observations.copy(), self.rewards.copy(),
+                self.dones[:, 0].astype(bool), self.dones[:, 1].astype(bool), infos)
+    
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        
+        for conn in self.connections:
+            try:
+                conn.send(("close", None))
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self.processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        
+        # Drop the array views before releasing the memory they point into
+        del self.observations, self.actions, self.rewards, self.dones
+        for block in self.blocks.values():
+            block.close()
+            block.unlink()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
\ No newline at end of file
@@ -0,0 +1,323 @@
+import os
+import math
+import time
+import zlib
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from constants import *
+from game import GameState, PARTNER_COLOR, level_themes
+from player import Player
+from powerups import PowerUp
+from platforms import Platform
+from collision import set_layer, LAYER_MINION
+from level_generator import get_level_layout
+
+# File layout: HEADER, then a payload of RUN, STATS and a COUNT prefixed array per kind of
+# object. Everything is little endian with fixed size records, so a save is sized up front,
+# packed into one buffer and written in one go, and arrays load with a single iter_unpack
+MAGIC = b"EPSV"
+VERSION = 1
+HEADER = struct.Struct('<4sHHII')  # Magic, version, flags (unused), payload size, crc32 of the payload
+COUNT = struct.Struct('<H')
+
+# Run id (zeros when there is no history), level, total levels, score, lives, endless, seed,
+# seconds into the level, damage taken this level
+RUN = struct.Struct('<16sHHiBBIff')
+
+# Codes for the string fields, append only so older saves keep their meaning
+ENEMY_TYPES = ("basic", "runner", "tank", "shooter", "boss")
+POWER_TYPES = (None, "health", "speed", "jump", "shield")
+PLATFORM_TYPES = ("normal", "bounce", "moving", "falling", "crumbling")
+
+# Kills per enemy type and powerups per power type this level
+STATS = struct.Struct(f'<{len(ENEMY_TYPES)}H{len(POWER_TYPES) - 1}H')
+
+# x, y, vel_x, vel_y, health, max_health, jump_power, move_speed, invulnerable_timer, shoot_cooldown,
+# special_timer, dash_cooldown, dash_timer, wall_jump_cooldown, flags, special power
+PLAYER = struct.Struct('<14fHB')
+PLAYER_FLAGS = ('on_ground', 'invulnerable', 'double_jump', 'can_double_jump', 'dash_available',
+                'dashing', 'facing_right', 'wall_sliding')
+
+# Original x and y, x, y, width, height, type, color, move direction, move counter, fall speed,
+# crumble timer, crumble state, active
+PLATFORM = struct.Struct('<4f2H4BbfffBB')
+
+# Type, flags, x, y, vel_x, vel_y, health, max_health, move_speed, shoot_delay, shoot_cooldown, damaged_timer
+ENEMY = struct.Struct('<BB10f')
+FACING_RIGHT = 1
+ON_GROUND = 2
+MINION = 4  # Spawned by the level's boss
+
+# Enemy index, phase, attack pattern, shield and rage flags, attack timer, shield health,
+# minion spawn timer, charge target (NaN for none)
+BOSS = struct.Struct('<HBBBffff')
+
+POWERUP = struct.Struct('<ffB')  # x, y, power type
+
+def pack_flags(obj, names):
+    flags = 0
+    for bit, name in enumerate(names):
+        flags |= bool(getattr(obj, name)) << bit
+    return flags
+
+def unpack_flags(obj, names, flags):
+    for bit, name in enumerate(names):
+        setattr(obj, name, bool(flags & 1 << bit))
+
+def encode(game):
+    """The run in progress as save file bytes: header, then the payload it checksums"""
+    players = [player for player in (game.player, game.partner) if player is not None]
+    platforms = list(game.platforms)
+    enemies = game.enemies
+    bosses = [i for i, enemy in enumerate(enemies) if enemy.enemy_type == "boss"]
+    powerups = [powerup for powerup in game.powerups if not powerup.collected]
+    minions = set()
+    for i in bosses:
+        minions.update(id(minion) for minion in enemies[i].minions)
+    
+    size = (HEADER.size + RUN.size + STATS.size + 5 * COUNT.size + len(players) * PLAYER.size +
+            len(platforms) * PLATFORM.size + len(enemies) * ENEMY.size + len(bosses) * BOSS.size +
+            len(powerups) * POWERUP.size)
+    buffer = bytearray(size)
+    offset = HEADER.size
+    
+    def pack(record, *values):
+        nonlocal offset
+        record.pack_into(buffer, offset, *values)
+        offset += record.size
+    
+    run_id = bytes.fromhex(game.run_id) if game.run_id is not None else bytes(16)
+    pack(RUN, run_id, game.current_level, game.total_levels, game.score, game.lives, game.endless_mode,
+         game.endless_seed, game.level_time, game.damage_taken)
+    pack(STATS, *[game.kills.get(name, 0) for name in ENEMY_TYPES],
+         *[game.powerups_collected.get(name, 0) for name in POWER_TYPES[1:]])
+    
+    pack(COUNT, len(players))
+    for player in players:
+        pack(PLAYER, player.x, player.y, player.vel_x, player.vel_y, player.health, player.max_health,
+             player.jump_power, player.move_speed, player.invulnerable_timer, player.shoot_cooldown,
+             player.special_timer, player.dash_cooldown, player.dash_timer, player.wall_jump_cooldown,
+             pack_flags(player, PLAYER_FLAGS), POWER_TYPES.index(player.special_power))
+    
+    pack(COUNT, len(platforms))
+    for platform in platforms:
+        original_x, original_y = platform.original_position
+        pack(PLATFORM, original_x, original_y, platform.x, platform.y, platform.width, platform.height,
+             PLATFORM_TYPES.index(platform.platform_type), *platform.color[:3], platform.move_direction,
+             platform.move_counter, platform.fall_speed, platform.crumble_timer, platform.crumble_state,
+             platform.is_active)
+    
+    pack(COUNT, len(enemies))
+    for enemy in enemies:
+        flags = (FACING_RIGHT * bool(enemy.facing_right) | ON_GROUND * bool(enemy.on_ground) |
+                 MINION * (id(enemy) in minions))
+        pack(ENEMY, ENEMY_TYPES.index(enemy.enemy_type), flags, enemy.x, enemy.y, enemy.vel_x, enemy.vel_y,
+             enemy.health, enemy.max_health, enemy.move_speed, enemy.shoot_delay, enemy.shoot_cooldown,
+             enemy.damaged_timer)
+    
+    pack(COUNT, len(bosses))
+    for i in bosses:
+        boss = enemies[i]
+        charge_target = math.nan if boss.charge_target is None else boss.charge_target
+        pack(BOSS, i, boss.phase, boss.attack_pattern, boss.shield_active | boss.rage_mode << 1,
+             boss.attack_timer, boss.shield_health, boss.minion_spawn_timer, charge_target)
+    
+    pack(COUNT, len(powerups))
+    for powerup in powerups:
+        pack(POWERUP, powerup.x, powerup.y, POWER_TYPES.index(powerup.power_type))
+    
+    payload = memoryview(buffer)[HEADER.size:]
+    HEADER.pack_into(buffer, 0, MAGIC, VERSION, 0, len(payload), zlib.crc32(payload))
+    return bytes(buffer)
+
+def decode(data):
+    """Check a save's header and checksum, and return its payload"""
+    if len(data) < HEADER.size:
+        raise ValueError("Save file is truncated")
+    magic, version, flags, size, checksum = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("Not a save file")
+    if version != VERSION:
+        raise ValueError(f"Save file version {version} is not supported, expected {VERSION}")
+    
+    payload = memoryview(data)[HEADER.size:]
+    if len(payload) != size:
+        raise ValueError("Save file is truncated")
+    if zlib.crc32(payload) != checksum:
+        raise ValueError("Save file is corrupt, checksum mismatch")
+    return payload
+
+def restore(game, data):
+    """Replace the game's run with the one saved in data, paused and ready to continue"""
+    payload = decode(data)
+    offset = 0
+    
+    def unpack(record):
+        nonlocal offset
+        values = record.unpack_from(payload, offset)
+        offset += record.size
+        return values
+    
+    def unpack_array(record):
+        nonlocal offset
+        (count,) = COUNT.unpack_from(payload, offset)
+        offset += COUNT.size
+        end = offset + count * record.size
+        records = list(struct.iter_unpack(record.format, payload[offset:end]))
+        offset = end
+        return records
+    
+    run_id, level, total_levels, score, lives, endless, seed, level_time, damage_taken = unpack(RUN)
+    stats = unpack(STATS)
+    saved_players = unpack_array(PLAYER)
+    saved_platforms = unpack_array(PLATFORM)
+    saved_enemies = unpack_array(ENEMY)
+    saved_bosses = unpack_array(BOSS)
+    saved_powerups = unpack_array(POWERUP)
+    
+    game.total_levels = total_levels
+    game.endless_mode = bool(endless)
+    game.endless_seed = seed
+    game.horde = None  # Horde runs aren't saved
+    game.preloaded = None
+    
+    players = []
+    for values in saved_players:
+        player = Player(values[0], values[1])
+        (player.x, player.y, player.vel_x, player.vel_y, player.health, player.max_health, player.jump_power,
+         player.move_speed, player.invulnerable_timer, player.shoot_cooldown, player.special_timer,
+         player.dash_cooldown, player.dash_timer, player.wall_jump_cooldown) = values[:14]
+        unpack_flags(player, PLAYER_FLAGS, values[14])
+        player.special_power = POWER_TYPES[values[15]]
+        player.rect.center = (player.x, player.y)
+        players.append(player)
+    partner = None
+    if game.coop:
+        if len(players) > 1:
+            partner = players[1]
+        else:
+            partner = Player(SCREEN_WIDTH // 2 + 60, SCREEN_HEIGHT - 150)
+        partner.color = PARTNER_COLOR
+    
+    platforms = []
+    for (original_x, original_y, x, y, width, height, platform_type, red, green, blue, move_direction,
+         move_counter, fall_speed, crumble_timer, crumble_state, active) in saved_platforms:
+        platform = Platform(original_x, original_y, width, height, (red, green, blue),
+                            PLATFORM_TYPES[platform_type])
+        platform.x = x
+        platform.y = y
+        platform.rect.topleft = (x, y)
+        platform.move_direction = move_direction
+        platform.move_counter = move_counter
+        platform.fall_speed = fall_speed
+        platform.crumble_timer = crumble_timer
+        platform.crumble_state = crumble_state
+        platform.is_active = bool(active)
+        platforms.append(platform)
+    
+    enemies = []
+    minions = []
+    for values in saved_enemies:
+        # Through create_enemy so stat overrides and the boss's shared list are set up as usual
+        enemy = game.create_enemy(values[2], values[3], ENEMY_TYPES[values[0]], enemies)
+        (enemy.x, enemy.y, enemy.vel_x, enemy.vel_y, enemy.health, enemy.max_health, enemy.move_speed,
+         enemy.shoot_delay, enemy.shoot_cooldown, enemy.damaged_timer) = values[2:]
+        enemy.facing_right = bool(values[1] & FACING_RIGHT)
+        enemy.on_ground = bool(values[1] & ON_GROUND)
+        enemy.rect.center = (enemy.x, enemy.y)
+        if values[1] & MINION:
+            set_layer(enemy, LAYER_MINION)
+            minions.append(enemy)
+        enemies.append(enemy)
+    
+    for (index, phase, attack_pattern, flags, attack_timer, shield_health, minion_spawn_timer,
+         charge_target) in saved_bosses:
+        boss = enemies[index]
+        boss.phase = phase
+        boss.attack_pattern = attack_pattern
+        boss.shield_active = bool(flags & 1)
+        boss.rage_mode = bool(flags & 2)
+        boss.attack_timer = attack_timer
+        boss.shield_health = shield_health
+        boss.minion_spawn_timer = minion_spawn_timer
+        boss.charge_target = None if math.isnan(charge_target) else charge_target
+        boss.reset_emitters()
+        boss.minions = minions  # There is only ever one boss to a level
+    
+    powerups = [PowerUp(x, y, POWER_TYPES[power_type]) for x, y, power_type in saved_powerups]
+    
+    game.apply_level({
+        'level': level,
+        'theme': level_themes[level % len(level_themes)],
+        'layout': get_level_layout(seed, level) if endless else None,
+        'player': players[0],
+        'partner': partner,
+        'platforms': platforms,
+        'powerups': powerups,
+        'enemies': enemies
+    })
+    
+    game.score = score
+    game.lives = lives
+    game.level_time = level_time
+    game.damage_taken = damage_taken
+    game.kills = {name: count for name, count in zip(ENEMY_TYPES, stats) if count}
+    game.powerups_collected = {name: count for name, count in zip(POWER_TYPES[1:], stats[len(ENEMY_TYPES):])
+                               if count}
+    game.run_id = run_id.hex() if any(run_id) and game.history is not None else None
+    if game.run_id is not None:
+        game.history.resume_run(game.run_id)
+    game.state = GameState.PAUSE
+
+class SaveFile:
+    """Saves and loads a run in progress, writing on a background thread.
+    
+    save() packs the game on the calling thread, which takes well under a
+    millisecond, and hands the bytes to a writer thread. The writer puts
+    them in a temporary file and renames it over the old save, so a crash
+    mid-write leaves the previous save intact.
+    """
+    def __init__(self, path="savegame.sav"):
+        self.path = path
+        self.writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="save-writer")
+        self.last_save_time = 0.0  # Seconds the last save took to pack
+        self.last_load_time = 0.0  # Seconds the last load took to read and rebuild
+    
+    def exists(self):
+        return os.path.exists(self.path)
+    
+    def save(self, game):
+        """Start saving the game, returns a future that finishes when the file is in place"""
+        started = time.perf_counter()
+        data = encode(game)
+        self.last_save_time = time.perf_counter() - started
+        return self.writer.submit(self.write, data)
+    
+    def write(self, data):
+        temporary = self.path + ".tmp"
+        with open(temporary, "wb") as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, self.path)
+    
+    def load(self, game):
+        """Restore the saved run into game. Raises OSError or ValueError if it can't be read"""
+        started = time.perf_counter()
+        self.writer.submit(lambda: None).result()  # Let any save still being written land first
+        with open(self.path, "rb") as file:
+            data = file.read()
+        restore(game, data)
+        self.last_load_time = time.perf_counter() - started
+    
+    def delete(self):
+        """Remove the save, after any save still being written has landed"""
+        self.writer.submit(self.remove).result()
+    
+    def remove(self):
+        if self.exists():
+            os.remove(self.path)
+    
+    def close(self):
+        """Wait for any save still being written"""
+        self.writer.shutdown(wait=True)
\ No newline at end of file
@@ -0,0 +1,33 @@
+import pygame
+
+def prepare(surface, alpha=True):
+    """Convert a freshly drawn frame to the display's pixel format for fast blits.
+    
+    Headless runs have no display mode set, so frames stay as drawn there.
+    """
+    if pygame.display.get_init() and pygame.display.get_surface() is not None:
+        return surface.convert_alpha() if alpha else surface.convert()
+    return surface
+
+class SpriteCache:
+    """Frames drawn once on first use and then reused by key.
+    
+    Keys should hold everything that changes how a frame looks (pose, facing,
+    color...), so the draw code only has to build the key and blit.
+    """
+    def __init__(self):
+        self.frames = {}
+    
+    def __len__(self):
+        return len(self.frames)
+    
+    def get(self, key, render, *args):
+        """The frame for key, calling render(*args) to draw it the first time"""
+        frame = self.frames.get(key)
+        if frame is None:
+            frame = prepare(render(*args))
+            self.frames[key] = frame
+        return frame
+    
+    def clear(self):
+        self.frames = {}
\ No newline at end of file
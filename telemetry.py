@@ -0,0 +1,192 @@
+import gc
+import os
+import json
+import time
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# Field names of each sample, in the order record() stores them
+FIELDS = ('time', 'frame_ms', 'enemies', 'bullets', 'enemy_bullets', 'particles',
+          'gc_pause_ms', 'gc_collections', 'level', 'score', 'lives', 'state')
+
+class Telemetry:
+    """Frame samples from the game thread, written out and served by a background thread.
+    
+    record() only stores a tuple into a preallocated ring and bumps the head
+    counter, so the game thread never takes a lock or touches a file. The
+    flush thread trails the head: it writes new samples to rotating
+    newline-delimited JSON files, and counts anything the game lapped before
+    it got there as dropped. With port set, the latest sample and the
+    buffered history are served on localhost.
+    """
+    def __init__(self, path="telemetry", capacity=4096, flush_interval=1.0, max_bytes=4 * 1024 * 1024,
+                 backups=3, port=None):
+        # Power of two capacity, so the slot is a mask instead of a modulo
+        size = 1
+        while size < capacity:
+            size *= 2
+        self.slots = [None] * size
+        self.mask = size - 1
+        self.head = 0  # Samples recorded, only the game thread writes it
+        self.tail = 0  # Samples flushed, only the flush thread writes it
+        self.dropped = 0
+        
+        self.path = path
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.port = port
+        self.file = None
+        
+        # Collector pauses since the last sample, from gc callbacks on whichever thread collects
+        self.gc_pause = 0.0
+        self.gc_collections = 0
+        self.gc_started = 0.0
+        
+        self.running = False
+        self.stopping = threading.Event()  # Wakes the flush thread early on stop
+        self.thread = None
+        self.server = None
+    
+    def record(self, frame_time, game):
+        """Store one sample, frame_time in milliseconds. Called every frame, so keep it cheap"""
+        head = self.head
+        self.slots[head & self.mask] = (time.time(), frame_time, len(game.enemies), len(game.bullets),
+                                        len(game.enemy_bullets), len(game.particle_system), self.gc_pause,
+                                        self.gc_collections, game.current_level, game.score, game.lives,
+                                        game.state)
+        self.gc_pause = 0.0
+        self.gc_collections = 0
+        self.head = head + 1
+    
+    def on_gc(self, phase, info):
+        if phase == "start":
+            self.gc_started = time.perf_counter()
+        else:
+            self.gc_pause += (time.perf_counter() - self.gc_started) * 1000
+            self.gc_collections += 1
+    
+    def start(self):
+        os.makedirs(self.path, exist_ok=True)
+        gc.callbacks.append(self.on_gc)
+        self.running = True
+        self.stopping.clear()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        
+        if self.port is not None:
+            self.server = ThreadingHTTPServer(("127.0.0.1", self.port), MetricsHandler)
+            self.server.telemetry = self
+            threading.Thread(target=self.server.serve_forever, daemon=True).start()
+    
+    def stop(self):
+        """Stop the background threads and write out whatever is left"""
+        if not self.running:
+            return
+        self.running = False
+        self.stopping.set()
+        if self.on_gc in gc.callbacks:
+            gc.callbacks.remove(self.on_gc)
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+        self.thread.join()
+        
+        self.flush()
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+    
+    def run(self):
+        while not self.stopping.wait(self.flush_interval):
+            self.flush()
+    
+    def pending(self):
+        """Samples recorded since the last flush, skipping any the ring already wrote over"""
+        head = self.head
+        tail = max(self.tail, head - len(self.slots))
+        samples = [self.slots[i & self.mask] for i in range(tail, head)]
+        
+        # The game thread kept recording while we copied, and writes a slot before bumping head,
+        # so anything older than one lap behind the new head may have been overwritten under us
+        lapped = min(self.head + 1 - len(self.slots) - tail, len(samples))
+        if lapped > 0:
+            del samples[:lapped]
+            tail += lapped
+        self.dropped += tail - self.tail
+        return samples, head
+    
+    def recent(self, count=None):
+        """The newest samples still in the ring, oldest first, as dicts"""
+        head = self.head
+        start = max(0, head - len(self.slots))
+        if count is not None:
+            start = max(start, head - count)
+        return [to_dict(self.slots[i & self.mask]) for i in range(start, head)]
+    
+    def flush(self):
+        samples, head = self.pending()
+        self.tail = head
+        if not samples:
+            return
+        
+        lines = "".join(json.dumps(to_dict(sample)) + "\n" for sample in samples)
+        if self.file is None:
+            self.file = open(os.path.join(self.path, "telemetry.ndjson"), "a")
+        self.file.write(lines)
+        self.file.flush()
+        
+        if self.file.tell() >= self.max_bytes:
+            self.rotate()
+    
+    def rotate(self):
+        """telemetry.ndjson becomes telemetry.1.ndjson and so on, the oldest backup is dropped"""
+        self.file.close()
+        self.file = None
+        
+        def backup(index):
+            return os.path.join(self.path, f"telemetry.{index}.ndjson")
+        
+        for index in range(self.backups - 1, 0, -1):
+            if os.path.exists(backup(index)):
+                os.replace(backup(index), backup(index + 1))
+        if self.backups > 0:
+            os.replace(os.path.join(self.path, "telemetry.ndjson"), backup(1))
+        else:
+            os.remove(os.path.join(self.path, "telemetry.ndjson"))
+
+def to_dict(sample):
+    values = dict(zip(FIELDS, sample))
+    values['state'] = values['state'].name  # Enum names only get looked up off the game thread
+    return values
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """GET /metrics for the latest sample and counters, GET /samples for the buffered history as NDJSON"""
+    def do_GET(self):
+        telemetry = self.server.telemetry
+        
+        if self.path == "/metrics":
+            latest = telemetry.recent(1)
+            body = json.dumps({
+                'latest': latest[0] if latest else None,
+                'recorded': telemetry.head,
+                'dropped': telemetry.dropped
+            })
+            content_type = "application/json"
+        elif self.path == "/samples":
+            body = "".join(json.dumps(sample) + "\n" for sample in telemetry.recent())
+            content_type = "application/x-ndjson"
+        else:
+            self.send_error(404)
+            return
+        
+        data = body.encode()
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+    
+    def log_message(self, format, *args):
+        pass  # Keep request logs out of the game's console
\ No newline at end of file
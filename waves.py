@@ -0,0 +1,149 @@
+import random
+from collections import Counter
+from enemies import Enemy
+
+# Horde mode: one arena and waves of enemies that keep coming until the lives run out.
+# Waves grow and the mix shifts from basic enemies toward the tougher types; enemies come
+# out of a pool, topped up during the break between waves, so spawning never allocates.
+
+# Spawn weight per enemy type: (first wave it appears in, weight then, weight added each wave after)
+WAVE_MIX = {
+    "basic": (1, 6.0, -0.4),
+    "runner": (2, 2.0, 0.5),
+    "tank": (3, 1.0, 0.3),
+    "shooter": (4, 1.0, 0.4)
+}
+MIN_WEIGHT = 1.0  # Types never fade out of the mix entirely
+
+FIRST_BREAK = 2.0  # Seconds before the first wave
+WAVE_BREAK = 4.0  # Seconds between waves
+SPAWN_BUDGET = 4  # Most enemies brought in per frame, big waves pour in over a few frames
+SAFE_DISTANCE = 250  # Enemies don't appear this close to a player, if there's anywhere else
+POOL_SIZE = 32  # Enemies made up front per type
+
+def wave_size(wave):
+    """Enemies in a wave, growing a little faster every wave"""
+    return 4 + 2 * wave + wave * wave // 6
+
+def wave_weights(wave):
+    """Spawn weights of each enemy type for a wave, in WAVE_MIX order"""
+    weights = []
+    for first, weight, growth in WAVE_MIX.values():
+        if wave < first:
+            weights.append(0.0)
+        else:
+            weights.append(max(MIN_WEIGHT, weight + growth * (wave - first)))
+    return weights
+
+class EnemyPool:
+    """Enemies made ahead of time and recycled, one free list per type"""
+    def __init__(self, size=POOL_SIZE):
+        self.free = {enemy_type: [] for enemy_type in WAVE_MIX}
+        self.created = 0  # Enemies ever constructed, stays put once the pool has warmed up
+        self.reserve({enemy_type: size for enemy_type in WAVE_MIX})
+    
+    def reserve(self, counts):
+        """Make sure there are at least counts[enemy_type] free enemies of each type"""
+        for enemy_type, count in counts.items():
+            free = self.free[enemy_type]
+            for _ in range(count - len(free)):
+                free.append(Enemy(0, 0, enemy_type))
+                self.created += 1
+    
+    def acquire(self, x, y, enemy_type):
+        """A fresh enemy from the free list, only built on the spot if the list ran dry"""
+        free = self.free[enemy_type]
+        if free:
+            enemy = free.pop()
+            enemy.reset(x, y, enemy_type)
+            return enemy
+        
+        self.created += 1
+        return Enemy(x, y, enemy_type)
+    
+    def release(self, enemies):
+        """Hand finished enemies back, they mustn't be used again until acquired"""
+        for enemy in enemies:
+            free = self.free.get(enemy.enemy_type)
+            if free is not None:
+                free.append(enemy)
+
+class WaveDirector:
+    """Runs horde mode: breaks, then waves brought in a few enemies a frame.
+    
+    Game.update calls update every frame, which returns True when a wave
+    has just been cleared. Waves are rolled from the run seed so a run can
+    be replayed.
+    """
+    def __init__(self, seed=None, spawn_budget=SPAWN_BUDGET, pool=None):
+        self.random = random.Random(seed)
+        self.spawn_budget = spawn_budget
+        self.pool = pool if pool is not None else EnemyPool()
+        self.wave = 0  # Latest wave from 1, 0 before the first
+        self.upcoming = 1  # The one after the break, the same wave again after a lost life
+        self.composition = []  # Enemy types in the current wave
+        self.pending = []  # Those still to bring in
+        self.break_timer = FIRST_BREAK
+        self.next_wave = self.compose(1)
+    
+    def compose(self, wave):
+        """Roll the enemy types for a wave and make sure the pool can cover them"""
+        composition = self.random.choices(list(WAVE_MIX), wave_weights(wave), k=wave_size(wave))
+        self.pool.reserve(Counter(composition))
+        return composition
+    
+    def start_wave(self):
+        self.wave = self.upcoming
+        self.break_timer = 0
+        self.composition = self.next_wave
+        self.pending = list(self.composition)
+        self.next_wave = None
+    
+    def restart_wave(self, enemies):
+        """After a lost life: the wave's enemies go back to the pool and it comes again after a break"""
+        self.pool.release(enemies)
+        if self.next_wave is None:
+            # Lost mid-wave rather than in a break, so this wave hasn't been beaten yet
+            self.next_wave = self.composition
+        self.pending = []
+        self.break_timer = WAVE_BREAK
+    
+    def in_break(self):
+        return self.break_timer > 0
+    
+    def update(self, dt, game):
+        if self.break_timer > 0:
+            self.break_timer -= dt
+            if self.break_timer <= 0:
+                self.start_wave()
+            return False
+        
+        if self.pending:
+            self.spawn(game)
+            return False
+        
+        if game.enemies:
+            return False
+        
+        # Cleared: roll the next wave now, so any pool growth happens during the break
+        self.break_timer = WAVE_BREAK
+        self.upcoming = self.wave + 1
+        self.next_wave = self.compose(self.upcoming)
+        return True
+    
+    def spawn(self, game):
+        players = [game.player] if game.partner is None else [game.player, game.partner]
+        platforms = game.platforms
+        for _ in range(min(self.spawn_budget, len(self.pending))):
+            enemy_type = self.pending.pop()
+            
+            # On top of a platform, away from the players when a few tries allow
+            for _ in range(4):
+                platform = platforms[self.random.randrange(len(platforms))]
+                spawn_x = platform.x + self.random.randint(20, max(20, platform.width - 20))
+                spawn_y = platform.y - 30
+                if all(abs(target.x - spawn_x) + abs(target.y - spawn_y) > SAFE_DISTANCE
+                       for target in players):
+                    break
+            
+            game.enemies.append(game.create_enemy(spawn_x, spawn_y, enemy_type, pool=self.pool))
\ No newline at end of file